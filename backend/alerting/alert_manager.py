@@ -5,9 +5,11 @@
 
 import json
 import logging
+import os
 import sqlite3
 import smtplib
 import ssl
+import sys
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -18,17 +20,31 @@ import threading
 import time
 import requests
 from email.mime.image import MIMEImage
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import numpy as np
-from io import BytesIO
 
 from config import (
     MQTT_CONFIG, EMAIL_CONFIG, ALERT_CONFIG, 
-    LOGGING_CONFIG, ALERT_MESSAGES, SECURITY_CONFIG
+    LOGGING_CONFIG, ALERT_MESSAGES, SECURITY_CONFIG,
+    DATABASE_CONFIG, SENSOR_REGISTRY_CONFIG, MONITORING_CONFIG
 )
+from batch_evaluator import BatchAlertEvaluator
+from chart_renderer import TemperatureChartRenderer
+from cooldown_index import SEVERITY_LEVELS, CooldownIndex
+from metrics import (
+    STAGE_DB_WRITE, STAGE_EVALUATE, STAGE_NOTIFY_ENQUEUE,
+    STAGE_STATE_UPDATE, STAGE_VALIDATE,
+    alerts_counter, db_pending_rows, ingest_metrics, notification_queue_depth,
+    observe_notification, rate_limited_counter
+)
+from notifier import NotificationDispatcher
+from rate_limiter import RateLimiter
+from state_store import StateStore
+
+# Módulos compartilhados: no container ficam em /app, localmente em ../common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from deadline_scheduler import DeadlineScheduler
+from ingest_trace import IngestTracer, NO_TRACE, parse_sensor_list
+from sensor_registry import SensorRegistry
+from time_window import ReorderBuffer, SlidingWindow
 
 # ============================================================================
 # ESTRUTURAS DE DADOS
@@ -46,12 +62,6 @@ class AlertEvent:
     sent: bool = False
     retry_count: int = 0
 
-@dataclass
-class TemperatureReading:
-    """Leitura de temperatura com timestamp"""
-    temperature: float
-    timestamp: datetime
-
 @dataclass
 class SensorState:
     """Estado atual de um sensor"""
@@ -61,11 +71,18 @@ class SensorState:
     humidity: float
     status: str
     alert_count: int = 0
-    temperature_history: List[TemperatureReading] = None
+    temperature_history: SlidingWindow = None
+    reorder: ReorderBuffer = None
     
     def __post_init__(self):
         if self.temperature_history is None:
-            self.temperature_history = []
+            self.temperature_history = SlidingWindow(
+                capacity=ALERT_CONFIG['variation']['history_capacity'],
+                retention_seconds=ALERT_CONFIG['variation']['history_seconds'],
+                window_seconds=ALERT_CONFIG['cooldown']['variation_check']
+            )
+        if self.reorder is None:
+            self.reorder = ReorderBuffer(ALERT_CONFIG['event_time']['allowed_lateness'])
 
 # ============================================================================
 # CONFIGURAÇÃO DE LOGGING
@@ -97,15 +114,82 @@ logger = setup_logging()
 class AlertManager:
     """Gerencia alertas e notificações do sistema de monitoramento"""
     
-    def __init__(self):
+    def __init__(self, start_threads: bool = True):
+        # start_threads=False: limpeza, escrita no banco, envio e recargas são
+        # dirigidos por fora (runtime asyncio em async_runtime.py)
+        self.start_threads = start_threads
         self.sensors = {}
         self.last_alert_time = {}
-        self.rate_limiter = RateLimiter()
+        # Cooldown de email por (sensor, tipo, severidade), persistido no banco
+        self.cooldowns = CooldownIndex(ALERT_CONFIG['cooldown']['email'])
+        # Prazo de offline por sensor (last_seen + limite), re-armado a cada leitura
+        self.offline_deadlines = DeadlineScheduler()
+        
+        # Reordenação por horário do evento: sensores com leituras retidas
+        self._event_lock = threading.Lock()
+        self._reorder_pending = set()
+        self.late_readings = 0
+        # Chamado a cada alerta detectado (inclusive de leituras liberadas depois)
+        self.on_alert = None
+        self.rate_limiter = RateLimiter(SECURITY_CONFIG['rate_limiting'])
         self.db_manager = DatabaseManager()
+        
+        # Snapshot + log de deltas do estado em memória (restart rápido)
+        state_config = DATABASE_CONFIG['state']
+        self.state_store = StateStore(state_config['dir']) if state_config['enabled'] else None
+        
+        # Sensores aceitos e limites por sensor (compartilhado com o exportador)
+        self.sensor_registry = SensorRegistry(
+            SENSOR_REGISTRY_CONFIG['path'],
+            default_thresholds={
+                'temperature': ALERT_CONFIG['temperature'],
+                'humidity': ALERT_CONFIG['humidity'],
+                'variation': ALERT_CONFIG['variation']
+            },
+            reload_interval=SENSOR_REGISTRY_CONFIG['reload_interval'],
+            auto_register=SENSOR_REGISTRY_CONFIG['auto_register'],
+            seed_sensors=SENSOR_REGISTRY_CONFIG['seed_sensors']
+        )
         self.email_sender = EmailSender(self)
         
+        # Trace por mensagem (desligado por padrão: sem custo no caminho quente)
+        trace_config = LOGGING_CONFIG['trace']
+        self.tracer = IngestTracer(
+            sensors=parse_sensor_list(trace_config['sensors']),
+            sample_rate=trace_config['sample_rate'],
+            level=trace_config['level']
+        )
+        
+        # Envio de emails fora da thread MQTT
+        notification_config = ALERT_CONFIG['notification']
+        self.notifier = NotificationDispatcher(
+            send_fn=self.email_sender.send_alert_email,
+            queue_size=notification_config['queue_size'],
+            workers=notification_config['workers'],
+            overflow_policy=notification_config['overflow_policy'],
+            enqueue_timeout=notification_config['enqueue_timeout'],
+            retry_attempts=notification_config['retry_attempts'],
+            retry_delay=notification_config['retry_delay'],
+            on_delivered=observe_notification
+        )
+        
+        # Gauges lidos no scrape sem locks (só tamanhos de filas)
+        notification_queue_depth.set_function(self.notifier.queue_depth)
+        db_pending_rows.set_function(self.db_manager.pending_rows)
+        
+        # Avaliação de limites em lote (opcional)
+        batch_config = ALERT_CONFIG['batch']
+        self.batch_evaluator = None
+        if batch_config['enabled']:
+            self.batch_evaluator = BatchAlertEvaluator(
+                self,
+                max_size=batch_config['max_size'],
+                max_delay_ms=batch_config['max_delay_ms']
+            )
+        
         # Threading
         self.cleanup_thread = None
+        self.state_thread = None
         self.health_check_thread = None
         self.running = True
         
@@ -114,22 +198,28 @@ class AlertManager:
         
         # Setup inicial
         self._setup_database()
-        self._restore_sensor_states()
-        self._start_cleanup_thread()
-        
-        # APENAS sensores 'a' e 'b' são aceitos
-        self.sensores_validos = {'a', 'b'}
-        
-        logger.info("AlertManager inicializado - Apenas sensores 'a' e 'b' serão processados")
+        if start_threads:
+            self._start_cleanup_thread()
+            self._start_state_thread()
+            self.notifier.start()
+            self.sensor_registry.start()
+            if self.batch_evaluator is not None:
+                self.batch_evaluator.start()
+        
+        logger.info(f"AlertManager inicializado - {len(self.sensor_registry)} sensores cadastrados no registro")
     
     def _setup_database(self):
         """Configura o banco de dados"""
         try:
-            self.db_manager.init_database()
+            self.db_manager.init_database(start_writer=self.start_threads)
+            self.db_manager.drop_expired_partitions(DATABASE_CONFIG['sqlite']['readings_retention_days'])
             logger.info("Banco de dados inicializado com sucesso")
             
-            # Restaura estados dos sensores após reinicialização
-            self._restore_sensor_states()
+            # Restaura o estado após reinicialização: snapshot + log se houver,
+            # senão só os valores escalares da tabela sensor_states
+            if not self._restore_state_snapshot():
+                self._restore_sensor_states()
+            self._restore_cooldowns()
         except Exception as e:
             logger.error(f"Erro ao inicializar banco de dados: {e}")
     
@@ -138,7 +228,7 @@ class AlertManager:
         def cleanup_worker():
             while self.running:
                 try:
-                    time.sleep(3600)  # 1 hora
+                    time.sleep(MONITORING_CONFIG['cleanup_interval'])
                     self._cleanup_old_data()
                 except Exception as e:
                     logger.error(f"Erro na thread de limpeza: {e}")
@@ -146,42 +236,93 @@ class AlertManager:
         cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
         cleanup_thread.start()
     
+    def _start_state_thread(self):
+        """Inicia thread que grava o log de deltas e os snapshots de estado"""
+        if self.state_store is None:
+            return
+        state_config = DATABASE_CONFIG['state']
+        
+        def state_worker():
+            last_snapshot = time.monotonic()
+            while self.running:
+                time.sleep(state_config['log_flush_interval'])
+                try:
+                    self.state_store.flush()
+                    if time.monotonic() - last_snapshot >= state_config['snapshot_interval']:
+                        self.write_state_snapshot()
+                        last_snapshot = time.monotonic()
+                except Exception as e:
+                    logger.error(f"Erro na thread de snapshot de estado: {e}")
+        
+        self.state_thread = threading.Thread(target=state_worker, name='state-snapshot', daemon=True)
+        self.state_thread.start()
+    
     def _is_sensor_valido(self, esp_id: str) -> bool:
-        """Verifica se o sensor é válido (apenas 'a' e 'b')"""
-        return esp_id in self.sensores_validos
+        """Verifica se o sensor está cadastrado e habilitado no registro"""
+        return self.sensor_registry.is_valid(esp_id)
 
-    def process_sensor_data(self, esp_id: str, temperature: float, humidity: float):
-        """Processa dados do sensor"""
+    def process_sensor_data(self, esp_id: str, temperature: float, humidity: float, trace=None,
+                            timestamp: float = None, device_time: float = None):
+        """
+        Processa dados do sensor.
+        
+        timestamp é o horário da amostra em epoch (padrão: agora); device_time, o
+        horário no dispositivo usado no atraso de ingestão (padrão: timestamp).
+        A leitura passa pelo buffer de reordenação: o retorno é o último alerta
+        das leituras liberadas por esta chamada (que podem ser anteriores a ela)
+        ou None se nada foi liberado. Leituras retidas são avaliadas depois, por
+        release_reordered_readings(); para contar todos os alertas use on_alert,
+        chamado em _handle_alert.
+        
+        Os alertas são detectados com _event_lock e tratados depois de soltá-lo:
+        banco e fila de notificação não seguram a ingestão, e o worker que copia
+        as janelas para o gráfico (com o mesmo lock) não espera pelo submit.
+        """
+        if trace is None:
+            trace = self.tracer.begin(esp_id)
         try:
-            # REJEITA qualquer sensor que não seja 'a' ou 'b'
-            if not self._is_sensor_valido(esp_id):
-                logger.warning(f"🚫 Sensor '{esp_id}' REJEITADO - Apenas sensores 'a' e 'b' são aceitos")
+            # REJEITA sensores fora do registro
+            started = time.perf_counter()
+            valid = self._is_sensor_valido(esp_id)
+            STAGE_VALIDATE.observe(time.perf_counter() - started)
+            if not valid:
+                logger.warning(f"🚫 Sensor '{esp_id}' REJEITADO - não cadastrado no registro de sensores")
                 return None
             
-            logger.info(f"[DEBUG] Processando dados do sensor {esp_id}: Temp={temperature}°C, Umidade={humidity}%")
-            
-            # Atualiza estado do sensor
-            self._update_sensor_state(esp_id, temperature, humidity)
-            
-            # Prepara dados para verificação de alertas
-            data = {
-                'temperature': temperature,
-                'humidity': humidity,
-                'esp_id': esp_id
-            }
+            if trace:
+                trace.event('process', temperature=temperature, humidity=humidity)
             
-            # Detecta alertas
-            alert = self._check_alerts(esp_id, data)
+            # Atualiza estado do sensor (último valor, last_seen e banco)
+            started = time.perf_counter()
+            sample_time = self._update_sensor_state(esp_id, temperature, humidity, timestamp)
+            STAGE_STATE_UPDATE.observe(time.perf_counter() - started)
+            if device_time is None:
+                device_time = sample_time
             
-            # Processa alerta se detectado
-            if alert:
-                self._handle_alert(alert)
-                logger.info(f"[DEBUG] ✅ Alerta gerado: {alert.alert_type} para {esp_id} - Severidade: {alert.severity}")
-            else:
-                logger.info(f"[DEBUG] ❌ Nenhum alerta gerado para {esp_id}")
+            # Janela e alertas seguem o horário do evento: a leitura passa pelo
+            # buffer de reordenação e só é avaliada quando a marca d'água passa
+            pending = []
+            with self._event_lock:
+                reorder = self.sensors[esp_id].reorder
+                ready = reorder.push(sample_time, (temperature, humidity, trace, device_time), time.time())
+                if ready is None:
+                    self.late_readings += 1
+                    logger.debug(f"Leitura atrasada de {esp_id} fora da janela "
+                                 f"({datetime.fromtimestamp(sample_time).isoformat()})")
+                    if trace:
+                        trace.event('late', watermark=round(reorder.watermark, 3))
+                    return None
                 
-            logger.info(f"[DEBUG] Dados processados para {esp_id}: Temp={temperature}°C, Umidade={humidity}%")
+                if reorder:
+                    self._reorder_pending.add(esp_id)
+                else:
+                    self._reorder_pending.discard(esp_id)
+                
+                if trace and len(reorder):
+                    trace.detail('reorder', held=len(reorder), released=len(ready))
+                alert = self._evaluate_released(esp_id, ready, pending)
             
+            self._handle_pending(pending)
             return alert
             
         except Exception as e:
@@ -190,9 +331,84 @@ class AlertManager:
             logger.error(f"Traceback: {traceback.format_exc()}")
             return None
     
-    def _update_sensor_state(self, esp_id: str, temperature: float, humidity: float):
-        """Atualiza o estado de um sensor"""
-        now = datetime.now()
+    def _evaluate_released(self, esp_id: str, ready, pending: List) -> Optional[AlertEvent]:
+        """
+        Avalia, em ordem de evento, as leituras liberadas pelo buffer de reordenação.
+        Roda com _event_lock: os alertas vão para pending como (alerta, trace),
+        e quem chamou os trata com _handle_pending depois de soltar o lock.
+        """
+        alert = None
+        for sample_time, (temperature, humidity, trace, device_time) in ready:
+            started = time.perf_counter()
+            alert = self._evaluate_reading(esp_id, temperature, humidity, sample_time, pending, trace) or alert
+            STAGE_EVALUATE.observe(time.perf_counter() - started)
+            # Atraso dispositivo -> avaliação (inclui o tempo retido no buffer)
+            ingest_metrics.observe_sample_lag(device_time, time.time())
+        return alert
+    
+    def _evaluate_reading(self, esp_id: str, temperature: float, humidity: float,
+                          sample_time: float, pending: List, trace=NO_TRACE) -> Optional[AlertEvent]:
+        """Coloca a leitura na janela e verifica alertas no horário da amostra (sem tratá-los)"""
+        self._add_temperature_to_history(esp_id, temperature, datetime.fromtimestamp(sample_time))
+        
+        # Modo lote: limites avaliados depois, junto com outras leituras
+        if self.batch_evaluator is not None:
+            variation = self._calculate_temperature_variation_5min(esp_id, trace, at=sample_time)
+            # Lote cheio é avaliado aqui; os alertas saem junto com os demais
+            pending.extend(self.batch_evaluator.add(esp_id, temperature, humidity, variation, trace))
+            return None
+        
+        # Prepara dados para verificação de alertas
+        data = {
+            'temperature': temperature,
+            'humidity': humidity,
+            'esp_id': esp_id
+        }
+        
+        # Detecta alertas
+        alert = self._check_alerts(esp_id, data, trace, at=sample_time)
+        
+        # Alerta detectado é tratado depois, fora de _event_lock
+        if alert:
+            pending.append((alert, trace))
+        elif trace:
+            trace.event('no_alert')
+        
+        return alert
+    
+    def _handle_pending(self, pending: List):
+        """Trata os alertas detectados com _event_lock (chamar sem o lock)"""
+        for alert, trace in pending:
+            self._handle_alert(alert, trace)
+            logger.info(f"Alerta gerado: {alert.alert_type} para {alert.esp_id} - Severidade: {alert.severity}")
+    
+    def release_reordered_readings(self, now: float = None, drain: bool = False):
+        """Avalia as leituras retidas de sensores que pararam de enviar (só os pendentes)"""
+        if now is None:
+            now = time.time()
+        pending = []
+        with self._event_lock:
+            for esp_id in list(self._reorder_pending):
+                sensor = self.sensors.get(esp_id)
+                if sensor is None:
+                    self._reorder_pending.discard(esp_id)
+                    continue
+                ready = sensor.reorder.drain() if drain else sensor.reorder.release_due(now)
+                if not sensor.reorder:
+                    self._reorder_pending.discard(esp_id)
+                if ready:
+                    try:
+                        self._evaluate_released(esp_id, ready, pending)
+                    except Exception as e:
+                        logger.error(f"Erro ao avaliar leituras retidas de {esp_id}: {e}")
+        self._handle_pending(pending)
+    
+    def _update_sensor_state(self, esp_id: str, temperature: float, humidity: float,
+                             timestamp: float = None) -> float:
+        """Atualiza o estado de um sensor; retorna o horário da amostra (epoch)"""
+        if timestamp is None:
+            timestamp = time.time()
+        now = datetime.fromtimestamp(timestamp)
         
         if esp_id not in self.sensors:
             self.sensors[esp_id] = SensorState(
@@ -208,7 +424,8 @@ class AlertManager:
             # Verifica se o sensor estava offline e agora voltou online
             was_offline = sensor.status == 'offline'
             
-            sensor.last_seen = now
+            # Amostras antigas de um lote não fazem last_seen voltar no tempo
+            sensor.last_seen = max(sensor.last_seen, now)
             sensor.temperature = temperature
             sensor.humidity = humidity
             sensor.status = 'online'
@@ -217,15 +434,19 @@ class AlertManager:
             if was_offline:
                 self._handle_sensor_back_online(esp_id, temperature)
         
-        # Adiciona temperatura ao histórico
-        self._add_temperature_to_history(esp_id, temperature, now)
+        self._arm_offline_deadline(esp_id, self.sensors[esp_id].last_seen)
+        if self.state_store is not None:
+            self.state_store.append_reading(esp_id, timestamp, temperature, humidity)
         
-        # Salva estado atualizado no banco
+        # Salva estado atualizado e leitura bruta no banco
         self._save_sensor_state(esp_id)
+        if DATABASE_CONFIG['sqlite']['readings_enabled']:
+            self.db_manager.save_reading(esp_id, temperature, humidity, now)
+        return timestamp
     
     def _handle_sensor_back_online(self, esp_id: str, temperature: float):
         """Lida com sensor voltando online após estar offline"""
-        logger.info(f"[DEBUG] Sensor {esp_id} voltou online após estar offline")
+        logger.info(f"Sensor {esp_id} voltou online após estar offline")
         
         # Gera status completo do cluster
         sensors_status = self._get_cluster_status()
@@ -292,9 +513,11 @@ class AlertManager:
                 )
                 
                 self.sensors[esp_id] = sensor_state
-                logger.info(f"[DEBUG] Sensor {esp_id} restaurado: {sensor_state.status} (última vez visto: {last_seen})")
+                if sensor_state.status == 'online':
+                    self._arm_offline_deadline(esp_id, last_seen)
+                logger.debug(f"Sensor {esp_id} restaurado: {sensor_state.status} (última vez visto: {last_seen})")
             
-            logger.info(f"[DEBUG] Restaurados {len(restored_sensors)} sensores do banco de dados")
+            logger.info(f"Restaurados {len(restored_sensors)} sensores do banco de dados")
             
         except Exception as e:
             logger.error(f"Erro ao restaurar estados dos sensores: {e}")
@@ -308,134 +531,211 @@ class AlertManager:
         except Exception as e:
             logger.error(f"Erro ao salvar estado do sensor {esp_id}: {e}")
     
+    # ------------------------------------------------------------------------
+    # SNAPSHOT DO ESTADO EM MEMÓRIA
+    # ------------------------------------------------------------------------
+    
+    def _export_state(self) -> Dict:
+        """Estado completo no formato de state_store.encode_snapshot"""
+        sensors = []
+        for esp_id, sensor in list(self.sensors.items()):
+            timestamps, values = sensor.temperature_history.export()
+            sensors.append((esp_id, sensor.last_seen.timestamp(), sensor.temperature, sensor.humidity,
+                            sensor.alert_count, sensor.status == 'online', timestamps, values))
+        return {
+            'sensors': sensors,
+            'last_alert_time': [(esp_id, at.timestamp()) for esp_id, at in list(self.last_alert_time.items())],
+            'cooldowns': self.cooldowns.items(),
+            'rate_limits': self.rate_limiter.export_state()
+        }
+    
+    def write_state_snapshot(self, build_only: bool = False) -> Optional[bytes]:
+        """
+        Grava o snapshot do estado e reinicia o log de deltas.
+        
+        A captura roda com o lock de eventos (janelas consistentes); a escrita
+        do arquivo, fora dele. build_only=True só captura e devolve os bytes
+        (o runtime asyncio grava com write_snapshot() no executor do banco).
+        """
+        if self.state_store is None:
+            return None
+        started = time.perf_counter()
+        with self._event_lock:
+            data = self.state_store.prepare_snapshot(self._export_state, time.time())
+        if build_only:
+            return data
+        self.state_store.write_snapshot(data)
+        logger.debug(f"Snapshot de estado gravado: {len(self.sensors)} sensores, {len(data)} bytes, "
+                     f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        return data
+    
+    def _restore_state_snapshot(self) -> bool:
+        """Carrega snapshot + log de deltas; False se não houver estado salvo"""
+        if self.state_store is None:
+            return False
+        try:
+            started = time.perf_counter()
+            saved_at, state, records = self.state_store.load()
+            if state is None and not records:
+                return False
+            
+            if state is not None:
+                for esp_id, last_seen, temperature, humidity, alert_count, online, timestamps, values in state['sensors']:
+                    sensor = SensorState(
+                        esp_id=esp_id,
+                        last_seen=datetime.fromtimestamp(last_seen),
+                        temperature=temperature,
+                        humidity=humidity,
+                        status='online' if online else 'offline',
+                        alert_count=alert_count
+                    )
+                    sensor.temperature_history.load(timestamps, values)
+                    self.sensors[esp_id] = sensor
+                for esp_id, at in state['last_alert_time']:
+                    self.last_alert_time[esp_id] = datetime.fromtimestamp(at)
+                self.cooldowns.restore(state['cooldowns'])
+                self.rate_limiter.restore_state(state['rate_limits'])
+            
+            for record in records:
+                self._replay_state_record(record)
+            
+            # Sensores sem leitura há mais que o limite voltam como offline
+            now = time.time()
+            offline_threshold = ALERT_CONFIG['cooldown']['sensor_offline']
+            for esp_id, sensor in self.sensors.items():
+                if now - sensor.last_seen.timestamp() > offline_threshold:
+                    sensor.status = 'offline'
+                if sensor.status == 'online':
+                    self._arm_offline_deadline(esp_id, sensor.last_seen)
+            
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            age = f"snapshot de {datetime.fromtimestamp(saved_at).isoformat()}" if saved_at else "sem snapshot"
+            logger.info(f"Estado restaurado em {elapsed_ms:.1f} ms: {len(self.sensors)} sensores, "
+                        f"{len(records)} registros do log ({age})")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao restaurar snapshot de estado: {e}")
+            self.sensors.clear()
+            return False
+    
+    def _replay_state_record(self, record: tuple):
+        """Reaplica um registro do log de deltas (sem gerar alertas nem gravar no banco)"""
+        kind = record[0]
+        if kind == 'R':
+            _, esp_id, sample_time, temperature, humidity = record
+            sample = datetime.fromtimestamp(sample_time)
+            sensor = self.sensors.get(esp_id)
+            if sensor is None:
+                sensor = self.sensors[esp_id] = SensorState(
+                    esp_id=esp_id, last_seen=sample, temperature=temperature,
+                    humidity=humidity, status='online'
+                )
+            else:
+                sensor.last_seen = max(sensor.last_seen, sample)
+                sensor.temperature = temperature
+                sensor.humidity = humidity
+                sensor.status = 'online'
+            # Só leituras mais novas que a janela: repetir um registro não duplica
+            last = sensor.temperature_history.last_timestamp()
+            if last is None or sample_time > last:
+                sensor.temperature_history.append(sample_time, temperature)
+        elif kind == 'L':
+            _, esp_id, alert_type, at = record
+            self.rate_limiter.replay(esp_id, alert_type, at)
+        elif kind == 'A':
+            _, esp_id, alert_type, severity, at = record
+            self.cooldowns.start(esp_id, alert_type, severity, at)
+            self.last_alert_time[esp_id] = datetime.fromtimestamp(at)
+    
     def _add_temperature_to_history(self, esp_id: str, temperature: float, timestamp: datetime):
         """Adiciona leitura de temperatura ao histórico do sensor"""
         sensor = self.sensors[esp_id]
+        history = sensor.temperature_history
         
-        # Adiciona nova leitura
-        sensor.temperature_history.append(TemperatureReading(temperature, timestamp))
-        
-        # Mantém apenas últimos 5 minutos + margem de segurança
-        cutoff_time = timestamp - timedelta(minutes=6)
-        sensor.temperature_history = [
-            reading for reading in sensor.temperature_history 
-            if reading.timestamp > cutoff_time
-        ]
+        # A janela exige ordem de timestamp (garantida pelo buffer de reordenação)
+        last = history.last_timestamp()
+        if last is not None and timestamp.timestamp() < last:
+            logger.debug(f"Leitura fora de ordem de {esp_id} ignorada no histórico ({timestamp.isoformat()})")
+            return
         
-        logger.debug(f"Histórico de {esp_id}: {len(sensor.temperature_history)} leituras")
+        # Buffer circular: descarta sozinho o que passou da retenção
+        history.append(timestamp.timestamp(), temperature)
     
-    def _calculate_temperature_variation_5min(self, esp_id: str) -> float:
-        """Calcula a variação de temperatura nos últimos 5 minutos"""
-        logger.info(f"[DEBUG] _calculate_temperature_variation_5min iniciado para {esp_id}")
-        
+    def _calculate_temperature_variation_5min(self, esp_id: str, trace=NO_TRACE, at: float = None) -> float:
+        """Calcula a variação de temperatura nos 5 minutos até at (padrão: agora)"""
         if esp_id not in self.sensors:
-            logger.info(f"[DEBUG] Sensor {esp_id} não encontrado nos sensores")
             return 0.0
         
-        sensor = self.sensors[esp_id]
-        history = sensor.temperature_history
-        
-        logger.info(f"[DEBUG] Histórico do sensor {esp_id}: {len(history)} leituras")
-        
+        history = self.sensors[esp_id].temperature_history
         if len(history) < 2:
-            logger.info(f"[DEBUG] Histórico insuficiente para {esp_id}: apenas {len(history)} leituras")
+            if trace:
+                trace.detail('variation_skipped', history=len(history))
             return 0.0
         
-        # Janela de 5 minutos
-        now = datetime.now()
-        five_minutes_ago = now - timedelta(minutes=5)
-        
-        # Filtra leituras dos últimos 5 minutos
-        recent_readings = [
-            reading for reading in history 
-            if reading.timestamp >= five_minutes_ago
-        ]
-        
-        logger.info(f"[DEBUG] Leituras dos últimos 5min para {esp_id}: {len(recent_readings)} de {len(history)} total")
-        
-        if len(recent_readings) < 2:
-            logger.info(f"[DEBUG] Leituras recentes insuficientes para {esp_id}: apenas {len(recent_readings)}")
-            # Debug: mostrar timestamps das leituras
-            for i, reading in enumerate(history):
-                logger.info(f"[DEBUG] Leitura {i}: {reading.temperature}°C em {reading.timestamp}")
+        # Janela de 5 minutos: mínimo e máximo mantidos pelas deques monotônicas
+        count, min_temp, max_temp = history.window_stats(time.time() if at is None else at)
+        if count < 2:
+            if trace:
+                trace.detail('variation_skipped', history=len(history), window=count)
             return 0.0
         
-        # Encontra temperaturas mínima e máxima na janela
-        temperatures = [reading.temperature for reading in recent_readings]
-        min_temp = min(temperatures)
-        max_temp = max(temperatures)
-        
         variation = max_temp - min_temp
-        
-        logger.info(f"[DEBUG] Variação calculada para {esp_id}: {variation:.2f}°C (min: {min_temp:.2f}°C, max: {max_temp:.2f}°C)")
-        
-        # Debug: mostrar todas as leituras recentes
-        for i, reading in enumerate(recent_readings):
-            logger.info(f"[DEBUG] Leitura recente {i}: {reading.temperature}°C em {reading.timestamp}")
+        if trace:
+            trace.detail('variation', window=count, history=len(history),
+                         min=round(min_temp, 2), max=round(max_temp, 2), variation=round(variation, 2))
         
         return variation
     
-    def _check_alerts(self, esp_id: str, data: Dict) -> Optional[AlertEvent]:
-        """Verifica se há condições de alerta"""
-        logger.info(f"[DEBUG] _check_alerts iniciado para {esp_id}")
-        
+    def _check_alerts(self, esp_id: str, data: Dict, trace=NO_TRACE, at: float = None) -> Optional[AlertEvent]:
+        """Verifica se há condições de alerta (at: horário da amostra, para a janela de variação)"""
         temperature = data.get('temperature')
         humidity = data.get('humidity')
         
-        logger.info(f"[DEBUG] Temperatura: {temperature}°C, Umidade: {humidity}%")
-        logger.info(f"[DEBUG] Limites configurados - Temp HIGH: {ALERT_CONFIG['temperature']['high']}°C, CRITICAL: {ALERT_CONFIG['temperature']['critical_high']}°C")
+        # Limites do sensor (padrões + overrides do registro)
+        limits = self.sensor_registry.thresholds(esp_id)
         
         if temperature is None or humidity is None:
-            logger.warning(f"[DEBUG] Dados inválidos - temperatura ou umidade ausente")
+            logger.warning(f"Dados inválidos do sensor {esp_id} - temperatura ou umidade ausente")
             return None
         
+        if trace:
+            trace.detail('limits', temp_high=limits['temperature']['high'],
+                         temp_critical=limits['temperature']['critical_high'],
+                         humidity_high=limits['humidity']['high'],
+                         variation=limits['variation']['temperature'])
+        
         alerts = []
         
         # Verifica temperatura
-        logger.info(f"[DEBUG] Verificando limites de temperatura...")
-        if temperature >= ALERT_CONFIG['temperature']['critical_high']:
-            logger.info(f"[DEBUG] 🔥 Temperatura CRÍTICA detectada: {temperature}°C >= {ALERT_CONFIG['temperature']['critical_high']}°C")
+        if temperature >= limits['temperature']['critical_high']:
             alerts.append(self._create_alert(esp_id, 'temperature_critical', 'CRITICAL', data))
-        elif temperature >= ALERT_CONFIG['temperature']['high']:
-            logger.info(f"[DEBUG] 🌡️ Temperatura ALTA detectada: {temperature}°C >= {ALERT_CONFIG['temperature']['high']}°C")
+        elif temperature >= limits['temperature']['high']:
             alerts.append(self._create_alert(esp_id, 'temperature_high', 'HIGH', data))
-        elif temperature <= ALERT_CONFIG['temperature']['critical_low']:
-            logger.info(f"[DEBUG] 🧊 Temperatura CRÍTICA BAIXA detectada: {temperature}°C <= {ALERT_CONFIG['temperature']['critical_low']}°C")
+        elif temperature <= limits['temperature']['critical_low']:
             alerts.append(self._create_alert(esp_id, 'temperature_critical', 'CRITICAL', data))
-        elif temperature <= ALERT_CONFIG['temperature']['low']:
-            logger.info(f"[DEBUG] ❄️ Temperatura BAIXA detectada: {temperature}°C <= {ALERT_CONFIG['temperature']['low']}°C")
+        elif temperature <= limits['temperature']['low']:
             alerts.append(self._create_alert(esp_id, 'temperature_low', 'HIGH', data))
-        else:
-            logger.info(f"[DEBUG] ✅ Temperatura dentro dos limites normais: {temperature}°C")
         
         # Verifica umidade
-        logger.info(f"[DEBUG] Verificando limites de umidade...")
-        if humidity >= ALERT_CONFIG['humidity']['high']:
-            logger.info(f"[DEBUG] 💧 Umidade ALTA detectada: {humidity}% >= {ALERT_CONFIG['humidity']['high']}%")
+        if humidity >= limits['humidity']['high']:
             alerts.append(self._create_alert(esp_id, 'humidity_high', 'MEDIUM', data))
-        elif humidity <= ALERT_CONFIG['humidity']['low']:
-            logger.info(f"[DEBUG] 🏜️ Umidade BAIXA detectada: {humidity}% <= {ALERT_CONFIG['humidity']['low']}%")
+        elif humidity <= limits['humidity']['low']:
             alerts.append(self._create_alert(esp_id, 'humidity_low', 'MEDIUM', data))
-        else:
-            logger.info(f"[DEBUG] ✅ Umidade dentro dos limites normais: {humidity}%")
         
         # Verifica variações bruscas (calcula no backend)
-        variation = self._calculate_temperature_variation_5min(esp_id)
-        logger.info(f"[DEBUG] Verificando variação de temperatura: {variation}°C")
-        if variation >= ALERT_CONFIG['variation']['temperature']:
-            logger.info(f"[DEBUG] 📈 Variação BRUSCA detectada: {variation}°C >= {ALERT_CONFIG['variation']['temperature']}°C")
+        variation = self._calculate_temperature_variation_5min(esp_id, trace, at)
+        if variation >= limits['variation']['temperature']:
             # Adiciona variação aos dados para usar na mensagem
             data_with_variation = data.copy()
             data_with_variation['temperature_variation'] = variation
             alerts.append(self._create_alert(esp_id, 'temperature_variation', 'HIGH', data_with_variation))
         
-        logger.info(f"[DEBUG] Total de alertas detectados: {len(alerts)}")
+        if trace:
+            trace.event('checked', detected=','.join(a.alert_type for a in alerts) or '-')
         
         # Retorna o alerta mais crítico
         if alerts:
-            critical_alert = max(alerts, key=lambda x: self._get_severity_level(x.severity))
-            logger.info(f"[DEBUG] Alerta mais crítico selecionado: {critical_alert.alert_type} - {critical_alert.severity}")
-            return critical_alert
+            return max(alerts, key=lambda x: self._get_severity_level(x.severity))
         
         return None
     
@@ -446,12 +746,13 @@ class AlertManager:
         template = message_template.get('template', 'Alerta no sensor {esp_id}')
         
         # Determina o threshold baseado no tipo de alerta
+        limits = self.sensor_registry.thresholds(esp_id)
         if 'temperature' in alert_type and 'variation' not in alert_type:
-            threshold = ALERT_CONFIG['temperature']['high']
+            threshold = limits['temperature']['high']
         elif 'humidity' in alert_type:
-            threshold = ALERT_CONFIG['humidity']['high'] if 'high' in alert_type else ALERT_CONFIG['humidity']['low']
+            threshold = limits['humidity']['high'] if 'high' in alert_type else limits['humidity']['low']
         else:
-            threshold = ALERT_CONFIG['variation']['temperature']
+            threshold = limits['variation']['temperature']
         
         # Formata a mensagem e título
         format_data = {
@@ -481,236 +782,410 @@ class AlertManager:
     
     def _get_severity_level(self, severity: str) -> int:
         """Retorna nível numérico da severidade"""
-        levels = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3, 'CRITICAL': 4}
-        return levels.get(severity, 0)
+        return SEVERITY_LEVELS.get(severity, 0)
     
-    def _handle_alert(self, alert: AlertEvent):
+    def _handle_alert(self, alert: AlertEvent, trace=NO_TRACE):
         """Processa um alerta"""
         try:
-            logger.info(f"[DEBUG] _handle_alert iniciado para {alert.esp_id} - {alert.alert_type} - {alert.severity}")
+            alerts_counter.labels(alert_type=alert.alert_type, severity=alert.severity).inc()
+            if self.on_alert is not None:
+                self.on_alert(alert)
             
-            # Verifica rate limiting
-            logger.info(f"[DEBUG] Verificando rate limiting...")
-            if not self.rate_limiter.can_send_alert(alert.esp_id, alert.alert_type):
-                logger.warning(f"[DEBUG] ⚠️ Rate limit atingido para {alert.esp_id}")
+            # Verifica e inicia o cooldown de email numa operação só: outra
+            # thread (lote, health check) com o mesmo alerta não passa junto.
+            # O cooldown vale mesmo com email desligado, para não gravar duplicatas
+            now = time.time()
+            expires_at = self.cooldowns.try_start(alert.esp_id, alert.alert_type, alert.severity, now)
+            if expires_at is None:
+                if trace:
+                    trace.event('cooldown', alert_type=alert.alert_type)
                 return
-            logger.info(f"[DEBUG] ✅ Rate limiting OK")
             
-            # Verifica cooldown de email
-            logger.info(f"[DEBUG] Verificando cooldown de email...")
-            if not self._can_send_email(alert.esp_id, alert.alert_type):
-                logger.info(f"[DEBUG] ⚠️ Cooldown ativo para {alert.esp_id}")
-                return
-            logger.info(f"[DEBUG] ✅ Cooldown OK")
+            # Rate limiting depois do cooldown: repetição suprimida não gasta os
+            # orçamentos compartilhados (tipo, global), e só email conta
+            if ALERT_CONFIG['notification']['enable_email']:
+                budget = self.rate_limiter.acquire(alert.esp_id, alert.alert_type)
+                if budget is not None:
+                    # O alerta não sai: o cooldown não pode segurar o próximo
+                    self.cooldowns.release(alert.esp_id, alert.alert_type, alert.severity, expires_at)
+                    rate_limited_counter.labels(alert_type=alert.alert_type, budget=budget).inc()
+                    logger.warning(f"⚠️ Rate limit ({budget}) atingido para {alert.esp_id} ({alert.alert_type})")
+                    return
+                if self.state_store is not None:
+                    self.state_store.append_rate_limit(alert.esp_id, alert.alert_type, now)
             
             # Salva no banco de dados
-            logger.info(f"[DEBUG] Salvando alerta no banco de dados...")
             self.db_manager.save_alert(alert)
-            logger.info(f"[DEBUG] ✅ Alerta salvo no banco")
             
             # Envia notificações
-            logger.info(f"[DEBUG] Enviando notificações...")
-            self._send_notifications(alert)
+            self._send_notifications(alert, trace)
             
-            # Atualiza histórico
+            # Atualiza histórico e persiste o cooldown
             self.last_alert_time[alert.esp_id] = datetime.now()
+            self._record_email_cooldown(alert, now, expires_at)
             
-            logger.info(f"[DEBUG] ✅ Alerta processado com sucesso: {alert.alert_type} para {alert.esp_id}")
+            if trace:
+                trace.event('alert_handled', alert_type=alert.alert_type, severity=alert.severity)
             
         except Exception as e:
-            logger.error(f"[DEBUG] ❌ Erro ao processar alerta: {e}")
+            logger.error(f"❌ Erro ao processar alerta: {e}")
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
     
-    def _can_send_email(self, esp_id: str, alert_type: str) -> bool:
-        """Verifica se pode enviar email (cooldown)"""
-        key = f"{esp_id}_{alert_type}"
-        last_sent = self.last_alert_time.get(esp_id)
-        
-        if last_sent is None:
-            return True
-        
-        cooldown_time = ALERT_CONFIG['cooldown']['email']
-        return (datetime.now() - last_sent).total_seconds() >= cooldown_time
-    
     def _is_test_sensor(self, esp_id: str) -> bool:
         """Verifica se é um sensor de teste que não deve enviar email"""
         return esp_id in self.test_sensor_blacklist or esp_id.startswith('test_')
     
-    def _send_notifications(self, alert: AlertEvent):
+    def _send_notifications(self, alert: AlertEvent, trace=NO_TRACE):
         """Envia notificações de alerta"""
         try:
-            logger.info(f"[DEBUG] _send_notifications iniciado para {alert.esp_id} - {alert.alert_type}")
-            
             # Dupla verificação - só sensores válidos chegam aqui
             if not self._is_sensor_valido(alert.esp_id):
                 logger.error(f"🚫 ERRO: Sensor inválido '{alert.esp_id}' chegou ao envio de notificação")
                 return
             
-            # Verifica cooldown
-            if not self._can_send_email(alert.esp_id, alert.alert_type):
-                logger.info(f"[DEBUG] ⏳ Cooldown ativo para {alert.esp_id} - {alert.alert_type}")
+            # Cooldown já verificado e iniciado em _handle_alert (try_start)
+            if not ALERT_CONFIG['notification']['enable_email']:
                 return
             
-            # Envia email
-            self.email_sender.send_alert_email(alert)
-            alert.sent = True
-            
-            # Atualiza cooldown
-            self._update_email_cooldown(alert.esp_id, alert.alert_type)
-            
-            logger.info(f"[DEBUG] ✅ Email enviado com sucesso para sensor {alert.esp_id}")
+            # Enfileira o email (gráfico + SMTP rodam nos workers do despachante)
+            started = time.perf_counter()
+            queued = self.notifier.submit(alert)
+            STAGE_NOTIFY_ENQUEUE.observe(time.perf_counter() - started)
+            if queued:
+                if trace:
+                    trace.event('email_queued', alert_type=alert.alert_type)
             
         except Exception as e:
             logger.error(f"Erro ao enviar notificações: {e}")
-            alert.retry_count += 1
     
-    def _update_email_cooldown(self, esp_id: str, alert_type: str):
-        """Atualiza cooldown de email"""
-        self.last_alert_time[esp_id] = datetime.now()
+    def _record_email_cooldown(self, alert: AlertEvent, now: float, expires_at: float):
+        """Grava no banco (e no log de estado) o cooldown iniciado por try_start"""
+        self.db_manager.save_cooldown(alert.esp_id, alert.alert_type, alert.severity, expires_at)
+        if self.state_store is not None:
+            self.state_store.append_alert(alert.esp_id, alert.alert_type, alert.severity, now)
+    
+    def _restore_cooldowns(self):
+        """Recarrega os cooldowns ainda ativos para não repetir emails após reinicialização"""
+        try:
+            restored = self.cooldowns.restore(self.db_manager.load_cooldowns(time.time()))
+            if restored:
+                logger.info(f"Restaurados {restored} cooldowns de email ativos")
+        except Exception as e:
+            logger.error(f"Erro ao restaurar cooldowns: {e}")
+    
+    def _arm_offline_deadline(self, esp_id: str, last_seen: datetime):
+        """Agenda a transição para offline do sensor"""
+        offline_threshold = ALERT_CONFIG['cooldown']['sensor_offline']
+        self.offline_deadlines.arm(esp_id, last_seen.timestamp() + offline_threshold)
     
     def check_sensor_health(self):
-        """Verifica saúde dos sensores (offline)"""
+        """Verifica saúde dos sensores (offline): só os prazos vencidos, sem varrer todos"""
         now = datetime.now()
-        offline_threshold = ALERT_CONFIG['cooldown']['sensor_offline']
         
-        for esp_id, sensor in self.sensors.items():
-            if sensor.status == 'online':
-                time_since_last_seen = (now - sensor.last_seen).total_seconds()
-                
-                if time_since_last_seen > offline_threshold:
-                    sensor.status = 'offline'
-                    offline_alert = AlertEvent(
-                        esp_id=esp_id,
-                        alert_type='sensor_offline',
-                        severity='HIGH',
-                        message=ALERT_MESSAGES['sensor_offline']['template'].format(esp_id=esp_id),
-                        timestamp=now,
-                        data={
-                            'last_seen': sensor.last_seen.isoformat(),
-                            'custom_title': ALERT_MESSAGES['sensor_offline']['title'].format(esp_id=esp_id)
-                        }
-                    )
-                    self._handle_alert(offline_alert)
+        # Leituras retidas na reordenação de sensores que pararam de enviar
+        self.release_reordered_readings(now.timestamp())
+        
+        for esp_id in self.offline_deadlines.pop_expired(now.timestamp()):
+            sensor = self.sensors.get(esp_id)
+            if sensor is None or sensor.status != 'online':
+                continue
+            
+            sensor.status = 'offline'
+            offline_alert = AlertEvent(
+                esp_id=esp_id,
+                alert_type='sensor_offline',
+                severity='HIGH',
+                message=ALERT_MESSAGES['sensor_offline']['template'].format(esp_id=esp_id),
+                timestamp=now,
+                data={
+                    'last_seen': sensor.last_seen.isoformat(),
+                    'custom_title': ALERT_MESSAGES['sensor_offline']['title'].format(esp_id=esp_id)
+                }
+            )
+            self._handle_alert(offline_alert)
     
     def _cleanup_old_data(self):
         """Remove dados antigos"""
         try:
-            # Remove alertas antigos (mais de 30 dias)
-            cutoff_date = datetime.now() - timedelta(days=30)
-            self.last_alert_time = {k: v for k, v in self.last_alert_time.items() if v > cutoff_date}
+            self._prune_alert_history()
             
-            # Limpa cooldowns antigos
-            now = datetime.now()
-            self.last_alert_time = {k: v for k, v in self.last_alert_time.items() if (now - v).total_seconds() < 3600}  # 1 hora
+            # Expira partições inteiras do histórico de leituras
+            self.db_manager.drop_expired_partitions(DATABASE_CONFIG['sqlite']['readings_retention_days'])
             
             logger.info("Limpeza de dados antigos concluída")
             
         except Exception as e:
             logger.error(f"Erro na limpeza de dados: {e}")
     
+    def _prune_alert_history(self):
+        """Descarta horários de alerta antigos e cooldowns vencidos (só memória)"""
+        # Remove alertas antigos (mais de 30 dias)
+        cutoff_date = datetime.now() - timedelta(days=30)
+        self.last_alert_time = {k: v for k, v in self.last_alert_time.items() if v > cutoff_date}
+        
+        # Cooldowns vencidos saem do heap, sem varrer os ativos
+        self.cooldowns.expire()
+        
+        # Chaves do rate limiter com o balde cheio não precisam ficar em memória
+        self.rate_limiter.evict_idle()
+    
     def get_statistics(self) -> Dict:
         """Retorna estatísticas do sistema"""
         return {
             'total_sensors': len(self.sensors),
             'online_sensors': len([s for s in self.sensors.values() if s.status == 'online']),
+            'pending_offline_deadlines': len(self.offline_deadlines),
+            'reorder_pending_sensors': len(self._reorder_pending),
+            'late_readings': self.late_readings,
             'total_alerts': len(self.last_alert_time),
-            'alerts_today': len([a for a in self.last_alert_time if a.date() == datetime.now().date()]),
-            'rate_limiter_stats': self.rate_limiter.get_stats()
+            'alerts_today': len([a for a in self.last_alert_time.values() if a.date() == datetime.now().date()]),
+            'active_cooldowns': len(self.cooldowns),
+            'rate_limiter_stats': self.rate_limiter.get_stats(),
+            'notifier_stats': self.notifier.get_stats(),
+            'database_stats': self.db_manager.get_stats(),
+            'state_stats': dict(self.state_store.stats) if self.state_store else None,
+            'batch_stats': dict(self.batch_evaluator.stats) if self.batch_evaluator else None
         }
     
     def shutdown(self):
         """Desliga o sistema de alertas"""
         self.running = False
+        self.release_reordered_readings(drain=True)
+        if self.batch_evaluator is not None:
+            self.batch_evaluator.stop()
+        self.notifier.stop()
+        if self.state_store is not None:
+            try:
+                self.write_state_snapshot()
+            except Exception as e:
+                logger.error(f"Erro ao gravar snapshot de estado: {e}")
+            self.state_store.close()
+        self.db_manager.close()
+        self.sensor_registry.stop()
         logger.info("Sistema de alertas desligado")
 
 # ============================================================================
 # CLASSES AUXILIARES
 # ============================================================================
 
-class RateLimiter:
-    """Controla rate limiting de alertas"""
+class DatabaseManager:
+    """
+    Gerencia operações de banco de dados.
     
-    def __init__(self):
-        self.alert_counts = defaultdict(list)
-        self.lock = threading.Lock()
+    Usa uma única conexão persistente em modo WAL. As escritas vão para um
+    buffer (write-behind) gravado em uma transação a cada flush_interval_ms
+    ou quando acumula flush_max_rows linhas. Estados de sensor são
+    coalescidos por esp_id: só o mais recente de cada sensor é gravado.
     
-    def can_send_alert(self, esp_id: str, alert_type: str) -> bool:
-        """Verifica se pode enviar alerta"""
-        with self.lock:
-            now = datetime.now()
-            key = f"{esp_id}_{alert_type}"
+    O histórico bruto de leituras é particionado por dia em tabelas
+    sensor_readings_AAAAMMDD, cada uma com índice (esp_id, timestamp). A
+    view sensor_readings une as partições existentes e a expiração remove
+    partições inteiras com DROP TABLE, sem varreduras de DELETE.
+    """
+    
+    READINGS_PARTITION_PREFIX = 'sensor_readings_'
+    
+    SQL_INSERT_ALERT = '''
+        INSERT INTO alerts (esp_id, alert_type, severity, message, timestamp, data, sent)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    SQL_UPSERT_SENSOR_STATE = '''
+        INSERT OR REPLACE INTO sensor_states 
+        (esp_id, last_seen, temperature, humidity, status, alert_count, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    SQL_UPSERT_COOLDOWN = '''
+        INSERT OR REPLACE INTO alert_cooldowns (esp_id, alert_type, severity, expires_at)
+        VALUES (?, ?, ?, ?)
+    '''
+    
+    def __init__(self, db_path: str = None):
+        sqlite_config = DATABASE_CONFIG['sqlite']
+        self.db_path = db_path or sqlite_config['path']
+        self.flush_interval = sqlite_config['flush_interval_ms'] / 1000
+        self.flush_max_rows = sqlite_config['flush_max_rows']
+        self.busy_timeout_ms = sqlite_config['busy_timeout_ms']
+        
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        
+        # Buffer de escrita
+        self._buffer_lock = threading.Lock()
+        self._pending_states = {}
+        self._pending_alerts = []
+        self._pending_readings = []
+        self._pending_cooldowns = {}
+        self._partitions = set()
+        self._partitions_loaded = False
+        self._flush_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+        
+        self.stats = {
+            'flushes': 0,
+            'rows_written': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'errors': 0
+        }
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """Abre (uma única vez) a conexão persistente"""
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=64
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            self._conn = conn
+        return self._conn
+    
+    def init_database(self, start_writer: bool = True):
+        """Inicializa o banco de dados (start_writer=False: flush() chamado por fora)"""
+        with self._conn_lock:
+            conn = self._get_connection()
+            cursor = conn.cursor()
             
-            # Remove alertas antigos (última hora)
-            cutoff = now - timedelta(hours=1)
-            self.alert_counts[key] = [t for t in self.alert_counts[key] if t > cutoff]
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    esp_id TEXT NOT NULL,
+                    alert_type TEXT NOT NULL,
+                    severity TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    data TEXT,
+                    sent INTEGER DEFAULT 0,
+                    retry_count INTEGER DEFAULT 0
+                )
+            ''')
             
-            # Verifica limite
-            max_alerts = SECURITY_CONFIG['rate_limiting']['max_emails_per_hour']
-            if len(self.alert_counts[key]) >= max_alerts:
-                return False
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sensor_states (
+                    esp_id TEXT PRIMARY KEY,
+                    last_seen TEXT NOT NULL,
+                    temperature REAL,
+                    humidity REAL,
+                    status TEXT NOT NULL,
+                    alert_count INTEGER DEFAULT 0,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
             
-            # Adiciona novo alerta
-            self.alert_counts[key].append(now)
-            return True
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS alert_cooldowns (
+                    esp_id TEXT NOT NULL,
+                    alert_type TEXT NOT NULL,
+                    severity TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (esp_id, alert_type, severity)
+                )
+            ''')
+            
+            conn.commit()
+        
+        if start_writer:
+            self._start_flush_thread()
     
-    def get_stats(self) -> Dict:
-        """Retorna estatísticas do rate limiter"""
-        with self.lock:
-            return {
-                'active_limits': len(self.alert_counts),
-                'total_limited_keys': sum(1 for v in self.alert_counts.values() if len(v) > 0)
-            }
-
-class DatabaseManager:
-    """Gerencia operações de banco de dados"""
+    def _start_flush_thread(self):
+        """Inicia thread que grava o buffer periodicamente"""
+        if self._flush_thread is not None:
+            return
+        
+        def flush_worker():
+            while not self._stop_event.is_set():
+                self._flush_event.wait(self.flush_interval)
+                self._flush_event.clear()
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Erro na thread de escrita do banco: {e}")
+        
+        self._flush_thread = threading.Thread(target=flush_worker, name='db-writer', daemon=True)
+        self._flush_thread.start()
     
-    def __init__(self):
-        self.db_path = '/app/data/alerts.db'
+    def _pending_rows(self) -> int:
+        """Linhas aguardando gravação (chamado com o lock do buffer)"""
+        return (len(self._pending_states) + len(self._pending_alerts) +
+                len(self._pending_readings) + len(self._pending_cooldowns))
     
-    def init_database(self):
-        """Inicializa o banco de dados"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+    def pending_rows(self) -> int:
+        """Linhas aguardando gravação, sem lock (aproximado; para métricas)"""
+        return self._pending_rows()
+    
+    # ------------------------------------------------------------------------
+    # PARTIÇÕES DO HISTÓRICO DE LEITURAS
+    # ------------------------------------------------------------------------
+    
+    def _list_partitions(self, conn: sqlite3.Connection) -> List[str]:
+        """Partições existentes (sufixos AAAAMMDD) em ordem cronológica"""
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+            (self.READINGS_PARTITION_PREFIX + '[0-9]*',)
+        ).fetchall()
+        prefix_len = len(self.READINGS_PARTITION_PREFIX)
+        return sorted(name[prefix_len:] for (name,) in rows)
+    
+    def _rebuild_readings_view(self, conn: sqlite3.Connection):
+        """Recria a view sensor_readings sobre as partições atuais"""
+        conn.execute('DROP VIEW IF EXISTS sensor_readings')
+        if not self._partitions:
+            return
+        selects = ' UNION ALL '.join(
+            f'SELECT esp_id, temperature, humidity, timestamp FROM {self.READINGS_PARTITION_PREFIX}{day}'
+            for day in sorted(self._partitions)
+        )
+        conn.execute(f'CREATE VIEW sensor_readings AS {selects}')
+    
+    def _ensure_partition(self, conn: sqlite3.Connection, day: str):
+        """Cria a partição do dia (e seu índice) se ainda não existir"""
+        if not self._partitions_loaded:
+            self._partitions = set(self._list_partitions(conn))
+            self._partitions_loaded = True
+        if day in self._partitions:
+            return
+        table = f'{self.READINGS_PARTITION_PREFIX}{day}'
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
                 esp_id TEXT NOT NULL,
-                alert_type TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                message TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                data TEXT,
-                sent INTEGER DEFAULT 0,
-                retry_count INTEGER DEFAULT 0
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sensor_states (
-                esp_id TEXT PRIMARY KEY,
-                last_seen TEXT NOT NULL,
                 temperature REAL,
                 humidity REAL,
-                status TEXT NOT NULL,
-                alert_count INTEGER DEFAULT 0,
-                updated_at TEXT NOT NULL
+                timestamp TEXT NOT NULL
             )
         ''')
-        
-        conn.commit()
-        conn.close()
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_esp_ts ON {table} (esp_id, timestamp)')
+        self._partitions.add(day)
+        self._rebuild_readings_view(conn)
+    
+    def drop_expired_partitions(self, retention_days: int) -> List[str]:
+        """Remove partições inteiras mais antigas que retention_days"""
+        oldest_kept = (datetime.now() - timedelta(days=retention_days)).strftime('%Y%m%d')
+        
+        with self._conn_lock:
+            conn = self._get_connection()
+            self._partitions = set(self._list_partitions(conn))
+            self._partitions_loaded = True
+            expired = sorted(day for day in self._partitions if day < oldest_kept)
+            if not expired:
+                return []
+            with conn:
+                for day in expired:
+                    conn.execute(f'DROP TABLE IF EXISTS {self.READINGS_PARTITION_PREFIX}{day}')
+                    self._partitions.discard(day)
+                self._rebuild_readings_view(conn)
+        
+        logger.info(f"Partições de leituras expiradas removidas: {', '.join(expired)}")
+        return expired
     
     def save_alert(self, alert: AlertEvent):
-        """Salva alerta no banco de dados"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO alerts (esp_id, alert_type, severity, message, timestamp, data, sent)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """Enfileira alerta para gravação no banco de dados"""
+        row = (
             alert.esp_id,
             alert.alert_type,
             alert.severity,
@@ -718,21 +1193,18 @@ class DatabaseManager:
             alert.timestamp.isoformat(),
             json.dumps(alert.data),
             1 if alert.sent else 0
-        ))
+        )
         
-        conn.commit()
-        conn.close()
+        with self._buffer_lock:
+            self._pending_alerts.append(row)
+            full = self._pending_rows() >= self.flush_max_rows
+        
+        if full:
+            self._flush_event.set()
     
     def save_sensor_state(self, sensor: SensorState):
-        """Salva estado do sensor no banco de dados"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO sensor_states 
-            (esp_id, last_seen, temperature, humidity, status, alert_count, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """Enfileira estado do sensor para gravação no banco de dados"""
+        row = (
             sensor.esp_id,
             sensor.last_seen.isoformat(),
             sensor.temperature,
@@ -740,24 +1212,110 @@ class DatabaseManager:
             sensor.status,
             sensor.alert_count,
             datetime.now().isoformat()
-        ))
+        )
+        
+        with self._buffer_lock:
+            self._pending_states[sensor.esp_id] = row
+            full = self._pending_rows() >= self.flush_max_rows
+        
+        if full:
+            self._flush_event.set()
+    
+    def save_cooldown(self, esp_id: str, alert_type: str, severity: str, expires_at: float):
+        """Enfileira o prazo de um cooldown de email (coalescido por chave)"""
+        with self._buffer_lock:
+            self._pending_cooldowns[(esp_id, alert_type, severity)] = expires_at
+            full = self._pending_rows() >= self.flush_max_rows
+        
+        if full:
+            self._flush_event.set()
+    
+    def save_reading(self, esp_id: str, temperature: float, humidity: float, timestamp: datetime):
+        """Enfileira uma leitura bruta para a partição do dia"""
+        row = (esp_id, temperature, humidity, timestamp.isoformat())
         
-        conn.commit()
-        conn.close()
+        with self._buffer_lock:
+            self._pending_readings.append(row)
+            full = self._pending_rows() >= self.flush_max_rows
+        
+        if full:
+            self._flush_event.set()
+    
+    def flush(self):
+        """Grava o buffer pendente em uma única transação"""
+        with self._buffer_lock:
+            if not self._pending_rows():
+                return
+            states = self._pending_states
+            alerts = self._pending_alerts
+            readings = self._pending_readings
+            cooldowns = self._pending_cooldowns
+            self._pending_states = {}
+            self._pending_alerts = []
+            self._pending_readings = []
+            self._pending_cooldowns = {}
+        
+        # Agrupa leituras por partição (dia do timestamp ISO)
+        readings_by_day = defaultdict(list)
+        for row in readings:
+            readings_by_day[row[3][:10].replace('-', '')].append(row)
+        
+        rows = len(alerts) + len(states) + len(readings) + len(cooldowns)
+        started = time.perf_counter()
+        try:
+            with self._conn_lock:
+                conn = self._get_connection()
+                with conn:
+                    if alerts:
+                        conn.executemany(self.SQL_INSERT_ALERT, alerts)
+                    if states:
+                        conn.executemany(self.SQL_UPSERT_SENSOR_STATE, states.values())
+                    if cooldowns:
+                        conn.executemany(self.SQL_UPSERT_COOLDOWN,
+                                         [key + (expires_at,) for key, expires_at in cooldowns.items()])
+                    for day, day_rows in readings_by_day.items():
+                        self._ensure_partition(conn, day)
+                        conn.executemany(
+                            f'INSERT INTO {self.READINGS_PARTITION_PREFIX}{day} '
+                            f'(esp_id, temperature, humidity, timestamp) VALUES (?, ?, ?, ?)',
+                            day_rows
+                        )
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Erro ao gravar buffer no banco ({rows} linhas): {e}")
+            
+            # Partições criadas na transação desfeita precisam ser recriadas
+            self._partitions_loaded = False
+            
+            # Devolve ao buffer sem sobrescrever estados mais novos
+            with self._buffer_lock:
+                self._pending_alerts[:0] = alerts
+                self._pending_readings[:0] = readings
+                for esp_id, row in states.items():
+                    self._pending_states.setdefault(esp_id, row)
+                for key, expires_at in cooldowns.items():
+                    self._pending_cooldowns.setdefault(key, expires_at)
+            return
+        
+        elapsed = time.perf_counter() - started
+        STAGE_DB_WRITE.observe(elapsed)
+        duration_ms = elapsed * 1000
+        self.stats['flushes'] += 1
+        self.stats['rows_written'] += rows
+        self.stats['last_flush_ms'] = duration_ms
+        self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], duration_ms)
     
     def load_sensor_states(self) -> List[Dict]:
         """Carrega todos os estados dos sensores do banco de dados"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT esp_id, last_seen, temperature, humidity, status, alert_count, updated_at
-            FROM sensor_states
-            ORDER BY updated_at DESC
-        ''')
+        self.flush()
         
-        rows = cursor.fetchall()
-        conn.close()
+        with self._conn_lock:
+            cursor = self._get_connection().execute('''
+                SELECT esp_id, last_seen, temperature, humidity, status, alert_count, updated_at
+                FROM sensor_states
+                ORDER BY updated_at DESC
+            ''')
+            rows = cursor.fetchall()
         
         sensors = []
         for row in rows:
@@ -772,114 +1330,60 @@ class DatabaseManager:
             })
         
         return sensors
+    
+    def load_cooldowns(self, now: float) -> List[Tuple[str, str, str, float]]:
+        """Descarta cooldowns vencidos e retorna os ativos (esp_id, alert_type, severity, prazo)"""
+        self.flush()
+        
+        with self._conn_lock:
+            conn = self._get_connection()
+            with conn:
+                conn.execute('DELETE FROM alert_cooldowns WHERE expires_at <= ?', (now,))
+            rows = conn.execute(
+                'SELECT esp_id, alert_type, severity, expires_at FROM alert_cooldowns'
+            ).fetchall()
+        
+        return [tuple(row) for row in rows]
+    
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas de escrita"""
+        with self._buffer_lock:
+            pending = self._pending_rows()
+        return dict(self.stats, pending_rows=pending)
+    
+    def close(self):
+        """Grava o que restou no buffer e fecha a conexão"""
+        self._stop_event.set()
+        self._flush_event.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join(timeout=5)
+            self._flush_thread = None
+        
+        self.flush()
+        
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# Figura persistente compartilhada pelos workers de notificação
+chart_renderer = TemperatureChartRenderer()
 
-def gerar_grafico_temperatura(sensor_data: Dict[str, SensorState], periodo_minutos=10):
+def gerar_grafico_temperatura(sensor_data: Dict[str, SensorState], periodo_minutos=10, lock=None):
     """
     Gera gráfico de temperatura dos últimos minutos usando matplotlib
     
     Args:
         sensor_data: Dicionário com dados dos sensores
         periodo_minutos: Período em minutos para mostrar no gráfico
+        lock: Lock de quem atualiza as janelas dos sensores (cópia consistente)
     
     Returns:
         bytes: Imagem PNG do gráfico
     """
     try:
         logger.info(f"Gerando gráfico de temperatura (últimos {periodo_minutos} minutos)")
-        
-        # Configura o gráfico
-        plt.style.use('default')
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Cor de fundo
-        fig.patch.set_facecolor('white')
-        ax.set_facecolor('#f8f9fa')
-        
-        # Timestamp de corte
-        agora = datetime.now()
-        tempo_corte = agora - timedelta(minutes=periodo_minutos)
-        
-        # Plota dados de cada sensor
-        cores = {'a': '#ff6b6b', 'b': '#4ecdc4', 'test_dashboard': '#45b7d1', 'test_dashboard_var': '#96ceb4'}
-        
-        sensores_plotados = 0
-        
-        for esp_id, sensor in sensor_data.items():
-            if not sensor.temperature_history:
-                continue
-                
-            # Filtra dados do período
-            temperaturas = []
-            timestamps = []
-            
-            for reading in sensor.temperature_history:
-                if reading.timestamp >= tempo_corte:
-                    temperaturas.append(reading.temperature)
-                    timestamps.append(reading.timestamp)
-            
-            if len(temperaturas) < 2:
-                continue
-                
-            # Plota linha do sensor
-            cor = cores.get(esp_id, '#555555')
-            ax.plot(timestamps, temperaturas, 
-                   marker='o', markersize=4, linewidth=2, 
-                   color=cor, label=f'Sensor {esp_id.upper()}', alpha=0.8)
-            
-            sensores_plotados += 1
-        
-        # Se não há dados, criar gráfico vazio com mensagem
-        if sensores_plotados == 0:
-            ax.text(0.5, 0.5, f'📊 Aguardando dados de temperatura\n(últimos {periodo_minutos} minutos)', 
-                   transform=ax.transAxes, fontsize=14, ha='center', va='center',
-                   bbox=dict(boxstyle="round,pad=0.3", facecolor='lightgray', alpha=0.5))
-            
-            # Configura eixos vazios
-            ax.set_xlim(tempo_corte, agora)
-            ax.set_ylim(15, 35)
-        else:
-            # Formata eixo X (tempo)
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-            ax.xaxis.set_major_locator(mdates.MinuteLocator(interval=2))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
-            
-            # Adiciona grade
-            ax.grid(True, alpha=0.3, linestyle='--')
-            
-            # Adiciona legenda
-            if sensores_plotados > 1:
-                ax.legend(loc='upper left', frameon=True, fancybox=True, shadow=True)
-        
-        # Configurações do gráfico
-        ax.set_xlabel('Horário', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Temperatura (°C)', fontsize=12, fontweight='bold')
-        ax.set_title(f'📈 Temperatura dos Sensores - Últimos {periodo_minutos} minutos', 
-                    fontsize=14, fontweight='bold', pad=20)
-        
-        # Adiciona timestamp
-        timestamp_str = agora.strftime('%d/%m/%Y %H:%M:%S')
-        ax.text(0.99, 0.01, f'Gerado em {timestamp_str}', 
-               transform=ax.transAxes, fontsize=8, ha='right', va='bottom',
-               bbox=dict(boxstyle="round,pad=0.2", facecolor='white', alpha=0.8))
-        
-        # Ajusta layout
-        plt.tight_layout()
-        
-        # Salva em buffer
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight', 
-                   facecolor='white', edgecolor='none')
-        buffer.seek(0)
-        
-        # Pega os bytes
-        imagem_bytes = buffer.getvalue()
-        
-        # Limpa recursos
-        plt.close(fig)
-        buffer.close()
-        
-        logger.info(f"Gráfico gerado com sucesso! Tamanho: {len(imagem_bytes)} bytes")
-        return imagem_bytes
+        return chart_renderer.render(sensor_data, periodo_minutos, lock)
         
     except Exception as e:
         logger.error(f"Erro ao gerar gráfico de temperatura: {e}")
@@ -972,7 +1476,9 @@ class EmailSender:
             logger.info(f"Preparando gráfico para email (período: {graph_period} minutos)")
             
             if self.alert_manager:
-                grafico = gerar_grafico_temperatura(self.alert_manager.sensors, graph_period)
+                # Janelas copiadas com o lock de eventos: a ingestão segue inserindo leituras
+                grafico = gerar_grafico_temperatura(self.alert_manager.sensors, graph_period,
+                                                    self.alert_manager._event_lock)
                 if grafico:
                     mime_img = MIMEImage(grafico)
                     mime_img.add_header('Content-ID', '<grafico_temperatura>')
@@ -0,0 +1,319 @@
+# ============================================================================
+# RUNTIME ASYNCIO DO SISTEMA DE ALERTAS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Alternativa ao modelo de threads do main.py, ativada com ALERT_RUNTIME=asyncio.
+# Um único event loop executa:
+#   - o cliente MQTT (socket do paho registrado no loop, sem loop_start)
+#   - health check, estatísticas, limpeza e recarga do registro como timers
+#   - a gravação do buffer do banco e os workers de notificação como tasks
+# Todo o estado do AlertManager (sensors, last_alert_time, rate limiter...)
+# passa a ser alterado só na thread do loop. O que bloqueia (commit no
+# SQLite, gráfico + SMTP) roda em executors dedicados.
+
+import asyncio
+import logging
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import paho.mqtt.client as mqtt
+
+from config import MQTT_CONFIG, ALERT_CONFIG, DATABASE_CONFIG, SENSOR_REGISTRY_CONFIG, MONITORING_CONFIG
+from alert_manager import AlertManager
+from main import ClusterMonitoringSystem
+from metrics import ingest_metrics
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# INTEGRAÇÃO DO PAHO COM O EVENT LOOP
+# ============================================================================
+
+class AsyncioMqttAdapter:
+    """Registra o socket do cliente paho no event loop (no lugar de loop_start)"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, client: mqtt.Client,
+                 on_close=None, max_packets: int = 64):
+        self.loop = loop
+        self.client = client
+        self.on_close = on_close
+        self.max_packets = max_packets
+        self._misc_task = None
+
+        client.on_socket_open = self._on_socket_open
+        client.on_socket_close = self._on_socket_close
+        client.on_socket_register_write = self._on_socket_register_write
+        client.on_socket_unregister_write = self._on_socket_unregister_write
+
+    def _on_socket_open(self, client, userdata, sock):
+        self.loop.add_reader(sock, self._read)
+        self._misc_task = self.loop.create_task(self._misc_loop(), name='mqtt-misc')
+
+    def _on_socket_close(self, client, userdata, sock):
+        self.loop.remove_reader(sock)
+        self.loop.remove_writer(sock)
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+            self._misc_task = None
+        if self.on_close:
+            self.on_close()
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self.loop.add_writer(sock, self.client.loop_write)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self.loop.remove_writer(sock)
+
+    def _read(self):
+        # Lê vários pacotes por evento de leitura (callbacks on_message rodam aqui)
+        self.client.loop_read(max_packets=self.max_packets)
+
+    async def _misc_loop(self):
+        """Keepalive (PINGREQ) e timeouts do paho, uma vez por segundo"""
+        try:
+            while self.client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+                await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            pass
+
+# ============================================================================
+# SISTEMA EM MODO ASYNCIO
+# ============================================================================
+
+class AsyncClusterMonitoringSystem(ClusterMonitoringSystem):
+    """ClusterMonitoringSystem com MQTT, timers, banco e envio em um único loop"""
+
+    def __init__(self):
+        super().__init__(AlertManager(start_threads=False))
+        self.loop = None
+        self.mqtt_adapter = None
+        self._timer_tasks = []
+        self._notification_tasks = []
+        self._stop_event = None
+        self._notify_event = None
+
+        # Executors para trabalho bloqueante
+        self.notification_workers = ALERT_CONFIG['notification']['workers']
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        self._blocking_executor = ThreadPoolExecutor(
+            max_workers=self.notification_workers, thread_name_prefix='notifier'
+        )
+
+    def _signal_handler(self, signum, frame):
+        """Handler para sinais de shutdown"""
+        logger.info(f"Recebido sinal {signum}, iniciando shutdown...")
+        self.stop()
+
+    def stop(self):
+        """Pede o encerramento do loop principal"""
+        self.running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    # ------------------------------------------------------------------------
+    # MQTT
+    # ------------------------------------------------------------------------
+
+    async def _connect(self):
+        """Conecta ao broker com backoff exponencial até conseguir"""
+        delay = 1
+        while self.running:
+            try:
+                logger.info(f"Conectando ao broker MQTT: {MQTT_CONFIG['broker']}:{MQTT_CONFIG['port']}")
+                # connect() abre o socket na thread do loop (on_socket_open registra o reader)
+                self.mqtt_client.connect(
+                    MQTT_CONFIG['broker'],
+                    MQTT_CONFIG['port'],
+                    MQTT_CONFIG['keepalive']
+                )
+                return
+            except Exception as e:
+                logger.error(f"Erro ao conectar ao MQTT: {e} (nova tentativa em {delay}s)")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 120)
+
+    def _on_connection_lost(self):
+        """Socket fechado: reconecta se o sistema ainda está rodando"""
+        if self.running:
+            self.loop.create_task(self._connect(), name='mqtt-reconnect')
+
+    # ------------------------------------------------------------------------
+    # TIMERS
+    # ------------------------------------------------------------------------
+
+    def _every(self, name: str, interval: float, fn):
+        """Cria uma task que executa fn (função ou corrotina) a cada interval"""
+        async def runner():
+            while self.running:
+                await asyncio.sleep(interval)
+                try:
+                    result = fn()
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Erro na tarefa periódica {name}: {e}")
+
+        task = self.loop.create_task(runner(), name=name)
+        self._timer_tasks.append(task)
+        return task
+
+    def _health_check(self):
+        self.alert_manager.check_sensor_health()
+        self.stats['last_health_check'] = datetime.now()
+        ingest_metrics.sample_backlog(self.mqtt_client)
+
+    async def _flush_database(self):
+        await self.loop.run_in_executor(self._db_executor, self.alert_manager.db_manager.flush)
+
+    async def _reload_registry(self):
+        await self.loop.run_in_executor(self._db_executor, self.alert_manager.sensor_registry.reload_if_changed)
+
+    async def _flush_state_log(self):
+        await self.loop.run_in_executor(self._db_executor, self.alert_manager.state_store.flush)
+
+    async def _snapshot_state(self):
+        # Captura no loop (dono do estado); arquivo gravado no executor do banco
+        data = self.alert_manager.write_state_snapshot(build_only=True)
+        await self.loop.run_in_executor(self._db_executor, self.alert_manager.state_store.write_snapshot, data)
+
+    async def _cleanup(self):
+        # Limpeza em memória no loop; DROP das partições no executor do banco
+        self.alert_manager._prune_alert_history()
+        await self.loop.run_in_executor(
+            self._db_executor,
+            self.alert_manager.db_manager.drop_expired_partitions,
+            DATABASE_CONFIG['sqlite']['readings_retention_days']
+        )
+        logger.info("Limpeza de dados antigos concluída")
+
+    def _start_timers(self):
+        manager = self.alert_manager
+        self._every('health-check', MONITORING_CONFIG['health_check_interval'], self._health_check)
+        self._every('stats', MONITORING_CONFIG['stats_interval'], self._report_statistics)
+        self._every('cleanup', MONITORING_CONFIG['cleanup_interval'], self._cleanup)
+        self._every('db-flush', manager.db_manager.flush_interval, self._flush_database)
+        if manager.state_store is not None:
+            state_config = DATABASE_CONFIG['state']
+            self._every('state-log', state_config['log_flush_interval'], self._flush_state_log)
+            self._every('state-snapshot', state_config['snapshot_interval'], self._snapshot_state)
+        if SENSOR_REGISTRY_CONFIG['reload_interval'] > 0:
+            self._every('registry-reload', SENSOR_REGISTRY_CONFIG['reload_interval'], self._reload_registry)
+        if manager.batch_evaluator is not None:
+            self._every('alert-batch', manager.batch_evaluator.max_delay, manager.batch_evaluator.flush_if_due)
+
+    # ------------------------------------------------------------------------
+    # NOTIFICAÇÕES
+    # ------------------------------------------------------------------------
+
+    async def _notification_worker(self):
+        """Retira alertas da fila e envia (gráfico + SMTP) no executor"""
+        notifier = self.alert_manager.notifier
+        while True:
+            item = notifier.poll()
+            if item is None:
+                if not self.running:
+                    return
+                # Sem await entre poll() e clear(): nenhum aviso de enqueue se perde
+                self._notify_event.clear()
+                # Retentativas vencem sem aviso: acorda também no prazo da próxima
+                retry_in = notifier.next_retry_in()
+                if notifier.queue_depth():
+                    continue
+                try:
+                    await asyncio.wait_for(self._notify_event.wait(), retry_in)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.loop.run_in_executor(self._blocking_executor, notifier.deliver, item)
+
+    def _start_notification_workers(self):
+        self._notify_event = asyncio.Event()
+        self.alert_manager.notifier.on_enqueue = lambda: self.loop.call_soon_threadsafe(self._notify_event.set)
+        for i in range(self.notification_workers):
+            self._notification_tasks.append(
+                self.loop.create_task(self._notification_worker(), name=f'notifier-{i}')
+            )
+
+    # ------------------------------------------------------------------------
+    # CICLO DE VIDA
+    # ------------------------------------------------------------------------
+
+    async def run_async(self):
+        """Executa o sistema até receber sinal de parada"""
+        self.loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.loop.add_signal_handler(sig, self.stop)
+
+        try:
+            logger.info("=== Iniciando Sistema de Monitoramento Inteligente de Clusters (asyncio) ===")
+            logger.info(f"Broker MQTT: {MQTT_CONFIG['broker']}:{MQTT_CONFIG['port']}")
+
+            self.setup_mqtt()
+            self.mqtt_adapter = AsyncioMqttAdapter(self.loop, self.mqtt_client, on_close=self._on_connection_lost)
+            self._start_notification_workers()
+            self._start_timers()
+            self.start_metrics_server()
+            await self._connect()
+
+            logger.info("Sistema iniciado com sucesso!")
+            await self._stop_event.wait()
+
+        except Exception as e:
+            logger.error(f"Erro no sistema principal: {e}")
+        finally:
+            await self.shutdown_async()
+
+    async def shutdown_async(self):
+        """Desliga o sistema de forma limpa"""
+        logger.info("Iniciando shutdown do sistema...")
+        self.running = False
+        manager = self.alert_manager
+
+        if self.http_server is not None:
+            self.http_server.stop()
+
+        # Desliga MQTT (o DISCONNECT é escrito e o socket fechado no loop)
+        if self.mqtt_client:
+            try:
+                self.mqtt_client.disconnect()
+                logger.info("Cliente MQTT desconectado")
+            except Exception as e:
+                logger.error(f"Erro ao desconectar MQTT: {e}")
+
+        # Avalia leituras retidas na reordenação e o lote pendente, e drena a fila de notificações
+        manager.release_reordered_readings(drain=True)
+        if manager.batch_evaluator is not None:
+            manager.batch_evaluator.flush()
+        if self._notify_event is not None:
+            self._notify_event.set()
+        deadline = self.loop.time() + 10
+        while manager.notifier.queue_depth() and self.loop.time() < deadline:
+            await asyncio.sleep(0.1)
+        # Fila vazia: retentativas ainda agendadas são descartadas
+        manager.notifier.stop(timeout=0)
+        if self._notification_tasks:
+            await asyncio.wait(self._notification_tasks, timeout=5)
+
+        for task in self._timer_tasks:
+            task.cancel()
+        await asyncio.gather(*self._timer_tasks, return_exceptions=True)
+
+        # Grava o buffer e fecha banco/registro no executor do banco
+        try:
+            await self.loop.run_in_executor(self._db_executor, manager.shutdown)
+        except Exception as e:
+            logger.error(f"Erro ao desligar sistema de alertas: {e}")
+
+        self._report_statistics()
+        self._db_executor.shutdown(wait=True)
+        self._blocking_executor.shutdown(wait=False)
+        logger.info("Sistema desligado com sucesso")
+
+
+def run_async():
+    """Ponto de entrada do runtime asyncio"""
+    system = AsyncClusterMonitoringSystem()
+    asyncio.run(system.run_async())
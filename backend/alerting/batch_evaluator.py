@@ -0,0 +1,292 @@
+# ============================================================================
+# AVALIAÇÃO DE ALERTAS EM LOTE (NUMPY)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Colunas da matriz de limites (uma linha por sensor do registro)
+COL_TEMP_CRITICAL_HIGH = 0
+COL_TEMP_HIGH = 1
+COL_TEMP_CRITICAL_LOW = 2
+COL_TEMP_LOW = 3
+COL_HUMIDITY_HIGH = 4
+COL_HUMIDITY_LOW = 5
+COL_VARIATION = 6
+
+# Códigos das cadeias if/elif de _check_alerts -> (tipo, severidade)
+TEMPERATURE_ALERTS = {
+    1: ('temperature_critical', 'CRITICAL'),
+    2: ('temperature_high', 'HIGH'),
+    3: ('temperature_critical', 'CRITICAL'),
+    4: ('temperature_low', 'HIGH')
+}
+HUMIDITY_ALERTS = {
+    1: ('humidity_high', 'MEDIUM'),
+    2: ('humidity_low', 'MEDIUM')
+}
+
+
+def _threshold_row(limits: Dict) -> List[float]:
+    return [
+        limits['temperature']['critical_high'],
+        limits['temperature']['high'],
+        limits['temperature']['critical_low'],
+        limits['temperature']['low'],
+        limits['humidity']['high'],
+        limits['humidity']['low'],
+        limits['variation']['temperature']
+    ]
+
+
+class ThresholdMatrix:
+    """Limites de todos os sensores do registro em uma matriz (n_sensores x 7)"""
+
+    def __init__(self, sensor_registry):
+        self.sensor_registry = sensor_registry
+        self.version = None
+        self.index = {}
+        self.matrix = None
+        self.default_row = 0
+
+    def refresh(self):
+        """Reconstrói a matriz se o registro mudou desde a última vez"""
+        registry = self.sensor_registry
+        if registry.version == self.version:
+            return
+
+        version = registry.version
+        esp_ids = registry.sensor_ids()
+        # Última linha: limites padrão, para sensores fora do índice
+        rows = [_threshold_row(registry.thresholds(esp_id)) for esp_id in esp_ids]
+        rows.append(_threshold_row(registry.default_thresholds))
+
+        self.index = {esp_id: i for i, esp_id in enumerate(esp_ids)}
+        self.default_row = len(esp_ids)
+        self.matrix = np.array(rows, dtype=np.float64)
+        self.version = version
+
+    def rows_for(self, esp_ids: List[str]) -> np.ndarray:
+        """Linhas da matriz para cada leitura do lote"""
+        index = self.index
+        default_row = self.default_row
+        return np.fromiter((index.get(esp_id, default_row) for esp_id in esp_ids),
+                           dtype=np.intp, count=len(esp_ids))
+
+
+class BatchAlertEvaluator:
+    """
+    Acumula leituras em colunas NumPy e avalia os limites de todas de uma vez.
+
+    O estado do sensor (histórico, variação) continua sendo atualizado por
+    leitura no AlertManager; aqui só entram temperatura, umidade e variação
+    já calculada. O lote é avaliado quando enche ou quando a leitura mais
+    antiga passa de max_delay_ms. Só as linhas que cruzam algum limite viram
+    AlertEvent, com o mesmo alerta que _check_alerts escolheria.
+    """
+
+    def __init__(self, alert_manager, max_size: int = 1024, max_delay_ms: float = 5):
+        self.alert_manager = alert_manager
+        self.max_size = max(1, max_size)
+        self.max_delay = max_delay_ms / 1000.0
+        self.thresholds = ThresholdMatrix(alert_manager.sensor_registry)
+
+        # Colunas pré-alocadas do lote corrente
+        self._temperature = np.empty(self.max_size, dtype=np.float64)
+        self._humidity = np.empty(self.max_size, dtype=np.float64)
+        self._variation = np.empty(self.max_size, dtype=np.float64)
+        self._esp_ids = []
+        self._traces = []
+        self._count = 0
+        self._oldest = 0.0
+
+        self._lock = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.stats = {
+            'batches': 0,
+            'readings': 0,
+            'alerts': 0,
+            'max_batch': 0,
+            'last_eval_ms': 0.0,
+            'max_eval_ms': 0.0
+        }
+
+    # ------------------------------------------------------------------------
+    # CICLO DE VIDA
+    # ------------------------------------------------------------------------
+
+    def start(self):
+        """Inicia a thread que avalia lotes parados há mais de max_delay"""
+        def flush_worker():
+            while not self._stop_event.is_set():
+                with self._lock:
+                    if self._count == 0:
+                        self._lock.wait(1.0)
+                        continue
+                    remaining = self._oldest + self.max_delay - time.monotonic()
+                    if remaining > 0:
+                        self._lock.wait(remaining)
+                        continue
+                    results = self._evaluate_locked()
+                self.handle(results)
+
+        self._thread = threading.Thread(target=flush_worker, name='alert-batch', daemon=True)
+        self._thread.start()
+        logger.info(f"Avaliação de alertas em lote ativa (lote={self.max_size}, "
+                    f"atraso máx={self.max_delay * 1000:.0f} ms)")
+
+    def stop(self):
+        """Avalia o que ficou pendente e para a thread"""
+        self._stop_event.set()
+        with self._lock:
+            self._lock.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    # ------------------------------------------------------------------------
+    # PRODUTOR
+    # ------------------------------------------------------------------------
+
+    def add(self, esp_id: str, temperature: Optional[float], humidity: Optional[float],
+            variation: float, trace=None) -> List[Tuple]:
+        """
+        Acrescenta uma leitura ao lote. Se o lote encheu, ele é avaliado na hora
+        e os alertas voltam como [(AlertEvent, trace)], sem tratar: o AlertManager
+        chama add() com _event_lock e só os trata (handle) depois de soltá-lo.
+        """
+        with self._lock:
+            i = self._count
+            if i == 0:
+                self._oldest = time.monotonic()
+                self._lock.notify()
+            self._temperature[i] = np.nan if temperature is None else temperature
+            self._humidity[i] = np.nan if humidity is None else humidity
+            self._variation[i] = variation
+            self._esp_ids.append(esp_id)
+            self._traces.append(trace)
+            self._count = i + 1
+
+            if self._count >= self.max_size:
+                return self._evaluate_locked()
+        return []
+
+    def flush(self):
+        """Avalia o lote corrente"""
+        with self._lock:
+            results = self._evaluate_locked()
+        self.handle(results)
+
+    def flush_if_due(self):
+        """Avalia o lote se a leitura mais antiga passou de max_delay"""
+        with self._lock:
+            if not self._count or time.monotonic() - self._oldest < self.max_delay:
+                return
+            results = self._evaluate_locked()
+        self.handle(results)
+
+    def handle(self, results: List[Tuple]):
+        """Trata os alertas de um lote, fora do lock do lote"""
+        # Roda na thread do lote, em paralelo com o caminho MQTT: o cooldown
+        # de _handle_alert é verificado e iniciado de forma atômica
+        # (CooldownIndex.try_start), então o mesmo alerta não sai duas vezes
+        self.alert_manager._handle_pending(results)
+
+    # ------------------------------------------------------------------------
+    # AVALIAÇÃO
+    # ------------------------------------------------------------------------
+
+    def _evaluate_locked(self) -> List[Tuple]:
+        """Avalia e esvazia o lote corrente (com self._lock); retorna os alertas sem tratar"""
+        count = self._count
+        if count == 0:
+            return []
+
+        started = time.perf_counter()
+        try:
+            results = self.evaluate(
+                self._esp_ids,
+                self._temperature[:count],
+                self._humidity[:count],
+                self._variation[:count],
+                self._traces
+            )
+        except Exception as e:
+            results = []
+            logger.error(f"Erro ao avaliar lote de {count} leituras: {e}")
+        finally:
+            self._esp_ids = []
+            self._traces = []
+            self._count = 0
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self.stats
+        stats['batches'] += 1
+        stats['readings'] += count
+        stats['alerts'] += len(results)
+        stats['max_batch'] = max(stats['max_batch'], count)
+        stats['last_eval_ms'] = round(elapsed_ms, 3)
+        stats['max_eval_ms'] = round(max(stats['max_eval_ms'], elapsed_ms), 3)
+        return results
+
+    def evaluate(self, esp_ids: List[str], temperature: np.ndarray, humidity: np.ndarray,
+                 variation: np.ndarray, traces: List = None) -> List[Tuple]:
+        """Retorna [(AlertEvent, trace)] das leituras que cruzaram algum limite"""
+        self.thresholds.refresh()
+        limits = self.thresholds.matrix[self.thresholds.rows_for(esp_ids)]
+
+        # Mesmas cadeias if/elif de _check_alerts, como np.select
+        temp_code = np.select(
+            [temperature >= limits[:, COL_TEMP_CRITICAL_HIGH],
+             temperature >= limits[:, COL_TEMP_HIGH],
+             temperature <= limits[:, COL_TEMP_CRITICAL_LOW],
+             temperature <= limits[:, COL_TEMP_LOW]],
+            [1, 2, 3, 4], 0
+        )
+        humidity_code = np.select(
+            [humidity >= limits[:, COL_HUMIDITY_HIGH],
+             humidity <= limits[:, COL_HUMIDITY_LOW]],
+            [1, 2], 0
+        )
+        variation_hit = variation >= limits[:, COL_VARIATION]
+
+        # Leituras sem temperatura ou umidade não geram alerta
+        valid = ~(np.isnan(temperature) | np.isnan(humidity))
+        hits = np.flatnonzero(valid & ((temp_code > 0) | (humidity_code > 0) | variation_hit))
+
+        results = []
+        manager = self.alert_manager
+        for i in hits:
+            esp_id = esp_ids[i]
+            data = {
+                'temperature': float(temperature[i]),
+                'humidity': float(humidity[i]),
+                'esp_id': esp_id
+            }
+
+            # Alerta que max(severidade) escolheria: temperatura (>= HIGH),
+            # depois variação (HIGH), depois umidade (MEDIUM)
+            if temp_code[i]:
+                alert_type, severity = TEMPERATURE_ALERTS[int(temp_code[i])]
+            elif variation_hit[i]:
+                alert_type, severity = 'temperature_variation', 'HIGH'
+                data['temperature_variation'] = float(variation[i])
+            else:
+                alert_type, severity = HUMIDITY_ALERTS[int(humidity_code[i])]
+
+            trace = traces[i] if traces else None
+            if trace:
+                trace.event('checked', detected=alert_type, batch=len(esp_ids))
+            results.append((manager._create_alert(esp_id, alert_type, severity, data), trace))
+
+        return results
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# ============================================================================
+# BENCHMARK DA AVALIAÇÃO DE ALERTAS EM LOTE
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Compara o custo de avaliar os limites de alerta por leitura:
+#   antes  - AlertManager._check_alerts (if/elif por leitura)
+#   depois - BatchAlertEvaluator.evaluate (comparações NumPy por lote)
+# Nos dois cenários a variação de 5 min vem do histórico real do sensor.
+#
+# Uso: python bench_batch.py [--sensors 5000] [--readings 100000] [--batch 1024]
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault('ALERTS_DB_PATH', os.path.join(_tmp.name, 'alerts.db'))
+os.environ.setdefault('SENSOR_REGISTRY_PATH', os.path.join(_tmp.name, 'sensors.db'))
+
+from config import ALERT_CONFIG
+ALERT_CONFIG['notification']['enable_email'] = False
+
+from alert_manager import AlertManager, SensorState
+from batch_evaluator import BatchAlertEvaluator
+
+
+def _setup(manager: AlertManager, count: int):
+    """Cadastra count sensores (10% com override) e preenche o histórico"""
+    now = datetime.now().isoformat()
+    rows = [
+        (f"esp{i:05d}", now, json.dumps({'temperature': {'high': 25.0}}) if i % 10 == 0 else None)
+        for i in range(count)
+    ]
+    conn = sqlite3.connect(manager.sensor_registry.db_path)
+    with conn:
+        conn.executemany('INSERT OR REPLACE INTO sensor_registry (esp_id, updated_at, thresholds) '
+                         'VALUES (?, ?, ?)', rows)
+    conn.close()
+    manager.sensor_registry.load()
+
+    started = time.time()
+    for esp_id, _, _ in rows:
+        sensor = SensorState(esp_id=esp_id, last_seen=datetime.now(), temperature=22.0,
+                             humidity=50.0, status='online')
+        for step in range(150, 0, -1):
+            sensor.temperature_history.append(started - step * 2, 22.0 + (step % 7) * 0.2)
+        manager.sensors[esp_id] = sensor
+    return [esp_id for esp_id, _, _ in rows]
+
+
+def _readings(esp_ids, count: int):
+    """Leituras normais com ~1% cruzando algum limite"""
+    rng = random.Random(42)
+    readings = []
+    for _ in range(count):
+        temperature = rng.uniform(19.0, 24.0)
+        humidity = rng.uniform(40.0, 60.0)
+        if rng.random() < 0.01:
+            temperature = rng.uniform(27.0, 32.0)
+        readings.append((rng.choice(esp_ids), temperature, humidity))
+    return readings
+
+
+def bench_sequential(manager: AlertManager, readings) -> tuple:
+    started = time.perf_counter()
+    alerts = 0
+    for esp_id, temperature, humidity in readings:
+        data = {'temperature': temperature, 'humidity': humidity, 'esp_id': esp_id}
+        if manager._check_alerts(esp_id, data):
+            alerts += 1
+    return len(readings) / (time.perf_counter() - started), alerts
+
+
+def bench_batch(manager: AlertManager, readings, batch_size: int) -> tuple:
+    evaluator = BatchAlertEvaluator(manager, max_size=batch_size)
+    evaluator.thresholds.refresh()
+
+    started = time.perf_counter()
+    alerts = 0
+    for start in range(0, len(readings), batch_size):
+        chunk = readings[start:start + batch_size]
+        esp_ids = [esp_id for esp_id, _, _ in chunk]
+        variation = np.fromiter((manager._calculate_temperature_variation_5min(esp_id) for esp_id in esp_ids),
+                                dtype=np.float64, count=len(chunk))
+        temperature = np.fromiter((t for _, t, _ in chunk), dtype=np.float64, count=len(chunk))
+        humidity = np.fromiter((h for _, _, h in chunk), dtype=np.float64, count=len(chunk))
+        alerts += len(evaluator.evaluate(esp_ids, temperature, humidity, variation))
+    return len(readings) / (time.perf_counter() - started), alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da avaliação de alertas em lote')
+    parser.add_argument('--sensors', type=int, default=5000, help='Sensores cadastrados (padrão: 5000)')
+    parser.add_argument('--readings', type=int, default=100000, help='Leituras avaliadas (padrão: 100000)')
+    parser.add_argument('--batch', type=int, default=1024, help='Tamanho do lote (padrão: 1024)')
+    args = parser.parse_args()
+
+    manager = AlertManager()
+    esp_ids = _setup(manager, args.sensors)
+    readings = _readings(esp_ids, args.readings)
+    print(f"=== Benchmark de avaliação: {args.sensors} sensores, {args.readings} leituras, "
+          f"lote={args.batch} ===")
+
+    sequential, alerts_seq = bench_sequential(manager, readings)
+    print(f"📉 Antes  (if/elif por leitura): {sequential:10.0f} leituras/s ({alerts_seq} alertas)")
+
+    batch, alerts_batch = bench_batch(manager, readings, args.batch)
+    print(f"📈 Depois (NumPy em lote):       {batch:10.0f} leituras/s ({alerts_batch} alertas)")
+
+    if alerts_seq != alerts_batch:
+        print("⚠️ Número de alertas diferente entre os modos!")
+    print(f"🚀 Ganho: {batch / sequential:.1f}x")
+
+    manager.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# ============================================================================
+# BENCHMARK DO GRÁFICO DOS EMAILS DE ALERTA
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Compara o tempo de renderização do gráfico por alerta:
+#   antes     - figura nova + tight_layout + savefig(bbox_inches='tight')
+#   depois    - TemperatureChartRenderer (figura persistente, só set_data)
+#   memoizado - rajada de alertas sobre a mesma leitura (PNG reutilizado)
+#
+# Uso: python bench_chart.py [--sensors 2] [--alerts 20]
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from io import BytesIO
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+
+from alert_manager import SensorState
+from chart_renderer import TemperatureChartRenderer
+
+
+def _make_sensors(count: int, periodo_minutos: int):
+    """Cria sensores com uma leitura a cada 2s no período"""
+    now = time.time()
+    sensors = {}
+    for i in range(count):
+        esp_id = 'ab'[i] if i < 2 else f"esp{i:03d}"
+        sensor = SensorState(esp_id=esp_id, last_seen=datetime.now(), temperature=22.0,
+                             humidity=50.0, status='online')
+        for step in range(periodo_minutos * 30, 0, -1):
+            sensor.temperature_history.append(now - step * 2, 22.0 + (step % 17) * 0.1 + i)
+        sensors[esp_id] = sensor
+    return sensors
+
+
+def legacy_render(sensor_data, periodo_minutos: int) -> bytes:
+    """Implementação anterior: figura nova por alerta"""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    fig.patch.set_facecolor('white')
+    ax.set_facecolor('#f8f9fa')
+    corte = time.time() - periodo_minutos * 60
+
+    for esp_id, sensor in list(sensor_data.items()):
+        history = list(sensor.temperature_history.readings(since=corte))
+        ax.plot([datetime.fromtimestamp(ts) for ts, _ in history], [t for _, t in history],
+                marker='o', markersize=4, linewidth=2, label=f'Sensor {esp_id.upper()}', alpha=0.8)
+
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+    ax.xaxis.set_major_locator(mdates.MinuteLocator(interval=2))
+    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    if len(sensor_data) > 1:
+        ax.legend(loc='upper left', frameon=True, fancybox=True, shadow=True)
+    ax.set_xlabel('Horário', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Temperatura (°C)', fontsize=12, fontweight='bold')
+    ax.set_title(f'Temperatura dos Sensores - Últimos {periodo_minutos} minutos',
+                 fontsize=14, fontweight='bold', pad=20)
+
+    plt.tight_layout()
+    buffer = BytesIO()
+    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight', facecolor='white', edgecolor='none')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def _new_reading(sensors):
+    """Simula uma leitura nova por sensor (invalida a memoização)"""
+    now = time.time()
+    for sensor in sensors.values():
+        sensor.temperature_history.append(now, sensor.temperature_history.spread(now) + 22.0)
+
+
+def _time_per_alert(render_fn, sensors, alerts: int, new_reading: bool) -> float:
+    """Tempo médio (ms) por alerta"""
+    started = time.perf_counter()
+    for _ in range(alerts):
+        if new_reading:
+            _new_reading(sensors)
+        render_fn(sensors)
+    return (time.perf_counter() - started) / alerts * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do gráfico dos emails de alerta')
+    parser.add_argument('--sensors', type=int, default=2, help='Sensores no gráfico (padrão: 2)')
+    parser.add_argument('--alerts', type=int, default=20, help='Alertas por cenário (padrão: 20)')
+    parser.add_argument('--minutes', type=int, default=10, help='Período do gráfico (padrão: 10)')
+    args = parser.parse_args()
+
+    sensors = _make_sensors(args.sensors, args.minutes)
+    renderer = TemperatureChartRenderer()
+    print(f"=== Benchmark do gráfico: {args.sensors} sensores, {args.alerts} alertas, "
+          f"{args.minutes} min ===")
+
+    # Aquece fontes e caches do matplotlib
+    legacy_render(sensors, args.minutes)
+    renderer.render(sensors, args.minutes)
+
+    legacy = _time_per_alert(lambda s: legacy_render(s, args.minutes), sensors, args.alerts, True)
+    print(f"📉 Antes     (figura nova por alerta):   {legacy:8.1f} ms/alerta")
+
+    incremental = _time_per_alert(lambda s: renderer.render(s, args.minutes), sensors, args.alerts, True)
+    print(f"📈 Depois    (figura persistente):        {incremental:8.1f} ms/alerta")
+
+    memoized = _time_per_alert(lambda s: renderer.render(s, args.minutes), sensors, args.alerts, False)
+    print(f"⚡ Memoizado (rajada na mesma leitura):   {memoized:8.3f} ms/alerta")
+
+    print(f"   renders={renderer.stats['renders']} cache_hits={renderer.stats['cache_hits']}")
+    print(f"🚀 Ganho: {legacy / incremental:.1f}x (render), {legacy / max(memoized, 1e-6):.0f}x (rajada)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# ============================================================================
+# BENCHMARK DE ESCRITA NO BANCO DE DADOS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Compara a vazão sustentada de save_sensor_state:
+#   antes  - sqlite3.connect + INSERT + commit + close por leitura
+#   depois - DatabaseManager (conexão persistente, WAL, write-behind)
+#
+# Uso: python bench_database.py [--sensors 1000] [--seconds 5]
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from alert_manager import DatabaseManager, SensorState
+
+
+def _make_sensors(count: int):
+    """Cria estados simulados para count sensores"""
+    now = datetime.now()
+    return [
+        SensorState(esp_id=f"esp{i:04d}", last_seen=now, temperature=22.0,
+                    humidity=50.0, status='online')
+        for i in range(count)
+    ]
+
+
+def legacy_save_sensor_state(db_path: str, sensor: SensorState):
+    """Implementação anterior: uma conexão e um commit por leitura"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT OR REPLACE INTO sensor_states
+        (esp_id, last_seen, temperature, humidity, status, alert_count, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        sensor.esp_id,
+        sensor.last_seen.isoformat(),
+        sensor.temperature,
+        sensor.humidity,
+        sensor.status,
+        sensor.alert_count,
+        datetime.now().isoformat()
+    ))
+    conn.commit()
+    conn.close()
+
+
+def _run(save_fn, sensors, seconds: float) -> int:
+    """Grava leituras em round-robin pelos sensores durante seconds"""
+    writes = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for sensor in sensors:
+            sensor.temperature += 0.01
+            save_fn(sensor)
+        writes += len(sensors)
+    return writes
+
+
+def bench_legacy(db_dir: str, sensors, seconds: float) -> float:
+    db_path = os.path.join(db_dir, 'legacy.db')
+    # Esquema criado pelo DatabaseManager; o modo de journal padrão é restaurado
+    manager = DatabaseManager(db_path)
+    manager.init_database()
+    manager.close()
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.close()
+
+    started = time.perf_counter()
+    writes = _run(lambda s: legacy_save_sensor_state(db_path, s), sensors, seconds)
+    return writes / (time.perf_counter() - started)
+
+
+def bench_write_behind(db_dir: str, sensors, seconds: float) -> float:
+    manager = DatabaseManager(os.path.join(db_dir, 'write_behind.db'))
+    manager.init_database()
+
+    started = time.perf_counter()
+    writes = _run(manager.save_sensor_state, sensors, seconds)
+    # Inclui o custo de gravar o que ficou no buffer
+    manager.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"   flushes={manager.stats['flushes']} linhas gravadas={manager.stats['rows_written']} "
+          f"flush máx={manager.stats['max_flush_ms']:.1f} ms")
+    return writes / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de escrita do DatabaseManager')
+    parser.add_argument('--sensors', type=int, default=1000, help='Sensores simulados (padrão: 1000)')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duração de cada cenário (padrão: 5)')
+    args = parser.parse_args()
+
+    sensors = _make_sensors(args.sensors)
+    print(f"=== Benchmark de escrita: {args.sensors} sensores, {args.seconds:.0f}s por cenário ===")
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        legacy = bench_legacy(db_dir, sensors, args.seconds)
+        print(f"📉 Antes  (connect/commit por leitura): {legacy:10.0f} escritas/s")
+
+        write_behind = bench_write_behind(db_dir, sensors, args.seconds)
+        print(f"📈 Depois (WAL + write-behind):         {write_behind:10.0f} escritas/s")
+
+    print(f"🚀 Ganho: {write_behind / legacy:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
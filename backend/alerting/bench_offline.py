@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# ============================================================================
+# BENCHMARK DA DETECÇÃO DE SENSORES OFFLINE
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Compara o custo de um tick do health check com N sensores online:
+#   antes  - varredura completa comparando last_seen de cada sensor
+#   depois - DeadlineScheduler.pop_expired (só os prazos vencidos)
+# e mede o custo de re-armar o prazo a cada leitura.
+#
+# Uso: python bench_offline.py [--sensors 10000] [--ticks 200] [--readings 200000]
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from deadline_scheduler import DeadlineScheduler
+
+OFFLINE_THRESHOLD = 300
+
+
+class _Sensor:
+    __slots__ = ('last_seen', 'status')
+
+    def __init__(self, last_seen):
+        self.last_seen = last_seen
+        self.status = 'online'
+
+
+def bench_scan(sensors, ticks: int) -> float:
+    """Tempo médio (ms) de um tick com a varredura antiga"""
+    started = time.perf_counter()
+    for _ in range(ticks):
+        now = datetime.now()
+        for sensor in sensors.values():
+            if sensor.status == 'online':
+                if (now - sensor.last_seen).total_seconds() > OFFLINE_THRESHOLD:
+                    sensor.status = 'offline'
+    return (time.perf_counter() - started) * 1000 / ticks
+
+
+def bench_deadlines(scheduler: DeadlineScheduler, ticks: int) -> float:
+    """Tempo médio (ms) de um tick consultando só os prazos vencidos"""
+    started = time.perf_counter()
+    for _ in range(ticks):
+        scheduler.pop_expired(time.time())
+    return (time.perf_counter() - started) * 1000 / ticks
+
+
+def bench_arm(scheduler: DeadlineScheduler, esp_ids, readings: int) -> float:
+    """Re-armes por segundo (uma leitura nova de um sensor aleatório)"""
+    rng = random.Random(42)
+    picks = [rng.choice(esp_ids) for _ in range(readings)]
+    started = time.perf_counter()
+    for esp_id in picks:
+        scheduler.arm(esp_id, time.time() + OFFLINE_THRESHOLD)
+    return readings / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da detecção de sensores offline')
+    parser.add_argument('--sensors', type=int, default=10000, help='Sensores online (padrão: 10000)')
+    parser.add_argument('--ticks', type=int, default=200, help='Ticks do health check (padrão: 200)')
+    parser.add_argument('--readings', type=int, default=200000, help='Leituras para re-armar (padrão: 200000)')
+    args = parser.parse_args()
+
+    now = datetime.now()
+    esp_ids = [f"esp{i:05d}" for i in range(args.sensors)]
+    sensors = {esp_id: _Sensor(now - timedelta(seconds=i % 60)) for i, esp_id in enumerate(esp_ids)}
+    scheduler = DeadlineScheduler()
+    for esp_id, sensor in sensors.items():
+        scheduler.arm(esp_id, sensor.last_seen.timestamp() + OFFLINE_THRESHOLD)
+
+    print(f"=== Benchmark de detecção offline: {args.sensors} sensores online ===")
+
+    scan = bench_scan(sensors, args.ticks)
+    print(f"📉 Antes  (varredura por tick):   {scan:8.3f} ms/tick")
+
+    deadlines = bench_deadlines(scheduler, args.ticks)
+    print(f"📈 Depois (prazos vencidos/tick): {deadlines:8.3f} ms/tick")
+
+    arm_rate = bench_arm(scheduler, esp_ids, args.readings)
+    print(f"🔁 Re-armar prazo por leitura:    {arm_rate:8.0f} leituras/s")
+
+    print(f"🚀 Ganho por tick: {scan / max(deadlines, 1e-6):.0f}x "
+          f"(tick de 1 s no lugar de 60 s sem custo proporcional à frota)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
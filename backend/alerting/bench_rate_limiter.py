@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# ============================================================================
+# BENCHMARK DO RATE LIMITER SOB CONTENÇÃO
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Várias threads chamando can_send_alert() ao mesmo tempo:
+#   antes  - lista de horários por chave, refeita a cada chamada sob um único
+#            lock global (implementação anterior, copiada abaixo)
+#   depois - RateLimiter GCRA: um float por chave, locks por shard
+# Também mostra a memória (entradas guardadas) depois da rodada e quantas
+# chaves a limpeza de ociosas devolve.
+#
+# Uso: python bench_rate_limiter.py [--threads 16] [--calls 20000] [--sensors 200]
+
+import argparse
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from rate_limiter import RateLimiter
+
+ALERT_TYPES = ('temperature_high', 'temperature_low', 'humidity_high', 'humidity_low', 'sensor_offline')
+
+# Limites altos: o benchmark mede o custo da decisão, não as recusas
+LIMITS = {
+    'enabled': True,
+    'max_emails_per_hour': 1000,
+    'max_alerts_per_minute': 1000,
+    'max_alerts_per_type_per_minute': 100000,
+    'max_alerts_global_per_minute': 1000000,
+    'shards': 16
+}
+
+
+class LegacyRateLimiter:
+    """RateLimiter antigo: lista de datetimes por chave e um lock global"""
+
+    def __init__(self, max_alerts: int):
+        self.max_alerts = max_alerts
+        self.alert_counts = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def can_send_alert(self, esp_id: str, alert_type: str) -> bool:
+        with self.lock:
+            now = datetime.now()
+            key = f"{esp_id}_{alert_type}"
+            cutoff = now - timedelta(hours=1)
+            self.alert_counts[key] = [t for t in self.alert_counts[key] if t > cutoff]
+            if len(self.alert_counts[key]) >= self.max_alerts:
+                return False
+            self.alert_counts[key].append(now)
+            return True
+
+
+def run_threads(limiter, threads: int, calls: int, sensors: int) -> float:
+    """Chamadas por segundo com `threads` threads concorrentes"""
+    start = threading.Barrier(threads + 1)
+
+    def worker(index: int):
+        picks = [(f"esp{(index * 7919 + i) % sensors:04d}", ALERT_TYPES[i % len(ALERT_TYPES)])
+                 for i in range(calls)]
+        start.wait()
+        for esp_id, alert_type in picks:
+            limiter.can_send_alert(esp_id, alert_type)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return threads * calls / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do rate limiter sob contenção')
+    parser.add_argument('--threads', type=int, default=16, help='Threads concorrentes (padrão: 16)')
+    parser.add_argument('--calls', type=int, default=20000, help='Chamadas por thread (padrão: 20000)')
+    parser.add_argument('--sensors', type=int, default=200, help='Sensores distintos (padrão: 200)')
+    args = parser.parse_args()
+
+    print(f"=== Benchmark do rate limiter: {args.threads} threads x {args.calls} chamadas, "
+          f"{args.sensors} sensores ===")
+
+    legacy = LegacyRateLimiter(LIMITS['max_emails_per_hour'])
+    before = run_threads(legacy, args.threads, args.calls, args.sensors)
+    stored = sum(len(v) for v in legacy.alert_counts.values())
+    print(f"📉 Antes  (listas + lock global): {before:10.0f} chamadas/s, "
+          f"{len(legacy.alert_counts)} chaves, {stored} horários guardados")
+
+    limiter = RateLimiter(LIMITS)
+    after = run_threads(limiter, args.threads, args.calls, args.sensors)
+    stats = limiter.get_stats()
+    print(f"📈 Depois (GCRA + shards):        {after:10.0f} chamadas/s, "
+          f"{stats['active_limits']} chaves (um float cada)")
+    print(f"🚀 Ganho: {after / before:.1f}x")
+
+    # Com o relógio adiantado uma hora todos os baldes estão cheios de novo
+    limiter.clock = lambda: time.monotonic() + 3600
+    print(f"🧹 Chaves ociosas descartadas após 1 h: {limiter.evict_idle()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# ============================================================================
+# BENCHMARK DO RESTART DO ALERTMANAGER
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Com N sensores e histórico cheio, compara a inicialização:
+#   antes  - só a tabela sensor_states (valores escalares; histórico de
+#            temperatura, cooldowns e rate limiter perdidos)
+#   depois - snapshot binário + log de deltas (estado completo)
+# e mostra o tamanho e o tempo de gravação do snapshot.
+#
+# Uso: python bench_state_restore.py [--sensors 5000] [--history 150] [--log 20000]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do restart do AlertManager')
+    parser.add_argument('--sensors', type=int, default=5000, help='Sensores com estado (padrão: 5000)')
+    parser.add_argument('--history', type=int, default=150, help='Leituras no histórico de cada sensor (padrão: 150)')
+    parser.add_argument('--log', type=int, default=20000, help='Registros no log de deltas (padrão: 20000)')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['ALERTS_DB_PATH'] = os.path.join(tmp.name, 'alerts.db')
+    os.environ['SENSOR_REGISTRY_PATH'] = os.path.join(tmp.name, 'sensors.db')
+
+    import logging
+    import alert_manager as alert_module
+    from config import DATABASE_CONFIG
+
+    logging.getLogger().setLevel(logging.ERROR)
+    alert_module.logger.setLevel(logging.ERROR)
+
+    print(f"=== Benchmark de restart: {args.sensors} sensores x {args.history} leituras, "
+          f"{args.log} registros no log ===")
+
+    manager = alert_module.AlertManager(start_threads=False)
+    now = time.time()
+    esp_ids = [f"esp{i:05d}" for i in range(args.sensors)]
+    for esp_id in esp_ids:
+        for i in range(args.history):
+            manager._update_sensor_state(esp_id, 22.0 + (i % 10) * 0.1, 50.0, now - 2 * (args.history - i))
+            manager._add_temperature_to_history(esp_id, 22.0 + (i % 10) * 0.1,
+                                                alert_module.datetime.fromtimestamp(now - 2 * (args.history - i)))
+    started = time.perf_counter()
+    data = manager.write_state_snapshot()
+    write_ms = (time.perf_counter() - started) * 1000
+    for i in range(args.log):
+        manager.state_store.append_reading(esp_ids[i % args.sensors], now + i * 0.001, 23.0, 50.0)
+    manager.state_store.flush()
+    manager.db_manager.flush()
+    print(f"💾 Snapshot: {len(data) / 1024:.0f} KiB gravados em {write_ms:.1f} ms")
+
+    # Antes: só os escalares do SQLite
+    DATABASE_CONFIG['state']['enabled'] = False
+    started = time.perf_counter()
+    before_manager = alert_module.AlertManager(start_threads=False)
+    before = (time.perf_counter() - started) * 1000
+    history = sum(len(s.temperature_history) for s in before_manager.sensors.values())
+    print(f"📉 Antes  (sensor_states):        {before:8.1f} ms, {len(before_manager.sensors)} sensores, "
+          f"{history} leituras no histórico")
+    before_manager.db_manager.close()
+
+    # Depois: snapshot + log
+    DATABASE_CONFIG['state']['enabled'] = True
+    started = time.perf_counter()
+    after_manager = alert_module.AlertManager(start_threads=False)
+    after = (time.perf_counter() - started) * 1000
+    history = sum(len(s.temperature_history) for s in after_manager.sensors.values())
+    print(f"📈 Depois (snapshot + log):       {after:8.1f} ms, {len(after_manager.sensors)} sensores, "
+          f"{history} leituras no histórico")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
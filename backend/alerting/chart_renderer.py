@@ -0,0 +1,198 @@
+# ============================================================================
+# RENDERIZAÇÃO DO GRÁFICO DE TEMPERATURA DOS EMAILS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, Optional
+
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+logger = logging.getLogger(__name__)
+
+
+class TemperatureChartRenderer:
+    """
+    Gera o PNG de temperatura dos emails reaproveitando a mesma figura.
+
+    A figura e os eixos são criados uma única vez e as linhas dos sensores
+    reaproveitadas entre renderizações, que só trocam os dados e os textos; a
+    linha de um sensor fora do gráfico é removida da figura (a frota muda e a
+    figura não cresce com ela). O resultado é
+    memoizado por (sensores, período, último timestamp, minuto), então uma
+    rajada de alertas sobre a mesma leitura reutiliza o mesmo PNG.
+    """
+
+    CORES = {'a': '#ff6b6b', 'b': '#4ecdc4', 'test_dashboard': '#45b7d1', 'test_dashboard_var': '#96ceb4'}
+    COR_PADRAO = '#555555'
+
+    def __init__(self, cache_size: int = 8, dpi: int = 150):
+        self.cache_size = cache_size
+        self.dpi = dpi
+
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._fig = None
+        self._ax = None
+        self._lines = {}
+
+        self.stats = {
+            'renders': 0,
+            'cache_hits': 0,
+            'last_render_ms': 0.0
+        }
+
+    # ------------------------------------------------------------------------
+    # FIGURA PERSISTENTE
+    # ------------------------------------------------------------------------
+
+    def _setup_figure(self):
+        """Cria figura, eixos e textos fixos (uma única vez)"""
+        fig = Figure(figsize=(12, 6), facecolor='white')
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        ax.set_facecolor('#f8f9fa')
+
+        # Margens fixas no lugar de tight_layout a cada renderização
+        fig.subplots_adjust(left=0.07, right=0.98, top=0.9, bottom=0.16)
+
+        ax.set_xlabel('Horário', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Temperatura (°C)', fontsize=12, fontweight='bold')
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+        ax.xaxis.set_major_locator(mdates.MinuteLocator(interval=2))
+        ax.tick_params(axis='x', labelrotation=45)
+
+        self._title = ax.set_title('', fontsize=14, fontweight='bold', pad=20)
+        self._empty_text = ax.text(
+            0.5, 0.5, '', transform=ax.transAxes, fontsize=14, ha='center', va='center',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor='lightgray', alpha=0.5)
+        )
+        self._stamp_text = ax.text(
+            0.99, 0.01, '', transform=ax.transAxes, fontsize=8, ha='right', va='bottom',
+            bbox=dict(boxstyle="round,pad=0.2", facecolor='white', alpha=0.8)
+        )
+
+        self._fig = fig
+        self._ax = ax
+
+    def _line_for(self, esp_id: str):
+        """Linha do sensor, criada quando ele volta a aparecer no gráfico"""
+        line = self._lines.get(esp_id)
+        if line is None:
+            line, = self._ax.plot(
+                [], [], marker='o', markersize=4, linewidth=2,
+                color=self.CORES.get(esp_id, self.COR_PADRAO),
+                label=f'Sensor {esp_id.upper()}', alpha=0.8
+            )
+            self._lines[esp_id] = line
+        return line
+
+    # ------------------------------------------------------------------------
+    # RENDERIZAÇÃO
+    # ------------------------------------------------------------------------
+
+    def render(self, sensor_data: Dict, periodo_minutos: int = 10, lock=None) -> Optional[bytes]:
+        """
+        Retorna o PNG do gráfico dos últimos periodo_minutos.
+
+        lock é o lock de quem escreve nas janelas (a thread MQTT continua
+        inserindo leituras): as cópias das janelas são feitas com ele.
+        """
+        agora = time.time()
+        corte = agora - periodo_minutos * 60
+
+        with lock if lock is not None else nullcontext():
+            janelas = [(esp_id, sensor.temperature_history.export())
+                       for esp_id, sensor in list(sensor_data.items())]
+
+        series = {}
+        for esp_id, (timestamps, values) in janelas:
+            if len(timestamps) < 2:
+                continue
+            pontos = np.column_stack((np.frombuffer(timestamps), np.frombuffer(values)))
+            pontos = pontos[pontos[:, 0] >= corte]
+            if len(pontos) >= 2:
+                series[esp_id] = pontos
+
+        ultimo = max((float(pontos[-1, 0]) for pontos in series.values()), default=None)
+        key = (tuple(sorted(series)), periodo_minutos, ultimo, int(agora // 60))
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return cached
+
+            started = time.perf_counter()
+            imagem = self._draw(series, periodo_minutos, agora, corte)
+            self.stats['renders'] += 1
+            self.stats['last_render_ms'] = (time.perf_counter() - started) * 1000
+
+            self._cache[key] = imagem
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        logger.info(f"Gráfico gerado com sucesso! Tamanho: {len(imagem)} bytes "
+                    f"({self.stats['last_render_ms']:.0f} ms)")
+        return imagem
+
+    def _draw(self, series: Dict, periodo_minutos: int, agora: float, corte: float) -> bytes:
+        """Atualiza os artistas da figura persistente e codifica o PNG"""
+        if self._fig is None:
+            self._setup_figure()
+        ax = self._ax
+
+        # Epoch -> número de data do matplotlib no horário local (como datetime.fromtimestamp)
+        offset = mdates.date2num(datetime.fromtimestamp(agora)) - agora / 86400.0
+
+        for esp_id in [esp_id for esp_id in self._lines if esp_id not in series]:
+            self._lines.pop(esp_id).remove()
+
+        visiveis = []
+        for esp_id in sorted(series):
+            pontos = series[esp_id]
+            line = self._line_for(esp_id)
+            line.set_data(pontos[:, 0] / 86400.0 + offset, pontos[:, 1])
+            visiveis.append(line)
+
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.remove()
+
+        x_inicio = mdates.date2num(datetime.fromtimestamp(corte))
+        x_fim = mdates.date2num(datetime.fromtimestamp(agora))
+
+        if not visiveis:
+            self._empty_text.set_text(f'📊 Aguardando dados de temperatura\n(últimos {periodo_minutos} minutos)')
+            self._empty_text.set_visible(True)
+            ax.grid(False)
+            ax.set_xlim(x_inicio, x_fim)
+            ax.set_ylim(15, 35)
+        else:
+            self._empty_text.set_visible(False)
+            ax.grid(True, alpha=0.3, linestyle='--')
+            # set_xlim/set_ylim do gráfico vazio desligam o autoscale
+            ax.autoscale(True)
+            ax.relim(visible_only=True)
+            ax.autoscale_view()
+            if len(visiveis) > 1:
+                ax.legend(handles=visiveis, loc='upper left', frameon=True, fancybox=True, shadow=True)
+
+        self._title.set_text(f'📈 Temperatura dos Sensores - Últimos {periodo_minutos} minutos')
+        self._stamp_text.set_text(f"Gerado em {datetime.fromtimestamp(agora).strftime('%d/%m/%Y %H:%M:%S')}")
+
+        buffer = BytesIO()
+        self._fig.savefig(buffer, format='png', dpi=self.dpi, facecolor='white', edgecolor='none')
+        return buffer.getvalue()
@@ -13,6 +13,8 @@ MQTT_CONFIG = {
     'broker': os.getenv('MQTT_BROKER', 'localhost'),
     'port': int(os.getenv('MQTT_PORT', 1883)),
     'keepalive': 60,
+    # paho (padrão) ou memory (broker em memória do processo, para benchmarks)
+    'transport': os.getenv('MQTT_TRANSPORT', 'paho'),
     'topics': {
         'sensor_data': 'legion32/+',  # legion32/a, legion32/b, etc.
         'status': 'legion32/status',
@@ -58,7 +60,9 @@ ALERT_CONFIG = {
     # Variações bruscas
     'variation': {
         'temperature': 5.0,         # Variação de temperatura em 5 min
-        'humidity': 15.0            # Variação de umidade em 5 min
+        'humidity': 15.0,           # Variação de umidade em 5 min
+        'history_seconds': 360,     # Retenção do histórico por sensor (5 min + margem)
+        'history_capacity': 512     # Máximo de leituras guardadas por sensor
     },
     
     # Timeouts e cooldowns
@@ -74,10 +78,39 @@ ALERT_CONFIG = {
         'enable_mqtt': True,
         'enable_log': True,
         'retry_attempts': 3,
-        'retry_delay': 60           # 1 minuto entre tentativas
+        'retry_delay': 60,          # 1 minuto entre tentativas (reagendadas, sem ocupar workers)
+        
+        # Fila de envio (SMTP e gráfico rodam fora da thread MQTT)
+        'queue_size': 100,          # Capacidade máxima da fila
+        'workers': 2,               # Threads de envio
+        'overflow_policy': 'drop_oldest',  # drop_oldest | drop_new | block
+        'enqueue_timeout': 0.05     # Espera máxima (s) na política 'block'
+    },
+    
+    # Avaliação de limites em lote (NumPy) para frotas grandes de sensores
+    'batch': {
+        'enabled': os.getenv('ALERT_BATCH_ENABLED', 'false').lower() == 'true',
+        'max_size': 1024,           # Leituras por lote
+        'max_delay_ms': 5           # Espera máxima de uma leitura no lote
+    },
+    
+    # Processamento por horário do evento (amostra) com buffer de reordenação por sensor
+    'event_time': {
+        'allowed_lateness': float(os.getenv('ALERT_ALLOWED_LATENESS', 5))  # segundos (0 = sem espera)
     }
 }
 
+# ============================================================================
+# REGISTRO DE SENSORES
+# ============================================================================
+SENSOR_REGISTRY_CONFIG = {
+    # Banco compartilhado com o exportador (volume ./registry)
+    'path': os.getenv('SENSOR_REGISTRY_PATH', '/app/registry/sensors.db'),
+    'reload_interval': 5,           # Segundos entre verificações de alteração
+    'auto_register': os.getenv('SENSOR_AUTO_REGISTER', 'false').lower() == 'true',
+    'seed_sensors': ['a', 'b']      # Cadastrados quando o registro está vazio
+}
+
 # ============================================================================
 # CONFIGURAÇÕES DE LOGGING
 # ============================================================================
@@ -92,6 +125,12 @@ LOGGING_CONFIG = {
     },
     'console': {
         'enabled': True
+    },
+    # Trace por mensagem da ingestão (logger 'ingest.trace', chave=valor)
+    'trace': {
+        'sensors': os.getenv('INGEST_TRACE_SENSORS', ''),                 # Sempre rastreados, ex: "a,b"
+        'sample_rate': float(os.getenv('INGEST_TRACE_SAMPLE_RATE', '0')),  # 0.01 = 1 a cada 100 mensagens
+        'level': os.getenv('INGEST_TRACE_LEVEL', 'DEBUG')                 # DEBUG ou TRACE (inclui detalhes)
     }
 }
 
@@ -100,13 +139,35 @@ LOGGING_CONFIG = {
 # ============================================================================
 DATABASE_CONFIG = {
     'sqlite': {
-        'path': '/app/data/alerts.db',
+        'path': os.getenv('ALERTS_DB_PATH', '/app/data/alerts.db'),
         'backup_enabled': True,
-        'backup_interval': timedelta(hours=24)
+        'backup_interval': timedelta(hours=24),
+        
+        # Escrita em lote (write-behind)
+        'flush_interval_ms': 500,   # Grava o buffer a cada 500 ms
+        'flush_max_rows': 500,      # ... ou quando acumular 500 linhas
+        'busy_timeout_ms': 5000,
+        
+        # Histórico bruto de leituras (uma tabela sensor_readings_AAAAMMDD por dia)
+        'readings_enabled': True,
+        'readings_retention_days': 30   # Partições mais antigas são descartadas
     },
     'prometheus': {
-        'enabled': True,
-        'metrics_prefix': 'cluster_alert_'
+        'enabled': os.getenv('ALERT_METRICS_ENABLED', 'true').lower() == 'true',
+        'metrics_prefix': 'cluster_alert_',
+        # Servidor de /metrics e /health (http_server.py)
+        'host': os.getenv('ALERT_HTTP_HOST', '0.0.0.0'),
+        'port': int(os.getenv('ALERT_HTTP_PORT', 8000)),
+        # /health responde 503 se o health check dos sensores parar por mais que isso
+        'health_stall_seconds': 30
+    },
+    # Snapshot binário + log de deltas do estado em memória (state_store.py)
+    'state': {
+        'enabled': os.getenv('ALERT_STATE_ENABLED', 'true').lower() == 'true',
+        'dir': os.getenv('ALERT_STATE_DIR', os.path.join(
+            os.path.dirname(os.getenv('ALERTS_DB_PATH', '/app/data/alerts.db')), 'state')),
+        'snapshot_interval': 60,    # Snapshot completo a cada 60 s (o log recomeça)
+        'log_flush_interval': 1     # Log de deltas vai para o disco a cada 1 s
     }
 }
 
@@ -114,7 +175,10 @@ DATABASE_CONFIG = {
 # CONFIGURAÇÕES DE MONITORAMENTO
 # ============================================================================
 MONITORING_CONFIG = {
-    'health_check_interval': 60,    # 1 minuto
+    'runtime': os.getenv('ALERT_RUNTIME', 'threads'),  # threads | asyncio (um único event loop)
+    'health_check_interval': 1,     # 1 segundo (só confere prazos vencidos, sem varredura)
+    'stats_interval': 300,          # 5 minutos
+    'cleanup_interval': 3600,       # 1 hora
     'metrics_collection': True,
     'performance_monitoring': True,
     'memory_limit': 512 * 1024 * 1024,  # 512MB
@@ -169,8 +233,11 @@ ALERT_MESSAGES = {
 SECURITY_CONFIG = {
     'rate_limiting': {
         'enabled': True,
-        'max_emails_per_hour': 10,
-        'max_alerts_per_minute': 5
+        'max_emails_per_hour': 10,                # por sensor e tipo de alerta
+        'max_alerts_per_minute': 5,               # por sensor
+        'max_alerts_per_type_per_minute': int(os.getenv('ALERT_RATE_PER_TYPE_PER_MINUTE', '30')),
+        'max_alerts_global_per_minute': int(os.getenv('ALERT_RATE_GLOBAL_PER_MINUTE', '60')),
+        'shards': 16                              # locks independentes das chaves
     },
     'authentication': {
         'mqtt_username': os.getenv('MQTT_USERNAME', None),
@@ -0,0 +1,58 @@
+# ============================================================================
+# CONFIGURAÇÃO DOS TESTES (PYTEST) DO SISTEMA DE ALERTAS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Uso: cd backend/alerting && python -m pytest -q
+#
+# config.py lê os caminhos do ambiente na importação: aqui eles apontam para
+# um diretório temporário antes de qualquer teste importar o AlertManager.
+# A fixture make_manager cria AlertManagers sem threads, com banco, registro
+# e estado em tmp_path e o envio de email trocado por uma lista (manager.sent).
+
+import os
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix='alerting-tests-')
+os.environ.setdefault('ALERTS_DB_PATH', os.path.join(_TMP_DIR, 'alerts.db'))
+os.environ.setdefault('SENSOR_REGISTRY_PATH', os.path.join(_TMP_DIR, 'sensors.db'))
+
+# Scripts manuais (enviam email de verdade), não são testes do pytest
+collect_ignore = ['test_alert_hard.py', 'test_email.py']
+
+
+@pytest.fixture
+def make_manager(tmp_path, monkeypatch):
+    """Fábrica de AlertManager isolado: make_manager(sensors=[...], state=False)"""
+    import config
+    from alert_manager import AlertManager
+
+    monkeypatch.setitem(config.DATABASE_CONFIG['sqlite'], 'path', str(tmp_path / 'alerts.db'))
+    monkeypatch.setitem(config.DATABASE_CONFIG['state'], 'dir', str(tmp_path / 'state'))
+    monkeypatch.setitem(config.SENSOR_REGISTRY_CONFIG, 'path', str(tmp_path / 'sensors.db'))
+    monkeypatch.setitem(config.ALERT_CONFIG['notification'], 'enable_email', True)
+    managers = []
+
+    def make(sensors=('a', 'b'), state: bool = False) -> AlertManager:
+        monkeypatch.setitem(config.SENSOR_REGISTRY_CONFIG, 'seed_sensors', list(sensors))
+        monkeypatch.setitem(config.DATABASE_CONFIG['state'], 'enabled', state)
+        manager = AlertManager(start_threads=False)
+        manager.sent = []
+
+        def submit(alert):
+            manager.sent.append(alert)
+            return True
+
+        manager.notifier.submit = submit
+        managers.append(manager)
+        return manager
+
+    yield make
+
+    for manager in managers:
+        if manager.state_store is not None:
+            manager.state_store.close()
+        manager.db_manager.close()
+        manager.sensor_registry.stop()
@@ -0,0 +1,115 @@
+# ============================================================================
+# ÍNDICE DE COOLDOWN DE ALERTAS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Cooldown por (esp_id, alert_type, severity): um alerta de umidade não
+# silencia um de temperatura do mesmo sensor, e um alerta só é suprimido por
+# cooldown ativo de severidade igual ou maior. Uma escalada (HIGH depois de
+# MEDIUM, CRITICAL depois de HIGH) passa direto:
+#
+#   cooldowns.try_start(esp_id, 'temperature_high', 'CRITICAL')  # prazo ou None
+#   cooldowns.release(esp_id, 'temperature_high', 'CRITICAL', prazo)
+#   cooldowns.expire()                                           # só os vencidos
+#
+# try_start() verifica e inicia o cooldown sob um único lock: dois caminhos que
+# tratam o mesmo alerta ao mesmo tempo (thread MQTT e thread do lote) não
+# passam os dois pela verificação. release() desfaz o início quando o alerta
+# acaba não saindo (ex.: recusado pelo rate limiter).
+#
+# Os prazos ficam em um DeadlineScheduler (heap de prazos), então a limpeza
+# retira só as entradas vencidas em vez de reconstruir o dicionário. Os prazos
+# são epoch (time.time()) para valerem depois de um restart: o AlertManager
+# grava cada cooldown no banco e recarrega os ainda ativos na inicialização.
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from deadline_scheduler import DeadlineScheduler
+
+SEVERITY_LEVELS = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3, 'CRITICAL': 4}
+
+
+class CooldownIndex:
+    """Cooldowns ativos por (sensor, tipo, severidade) com expiração por heap"""
+
+    def __init__(self, cooldown_seconds: float, severity_levels: Dict[str, int] = SEVERITY_LEVELS):
+        self.cooldown_seconds = cooldown_seconds
+        self.severity_levels = dict(severity_levels)
+        self._deadlines = DeadlineScheduler()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def _blocking_severities(self, severity: str) -> List[str]:
+        """Severidades cujo cooldown suprime um alerta desta severidade"""
+        level = self.severity_levels.get(severity, 0)
+        return [name for name, other in self.severity_levels.items() if other >= level] or [severity]
+
+    def _allows(self, esp_id: str, alert_type: str, severity: str, now: float) -> bool:
+        for blocking in self._blocking_severities(severity):
+            deadline = self._deadlines.deadline((esp_id, alert_type, blocking))
+            if deadline is not None and deadline > now:
+                return False
+        return True
+
+    def allows(self, esp_id: str, alert_type: str, severity: str, now: float = None) -> bool:
+        """True se nenhum cooldown ativo de severidade >= a do alerta"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            return self._allows(esp_id, alert_type, severity, now)
+
+    def start(self, esp_id: str, alert_type: str, severity: str, now: float = None) -> float:
+        """Inicia (ou renova) o cooldown e retorna o prazo (epoch)"""
+        if now is None:
+            now = time.time()
+        deadline = now + self.cooldown_seconds
+        with self._lock:
+            self._deadlines.arm((esp_id, alert_type, severity), deadline)
+        return deadline
+
+    def try_start(self, esp_id: str, alert_type: str, severity: str, now: float = None) -> Optional[float]:
+        """Inicia o cooldown se o alerta passa (prazo em epoch); None se está suprimido"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if not self._allows(esp_id, alert_type, severity, now):
+                return None
+            deadline = now + self.cooldown_seconds
+            self._deadlines.arm((esp_id, alert_type, severity), deadline)
+            return deadline
+
+    def release(self, esp_id: str, alert_type: str, severity: str, deadline: float):
+        """Desfaz um try_start() cujo alerta não saiu (se o prazo não foi renovado depois)"""
+        key = (esp_id, alert_type, severity)
+        with self._lock:
+            if self._deadlines.deadline(key) == deadline:
+                self._deadlines.cancel(key)
+
+    def restore(self, entries: Iterable[Tuple[str, str, str, float]], now: float = None) -> int:
+        """Recarrega cooldowns persistidos (esp_id, alert_type, severity, prazo) ainda ativos"""
+        if now is None:
+            now = time.time()
+        restored = 0
+        with self._lock:
+            for esp_id, alert_type, severity, deadline in entries:
+                if deadline > now:
+                    self._deadlines.arm((esp_id, alert_type, severity), deadline)
+                    restored += 1
+        return restored
+
+    def items(self, now: float = None) -> List[Tuple[str, str, str, float]]:
+        """Cooldowns ativos como (esp_id, alert_type, severity, prazo)"""
+        if now is None:
+            now = time.time()
+        return [key + (deadline,) for key, deadline in self._deadlines.items() if deadline > now]
+
+    def expire(self, now: float = None) -> List[Tuple[str, str, str]]:
+        """Retira e retorna as chaves com cooldown vencido"""
+        return self._deadlines.pop_expired(now)
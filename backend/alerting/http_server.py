@@ -0,0 +1,81 @@
+# ============================================================================
+# SERVIDOR HTTP DE MÉTRICAS E HEALTH CHECK DO SISTEMA DE ALERTAS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# /metrics e /health na porta 8000 (alvo do prometheus.yml e do healthcheck
+# do docker-compose), com http.server da biblioteca padrão em uma thread
+# daemon. O /metrics só serializa o registro do prometheus_client: os
+# contadores são atualizados no momento do evento (metrics.py), então um
+# scrape nunca disputa locks com o processamento das mensagens.
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsHTTPServer:
+    """Serve /metrics e /health em segundo plano"""
+
+    def __init__(self, health_fn: Callable[[], Tuple[Dict, int]], host: str = '0.0.0.0',
+                 port: int = 8000, registry=REGISTRY):
+        self.health_fn = health_fn
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server = None
+        self._thread = None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                try:
+                    if path == '/metrics':
+                        self._reply(200, generate_latest(server.registry), CONTENT_TYPE_LATEST)
+                    elif path == '/health':
+                        body, status = server.health_fn()
+                        self._reply(status, json.dumps(body, default=str).encode(), 'application/json')
+                    else:
+                        self._reply(404, b'Not Found', 'text/plain')
+                except Exception as e:
+                    logger.error(f"Erro ao atender {path}: {e}")
+                    self._reply(500, b'Internal Server Error', 'text/plain')
+
+            def _reply(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes a cada 30s não devem poluir o log
+                logger.debug(f"HTTP {self.address_string()} {format % args}")
+
+        return Handler
+
+    def start(self):
+        """Abre a porta e atende em uma thread daemon"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True)
+        self._thread.start()
+        logger.info(f"Servidor de métricas ouvindo em {self.host}:{self.port} (/metrics, /health)")
+
+    def stop(self):
+        """Encerra o servidor"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        logger.info("Servidor de métricas encerrado")
@@ -5,16 +5,24 @@
 
 import json
 import logging
+import os
 import signal
 import sys
 import time
 from datetime import datetime
 from typing import Dict, Any
 
-import paho.mqtt.client as mqtt
-
-from config import MQTT_CONFIG, LOGGING_CONFIG
+from config import MQTT_CONFIG, LOGGING_CONFIG, MONITORING_CONFIG, DATABASE_CONFIG
 from alert_manager import AlertManager
+from http_server import MetricsHTTPServer
+from metrics import STAGE_DECODE, ingest_metrics, messages_received_counter
+
+# Módulos compartilhados: no container ficam em /app, localmente em ../common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from mqtt_topics import SYSTEM_STATS_TOPIC, TOPIC_SENSOR, TOPIC_STATUS, classify_topic
+from mqtt_transport import create_client
+from ingest_metrics import payload_time
+from payload_codec import PayloadError, decode_readings
 
 # ============================================================================
 # CONFIGURAÇÃO DE LOGGING
@@ -41,9 +49,10 @@ logger = setup_logging()
 class ClusterMonitoringSystem:
     """Sistema principal de monitoramento de clusters"""
     
-    def __init__(self):
-        self.alert_manager = AlertManager()
+    def __init__(self, alert_manager: AlertManager = None):
+        self.alert_manager = alert_manager or AlertManager()
         self.mqtt_client = None
+        self.http_server = None
         self.running = True
         
         # Estatísticas
@@ -53,11 +62,18 @@ class ClusterMonitoringSystem:
             'start_time': datetime.now(),
             'last_health_check': datetime.now()
         }
+        # Alertas contados onde são tratados: leituras retidas no buffer de
+        # reordenação geram alerta depois, fora de process_sensor_data
+        self.alert_manager.on_alert = self._count_alert
         
         # Configuração de sinais para graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
     
+    def _count_alert(self, alert):
+        """Callback do AlertManager para cada alerta detectado"""
+        self.stats['alerts_generated'] += 1
+    
     def _signal_handler(self, signum, frame):
         """Handler para sinais de shutdown"""
         logger.info(f"Recebido sinal {signum}, iniciando shutdown...")
@@ -66,7 +82,7 @@ class ClusterMonitoringSystem:
     def setup_mqtt(self):
         """Configura cliente MQTT"""
         try:
-            self.mqtt_client = mqtt.Client()
+            self.mqtt_client = create_client(MQTT_CONFIG['transport'])
             self.mqtt_client.on_connect = self._on_mqtt_connect
             self.mqtt_client.on_message = self._on_mqtt_message
             self.mqtt_client.on_disconnect = self._on_mqtt_disconnect
@@ -81,7 +97,7 @@ class ClusterMonitoringSystem:
                     MQTT_CONFIG['password']
                 )
             
-            logger.info("Cliente MQTT configurado")
+            logger.info(f"Cliente MQTT configurado (transporte: {MQTT_CONFIG['transport']})")
             
         except Exception as e:
             logger.error(f"Erro ao configurar MQTT: {e}")
@@ -91,9 +107,7 @@ class ClusterMonitoringSystem:
         """Callback de conexão MQTT"""
         if rc == 0:
             logger.info("Conectado ao broker MQTT")
-            
-            # Debug: mostra configuração carregada
-            logger.info(f"[DEBUG] Configuração de tópicos: {MQTT_CONFIG['topics']}")
+            logger.debug(f"Configuração de tópicos: {MQTT_CONFIG['topics']}")
             
             # Inscreve nos tópicos
             topics = [
@@ -118,16 +132,15 @@ class ClusterMonitoringSystem:
         """Callback de mensagem MQTT"""
         try:
             self.stats['messages_received'] += 1
+            messages_received_counter.inc()
             
-            # Log da mensagem recebida
-            logger.info(f"[DEBUG] Mensagem MQTT recebida: {msg.topic} - {msg.payload.decode()}")
-            
-            # Processa diferentes tipos de mensagem
-            if msg.topic.startswith('legion32/'):
-                logger.info(f"[DEBUG] Processando dados do sensor: {msg.topic}")
-                self._process_sensor_data(msg.topic, msg.payload.decode())
-            elif msg.topic == MQTT_CONFIG['topics']['status']:
-                logger.info(f"[DEBUG] Processando mensagem de status")
+            # Processa diferentes tipos de mensagem (mesmo roteamento do
+            # exportador: tópicos de serviço antes do curinga legion32/+)
+            kind, _ = classify_topic(msg.topic)
+            if kind == TOPIC_SENSOR:
+                # Payload bruto: JSON ou binário (decidido pelo primeiro byte)
+                self._process_sensor_data(msg.topic, msg.payload)
+            elif kind == TOPIC_STATUS:
                 self._process_status_message(msg.payload.decode())
             else:
                 logger.warning(f"Tópico não reconhecido: {msg.topic}")
@@ -135,42 +148,49 @@ class ClusterMonitoringSystem:
         except Exception as e:
             logger.error(f"Erro ao processar mensagem MQTT: {e}")
     
-    def _process_sensor_data(self, topic: str, payload: str):
+    def _process_sensor_data(self, topic: str, payload: bytes):
         """Processa dados de sensores"""
         try:
-            logger.info(f"[DEBUG] Iniciando processamento de dados do sensor: {topic}")
-            
             # Extrai ESP ID do tópico (legion32/a, legion32/b, etc.)
             esp_id = topic.split('/')[-1]
-            logger.info(f"[DEBUG] ESP ID extraído: {esp_id}")
-            
-            # Parse do JSON
-            data = json.loads(payload)
-            logger.info(f"[DEBUG] Dados parseados: {data}")
             
-            # Adiciona ESP ID aos dados
-            data['esp_id'] = esp_id
-            data['topic'] = topic
-            data['received_at'] = datetime.now().isoformat()
+            # Decisão de trace tomada uma vez por mensagem
+            trace = self.alert_manager.tracer.begin(esp_id)
+            if trace:
+                trace.detail('received', topic=topic, payload=payload)
             
-            logger.info(f"[DEBUG] Chamando alert_manager.process_sensor_data para {esp_id}")
-            # Processa alertas - extrai temperatura e umidade do dicionário
-            temperature = data.get('temperature', 0.0)
-            humidity = data.get('humidity', 0.0)
-            alert = self.alert_manager.process_sensor_data(esp_id, temperature, humidity)
-            
-            if alert:
-                self.stats['alerts_generated'] += 1
-                logger.info(f"[DEBUG] ✅ Alerta gerado: {alert.alert_type} para {esp_id} - Severidade: {alert.severity}")
-            else:
-                logger.info(f"[DEBUG] ❌ Nenhum alerta gerado para {esp_id}")
+            # Parse do payload (JSON ou binário, leitura avulsa ou lote)
+            received_at = time.time()
+            started = time.perf_counter()
+            readings = decode_readings(payload, received_at)
+            STAGE_DECODE.observe(time.perf_counter() - started)
+            if trace and len(readings) > 1:
+                trace.event('batch', readings=len(readings))
             
-            # Log dos dados processados
-            logger.info(f"[DEBUG] Dados processados para {esp_id}: Temp={data.get('temperature')}°C, "
-                        f"Umidade={data.get('humidity')}%")
+            for data in readings:
+                # Adiciona ESP ID aos dados
+                data['esp_id'] = esp_id
+                data['topic'] = topic
+                data['received_at'] = datetime.fromtimestamp(received_at).isoformat()
+                
+                # Processa alertas - extrai temperatura e umidade do dicionário,
+                # datando a leitura pelo horário da amostra. Alertas e atraso de
+                # ingestão são registrados quando a leitura é de fato avaliada
+                temperature = data.get('temperature')
+                humidity = data.get('humidity')
+                if temperature is None or humidity is None:
+                    # Sem o campo não há leitura: 0.0 viraria alerta crítico
+                    logger.warning(f"Leitura de {esp_id} sem temperatura/umidade ignorada")
+                    continue
+                self.alert_manager.process_sensor_data(
+                    esp_id, temperature, humidity, trace=trace, timestamp=data['sample_time'],
+                    device_time=payload_time(data)
+                )
             
         except json.JSONDecodeError as e:
             logger.error(f"Erro ao decodificar JSON: {e}")
+        except PayloadError as e:
+            logger.error(f"Erro ao decodificar payload: {e}")
         except Exception as e:
             logger.error(f"Erro ao processar dados do sensor: {e}")
             import traceback
@@ -217,9 +237,10 @@ class ClusterMonitoringSystem:
         def health_check_worker():
             while self.running:
                 try:
-                    time.sleep(60)  # Verifica a cada minuto
+                    time.sleep(MONITORING_CONFIG['health_check_interval'])
                     self.alert_manager.check_sensor_health()
                     self.stats['last_health_check'] = datetime.now()
+                    ingest_metrics.sample_backlog(self.mqtt_client)
                 except Exception as e:
                     logger.error(f"Erro no health check: {e}")
         
@@ -228,12 +249,47 @@ class ClusterMonitoringSystem:
         health_thread.start()
         logger.info("Thread de health check iniciada")
     
+    def start_metrics_server(self):
+        """Inicia o servidor de /metrics e /health (porta 8000)"""
+        config = DATABASE_CONFIG['prometheus']
+        if not config['enabled']:
+            return
+        try:
+            self.http_server = MetricsHTTPServer(self.health, host=config['host'], port=config['port'])
+            self.http_server.start()
+        except OSError as e:
+            self.http_server = None
+            logger.error(f"Erro ao iniciar servidor de métricas na porta {config['port']}: {e}")
+    
+    def health(self) -> tuple:
+        """Estado para o /health: (corpo, status HTTP); não usa locks do AlertManager"""
+        now = datetime.now()
+        since_check = (now - self.stats['last_health_check']).total_seconds()
+        stalled = since_check > DATABASE_CONFIG['prometheus']['health_stall_seconds']
+        mqtt_connected = bool(self.mqtt_client and self.mqtt_client.is_connected())
+        
+        if not self.running or stalled:
+            status = 'unhealthy'
+        elif not mqtt_connected:
+            status = 'degraded'  # O cliente reconecta sozinho
+        else:
+            status = 'healthy'
+        
+        return {
+            'status': status,
+            'timestamp': now.isoformat(),
+            'uptime_seconds': round((now - self.stats['start_time']).total_seconds(), 1),
+            'mqtt_connected': mqtt_connected,
+            'seconds_since_health_check': round(since_check, 1),
+            'messages_received': self.stats['messages_received']
+        }, 503 if status == 'unhealthy' else 200
+    
     def start_stats_reporting(self):
         """Inicia relatório de estatísticas"""
         def stats_worker():
             while self.running:
                 try:
-                    time.sleep(300)  # A cada 5 minutos
+                    time.sleep(MONITORING_CONFIG['stats_interval'])
                     self._report_statistics()
                 except Exception as e:
                     logger.error(f"Erro no relatório de estatísticas: {e}")
@@ -255,13 +311,13 @@ class ClusterMonitoringSystem:
                 'uptime': (datetime.now() - self.stats['start_time']).total_seconds()
             }
             
-            logger.info(f"Estatísticas do sistema: {json.dumps(stats_report, indent=2)}")
+            logger.info(f"Estatísticas do sistema: {json.dumps(stats_report, indent=2, default=str)}")
             
             # Publica estatísticas no MQTT (opcional)
             if self.mqtt_client and self.mqtt_client.is_connected():
                 self.mqtt_client.publish(
-                    'legion32/system/stats',
-                    json.dumps(stats_report)
+                    SYSTEM_STATS_TOPIC,
+                    json.dumps(stats_report, default=str)
                 )
             
         except Exception as e:
@@ -283,6 +339,7 @@ class ClusterMonitoringSystem:
             # Inicia threads auxiliares
             self.start_health_check_loop()
             self.start_stats_reporting()
+            self.start_metrics_server()
             
             logger.info("Sistema iniciado com sucesso!")
             
@@ -303,6 +360,9 @@ class ClusterMonitoringSystem:
         
         self.running = False
         
+        if self.http_server is not None:
+            self.http_server.stop()
+        
         # Desliga MQTT
         if self.mqtt_client:
             try:
@@ -332,6 +392,12 @@ class ClusterMonitoringSystem:
 def main():
     """Função principal"""
     try:
+        # Runtime asyncio: MQTT, timers, banco e envio em um único event loop
+        if MONITORING_CONFIG['runtime'] == 'asyncio':
+            from async_runtime import run_async
+            run_async()
+            return
+        
         # Cria e executa o sistema
         system = ClusterMonitoringSystem()
         system.run()
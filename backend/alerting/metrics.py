@@ -0,0 +1,89 @@
+# ============================================================================
+# MÉTRICAS PROMETHEUS DO SISTEMA DE ALERTAS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Métricas internas do serviço, com o prefixo de DATABASE_CONFIG['prometheus'].
+# Os filhos de cada etapa são resolvidos aqui, uma vez, e usados direto no
+# caminho quente (STAGE_DECODE.observe(...)). Tudo é atualizado no momento do
+# evento, então o /metrics (http_server.py) só serializa o registro.
+
+import os
+import sys
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from config import DATABASE_CONFIG
+
+# Módulos compartilhados: no container ficam em /app, localmente em ../common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from ingest_metrics import IngestMetrics
+
+METRICS_PREFIX = DATABASE_CONFIG['prometheus']['metrics_prefix'].rstrip('_')
+
+# ============================================================================
+# ETAPAS DA INGESTÃO
+# ============================================================================
+ingest_metrics = IngestMetrics(METRICS_PREFIX)
+
+STAGE_DECODE = ingest_metrics.stage('decode')                  # payload -> leituras
+STAGE_VALIDATE = ingest_metrics.stage('validate')              # registro de sensores
+STAGE_STATE_UPDATE = ingest_metrics.stage('state_update')      # estado + buffer do banco
+STAGE_EVALUATE = ingest_metrics.stage('evaluate')              # janela + limites
+STAGE_NOTIFY_ENQUEUE = ingest_metrics.stage('notify_enqueue')  # fila de emails
+STAGE_DB_WRITE = ingest_metrics.stage('db_write')              # transação do flush
+
+# ============================================================================
+# CONTADORES DO SERVIÇO (PRÉ-AGREGADOS: O SCRAPE NÃO TOCA NO ALERTMANAGER)
+# ============================================================================
+messages_received_counter = Counter(
+    f'{METRICS_PREFIX}_messages_received_total',
+    'Mensagens MQTT recebidas pelo sistema de alertas'
+)
+
+alerts_counter = Counter(
+    f'{METRICS_PREFIX}_alerts_total',
+    'Alertas detectados, por tipo e severidade',
+    ['alert_type', 'severity']
+)
+
+rate_limited_counter = Counter(
+    f'{METRICS_PREFIX}_rate_limited_total',
+    'Alertas recusados pelo rate limiter, por tipo e orçamento que recusou',
+    ['alert_type', 'budget']
+)
+
+notifications_counter = Counter(
+    f'{METRICS_PREFIX}_notifications_total',
+    'Notificações processadas pelos workers, por resultado',
+    ['result']
+)
+
+email_send_seconds = Histogram(
+    f'{METRICS_PREFIX}_email_send_seconds',
+    'Tempo de envio de um email de alerta (gráfico + SMTP, com retentativas)',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+
+notification_queue_wait_seconds = Histogram(
+    f'{METRICS_PREFIX}_notification_queue_wait_seconds',
+    'Tempo de um alerta na fila de notificações até começar o envio',
+    buckets=(0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+notification_queue_depth = Gauge(
+    f'{METRICS_PREFIX}_notification_queue_depth',
+    'Notificações aguardando envio'
+)
+
+db_pending_rows = Gauge(
+    f'{METRICS_PREFIX}_db_pending_rows',
+    'Linhas no buffer do banco aguardando o próximo flush'
+)
+
+
+def observe_notification(wait: float, duration: float, sent: bool):
+    """Callback do despachante após cada entrega (sucesso ou falha)"""
+    notification_queue_wait_seconds.observe(wait)
+    email_send_seconds.observe(duration)
+    notifications_counter.labels(result='sent' if sent else 'failed').inc()
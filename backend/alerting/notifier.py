@@ -0,0 +1,319 @@
+# ============================================================================
+# DESPACHANTE ASSÍNCRONO DE NOTIFICAÇÕES
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# POLÍTICAS DE ESTOURO DA FILA
+# ============================================================================
+
+OVERFLOW_DROP_OLDEST = 'drop_oldest'   # Descarta a notificação mais antiga
+OVERFLOW_DROP_NEW = 'drop_new'         # Descarta a notificação que chegou
+OVERFLOW_BLOCK = 'block'               # Espera até enqueue_timeout, depois descarta
+
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEW, OVERFLOW_BLOCK)
+
+
+class _QueuedNotification:
+    """Item da fila de notificações (attempt: tentativas já feitas)"""
+
+    __slots__ = ('key', 'alert', 'enqueued_at', 'attempt', 'not_before')
+
+    def __init__(self, key, alert, enqueued_at: float):
+        self.key = key
+        self.alert = alert
+        self.enqueued_at = enqueued_at
+        self.attempt = 0
+        self.not_before = 0.0
+
+
+class NotificationDispatcher:
+    """
+    Fila limitada de notificações atendida por um pool de workers.
+
+    O enqueue é O(1) e nunca executa I/O, então pode ser chamado direto do
+    callback MQTT. Alertas pendentes com a mesma chave (sensor, tipo) são
+    coalescidos: o item já na fila passa a carregar o alerta mais recente.
+    
+    Um envio que falha não espera no worker: o item vai para uma fila de
+    retentativas com not_before = agora + retry_delay e volta ao fim da fila
+    quando vence. Os workers seguem atendendo outros alertas enquanto isso
+    e itens aguardando retentativa não ocupam a capacidade da fila.
+    """
+
+    def __init__(self, send_fn: Callable, queue_size: int = 100, workers: int = 2,
+                 overflow_policy: str = OVERFLOW_DROP_OLDEST, enqueue_timeout: float = 0.05,
+                 retry_attempts: int = 3, retry_delay: float = 60,
+                 on_sent: Optional[Callable] = None, on_enqueue: Optional[Callable] = None,
+                 on_delivered: Optional[Callable] = None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Política de estouro inválida: {overflow_policy}")
+
+        self.send_fn = send_fn
+        self.on_sent = on_sent
+        self.on_enqueue = on_enqueue  # Acorda consumidores externos (runtime asyncio)
+        self.on_delivered = on_delivered  # (espera, duração, enviado) para métricas
+        self.queue_size = max(1, queue_size)
+        self.workers = workers
+        self.overflow_policy = overflow_policy
+        self.enqueue_timeout = enqueue_timeout
+        self.retry_attempts = max(1, retry_attempts)
+        self.retry_delay = retry_delay
+
+        self._queue = deque()
+        self._pending = {}
+        # Heap de (not_before, seq, item) aguardando retentativa
+        self._retries = []
+        self._retry_seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._threads = []
+
+        # Métricas
+        self._stats = {
+            'enqueued': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'sent': 0,
+            'failed': 0,
+            'retried': 0,
+            'max_depth': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0,
+            'send_total': 0.0,
+            'send_max': 0.0
+        }
+
+    # ------------------------------------------------------------------------
+    # CICLO DE VIDA
+    # ------------------------------------------------------------------------
+
+    def start(self):
+        """Inicia as threads de envio"""
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"notifier-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Despachante de notificações iniciado ({self.workers} workers, "
+                    f"fila={self.queue_size}, política={self.overflow_policy})")
+
+    def stop(self, timeout: float = 10.0):
+        """Para os workers, aguardando até timeout para esvaziar a fila"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._queue and time.monotonic() < deadline:
+                self._cond.wait(0.1)
+            self._stop_event.set()
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+        discarded = len(self._queue) + len(self._retries)
+        if discarded:
+            logger.warning(f"{discarded} notificações descartadas no shutdown")
+
+    # ------------------------------------------------------------------------
+    # PRODUTOR
+    # ------------------------------------------------------------------------
+
+    def submit(self, alert) -> bool:
+        """Enfileira um alerta; retorna False se foi descartado"""
+        key = (alert.esp_id, alert.alert_type)
+        now = time.monotonic()
+
+        with self._cond:
+            queued = self._pending.get(key)
+            if queued is not None:
+                queued.alert = alert
+                self._stats['coalesced'] += 1
+                return True
+
+            if len(self._queue) >= self.queue_size:
+                if not self._make_room(now):
+                    self._stats['dropped'] += 1
+                    logger.warning(f"Fila de notificações cheia, alerta descartado: "
+                                   f"{alert.alert_type} ({alert.esp_id})")
+                    return False
+
+            item = _QueuedNotification(key, alert, now)
+            self._queue.append(item)
+            self._pending[key] = item
+            self._stats['enqueued'] += 1
+            if len(self._queue) > self._stats['max_depth']:
+                self._stats['max_depth'] = len(self._queue)
+            self._cond.notify()
+        
+        if self.on_enqueue:
+            self.on_enqueue()
+        return True
+
+    def _make_room(self, now: float) -> bool:
+        """Libera espaço na fila conforme a política (chamado com o lock)"""
+        if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            oldest = self._queue.popleft()
+            del self._pending[oldest.key]
+            self._stats['dropped'] += 1
+            logger.warning(f"Fila de notificações cheia, descartando alerta antigo: "
+                           f"{oldest.alert.alert_type} ({oldest.alert.esp_id})")
+            return True
+
+        if self.overflow_policy == OVERFLOW_BLOCK:
+            deadline = now + self.enqueue_timeout
+            while len(self._queue) >= self.queue_size and not self._stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return len(self._queue) < self.queue_size
+
+        return False
+
+    # ------------------------------------------------------------------------
+    # CONSUMIDORES
+    # ------------------------------------------------------------------------
+
+    def _release_retries(self, now: float) -> Optional[float]:
+        """Move para a fila as retentativas vencidas; retorna a espera até a próxima (com o lock)"""
+        retries = self._retries
+        while retries and retries[0][0] <= now:
+            item = heapq.heappop(retries)[2]
+            if self._pending.get(item.key) is item:
+                self._queue.append(item)
+        return retries[0][0] - now if retries else None
+
+    def next_retry_in(self) -> Optional[float]:
+        """Segundos até a próxima retentativa vencer (None se não há)"""
+        with self._cond:
+            return self._release_retries(time.monotonic())
+
+    def _next_item(self) -> Optional[_QueuedNotification]:
+        """Bloqueia até haver um item ou o despachante parar"""
+        with self._cond:
+            while not self._stop_event.is_set():
+                wait = self._release_retries(time.monotonic())
+                if self._queue:
+                    break
+                self._cond.wait(wait)
+            if not self._queue:
+                return None
+            item = self._queue.popleft()
+            del self._pending[item.key]
+            # Acorda produtores em modo 'block' e o stop() aguardando a fila esvaziar
+            self._cond.notify_all()
+            return item
+
+    def poll(self) -> Optional[_QueuedNotification]:
+        """Retira um item sem bloquear (consumidores externos ao pool)"""
+        with self._cond:
+            self._release_retries(time.monotonic())
+            if not self._queue:
+                return None
+            item = self._queue.popleft()
+            del self._pending[item.key]
+            self._cond.notify_all()
+            return item
+
+    def _worker(self):
+        """Loop de envio de uma thread do pool"""
+        while True:
+            item = self._next_item()
+            if item is None:
+                return
+            self.deliver(item)
+
+    def _schedule_retry(self, item: _QueuedNotification, now: float) -> bool:
+        """Reagenda um envio que falhou; False se outro alerta da chave já está na fila"""
+        with self._cond:
+            if self._stop_event.is_set() or item.key in self._pending:
+                return False
+            item.not_before = now + self.retry_delay
+            self._pending[item.key] = item
+            heapq.heappush(self._retries, (item.not_before, next(self._retry_seq), item))
+            self._stats['retried'] += 1
+            self._cond.notify()
+        if self.on_enqueue:
+            self.on_enqueue()
+        return True
+
+    def deliver(self, item: _QueuedNotification):
+        """Faz uma tentativa de envio; em falha reagenda o item, senão registra as métricas"""
+        started = time.monotonic()
+        wait = started - item.enqueued_at
+        alert = item.alert
+        item.attempt += 1
+
+        try:
+            self.send_fn(alert)
+            alert.sent = True
+        except Exception as e:
+            alert.retry_count += 1
+            logger.error(f"Falha ao enviar notificação {alert.alert_type} para "
+                         f"{alert.esp_id} (tentativa {item.attempt}/{self.retry_attempts}): {e}")
+            if item.attempt < self.retry_attempts and self._schedule_retry(item, time.monotonic()):
+                return
+
+        duration = time.monotonic() - started
+        with self._cond:
+            self._stats['sent' if alert.sent else 'failed'] += 1
+            self._stats['wait_total'] += wait
+            self._stats['wait_max'] = max(self._stats['wait_max'], wait)
+            self._stats['send_total'] += duration
+            self._stats['send_max'] = max(self._stats['send_max'], duration)
+
+        if self.on_delivered:
+            self.on_delivered(wait, duration, alert.sent)
+
+        if alert.sent and self.on_sent:
+            try:
+                self.on_sent(alert)
+            except Exception as e:
+                logger.error(f"Erro no callback de notificação enviada: {e}")
+
+    # ------------------------------------------------------------------------
+    # MÉTRICAS
+    # ------------------------------------------------------------------------
+
+    def queue_depth(self) -> int:
+        """Número de notificações aguardando envio"""
+        return len(self._queue)
+
+    def get_stats(self) -> Dict:
+        """Retorna métricas da fila e latências (em ms)"""
+        with self._cond:
+            stats = dict(self._stats)
+            depth = len(self._queue)
+            retry_pending = len(self._retries)
+
+        processed = stats['sent'] + stats['failed']
+        return {
+            'queue_depth': depth,
+            'queue_capacity': self.queue_size,
+            'max_depth': stats['max_depth'],
+            'enqueued': stats['enqueued'],
+            'coalesced': stats['coalesced'],
+            'dropped': stats['dropped'],
+            'sent': stats['sent'],
+            'failed': stats['failed'],
+            'retried': stats['retried'],
+            'retry_pending': retry_pending,
+            'avg_wait_ms': round(stats['wait_total'] / processed * 1000, 2) if processed else 0.0,
+            'max_wait_ms': round(stats['wait_max'] * 1000, 2),
+            'avg_send_ms': round(stats['send_total'] / processed * 1000, 2) if processed else 0.0,
+            'max_send_ms': round(stats['send_max'] * 1000, 2)
+        }
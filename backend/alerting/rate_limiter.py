@@ -0,0 +1,229 @@
+# ============================================================================
+# RATE LIMITER DE ALERTAS (GCRA)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Cada orçamento é um "balde" GCRA (generic cell rate algorithm): para N
+# alertas por período guarda só o horário teórico de chegada (TAT) da chave,
+# um float. Um alerta é aceito se TAT - agora <= período - intervalo, e então
+# o TAT avança um intervalo (período / N). Isso equivale a um token bucket com
+# capacidade N, em O(1) e memória fixa por chave, sem lista de horários.
+#
+# Orçamentos aplicados a cada alerta (todos precisam aceitar):
+#
+#   global      max_alerts_global_per_minute   todos os sensores juntos
+#   tipo        max_alerts_per_type_per_minute por alert_type
+#   sensor      max_alerts_per_minute          por esp_id
+#   sensor/tipo max_emails_per_hour            por (esp_id, alert_type)
+#
+# O AlertManager só consulta o limiter para alertas que passaram do cooldown
+# e vão virar email: repetições suprimidas não gastam os orçamentos
+# compartilhados (tipo e global) dos outros sensores.
+#
+# As chaves ficam em shards com lock próprio, então threads de sensores
+# diferentes não disputam o mesmo lock. Uma chave com TAT no passado está com
+# o balde cheio e pode ser descartada sem mudar o comportamento: evict_idle()
+# faz isso na limpeza periódica.
+
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+
+BUDGET_GLOBAL = 'global'
+BUDGET_TYPE = 'alert_type'
+BUDGET_SENSOR = 'sensor'
+BUDGET_SENSOR_TYPE = 'sensor_type'
+
+
+class _Shard:
+    __slots__ = ('lock', 'tat')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tat = {}
+
+
+class GCRABudget:
+    """Limite de `limit` eventos por `period` segundos, por chave"""
+
+    def __init__(self, limit: int, period: float, shards: int = 16):
+        self.limit = limit
+        self.period = period
+        self.interval = period / limit if limit > 0 else 0.0
+        # Rajada permitida: o balde começa cheio com `limit` eventos
+        self.tolerance = period - self.interval
+        # Potência de 2 para escolher o shard com uma máscara
+        size = 1
+        while size < max(1, shards):
+            size <<= 1
+        self._mask = size - 1
+        self._shards = [_Shard() for _ in range(size)]
+
+    def acquire(self, key, now: float) -> bool:
+        """Consome um evento da chave, se couber no orçamento"""
+        if self.limit <= 0:
+            return True
+        shard = self._shards[hash(key) & self._mask]
+        with shard.lock:
+            tat = shard.tat.get(key, now)
+            if tat < now:
+                tat = now
+            if tat - now > self.tolerance:
+                return False
+            shard.tat[key] = tat + self.interval
+            return True
+
+    def refund(self, key):
+        """Devolve um evento consumido (outro orçamento recusou o alerta)"""
+        if self.limit <= 0:
+            return
+        shard = self._shards[hash(key) & self._mask]
+        with shard.lock:
+            tat = shard.tat.get(key)
+            if tat is not None:
+                shard.tat[key] = tat - self.interval
+
+    def items(self, now: float) -> List[Tuple[Hashable, float]]:
+        """Chaves com balde não cheio e seus TATs (para o snapshot de estado)"""
+        entries = []
+        for shard in self._shards:
+            with shard.lock:
+                entries.extend((key, tat) for key, tat in shard.tat.items() if tat > now)
+        return entries
+
+    def restore(self, key, tat: float):
+        """Recoloca o TAT de uma chave (carga do snapshot)"""
+        shard = self._shards[hash(key) & self._mask]
+        with shard.lock:
+            shard.tat[key] = max(tat, shard.tat.get(key, tat))
+
+    def evict_idle(self, now: float) -> int:
+        """Remove chaves com o balde cheio (TAT no passado)"""
+        evicted = 0
+        for shard in self._shards:
+            with shard.lock:
+                idle = [key for key, tat in shard.tat.items() if tat <= now]
+                for key in idle:
+                    del shard.tat[key]
+                evicted += len(idle)
+        return evicted
+
+    def limited_keys(self, now: float) -> int:
+        """Chaves sem folga para mais um evento agora"""
+        limited = 0
+        for shard in self._shards:
+            with shard.lock:
+                limited += sum(1 for tat in shard.tat.values() if tat - now > self.tolerance)
+        return limited
+
+    def __len__(self):
+        return sum(len(shard.tat) for shard in self._shards)
+
+
+class RateLimiter:
+    """Controla rate limiting de alertas (global, por tipo, por sensor e por sensor/tipo)"""
+
+    def __init__(self, config: Dict, clock=time.monotonic):
+        self.enabled = config.get('enabled', True)
+        shards = config.get('shards', 16)
+        self.clock = clock
+        # Ordem dos orçamentos: do mais específico ao global, para recusar
+        # cedo sem tocar no lock compartilhado por todos os sensores
+        self.budgets = (
+            (BUDGET_SENSOR_TYPE, GCRABudget(config.get('max_emails_per_hour', 0), 3600.0, shards)),
+            (BUDGET_SENSOR, GCRABudget(config.get('max_alerts_per_minute', 0), 60.0, shards)),
+            (BUDGET_TYPE, GCRABudget(config.get('max_alerts_per_type_per_minute', 0), 60.0, shards)),
+            (BUDGET_GLOBAL, GCRABudget(config.get('max_alerts_global_per_minute', 0), 60.0, 1)),
+        )
+        self.rejected = {name: 0 for name, _ in self.budgets}
+        self.accepted = 0
+
+    def acquire(self, esp_id: str, alert_type: str, now: float = None) -> Optional[str]:
+        """
+        Consome o alerta em todos os orçamentos.
+
+        Retorna None se foi aceito ou o nome do orçamento que recusou; os
+        orçamentos já consumidos antes da recusa são devolvidos.
+        """
+        if not self.enabled:
+            return None
+        if now is None:
+            now = self.clock()
+        keys = ((esp_id, alert_type), esp_id, alert_type, None)
+        for index, (name, budget) in enumerate(self.budgets):
+            if not budget.acquire(keys[index], now):
+                for previous in range(index):
+                    self.budgets[previous][1].refund(keys[previous])
+                self.rejected[name] += 1
+                return name
+        self.accepted += 1
+        return None
+
+    def can_send_alert(self, esp_id: str, alert_type: str) -> bool:
+        """Verifica se pode enviar alerta"""
+        return self.acquire(esp_id, alert_type) is None
+
+    # Os TATs usam o relógio monotônico (não sobrevive a restart); no snapshot
+    # e no log de estado eles vão em epoch, convertidos pela diferença atual
+    # entre os dois relógios
+
+    def _to_clock(self, wall: float) -> float:
+        return wall - time.time() + self.clock()
+
+    def export_state(self) -> List[Tuple[str, str, str, float]]:
+        """Chaves ativas como (orçamento, esp_id, alert_type, TAT em epoch)"""
+        now = self.clock()
+        offset = time.time() - now
+        entries = []
+        for name, budget in self.budgets:
+            for key, tat in budget.items(now):
+                if name == BUDGET_SENSOR_TYPE:
+                    esp_id, alert_type = key
+                elif name == BUDGET_SENSOR:
+                    esp_id, alert_type = key, ''
+                elif name == BUDGET_TYPE:
+                    esp_id, alert_type = '', key
+                else:
+                    esp_id, alert_type = '', ''
+                entries.append((name, esp_id, alert_type, tat + offset))
+        return entries
+
+    def restore_state(self, entries) -> int:
+        """Recarrega as chaves exportadas por export_state()"""
+        budgets = dict(self.budgets)
+        keys = {
+            BUDGET_SENSOR_TYPE: lambda esp_id, alert_type: (esp_id, alert_type),
+            BUDGET_SENSOR: lambda esp_id, alert_type: esp_id,
+            BUDGET_TYPE: lambda esp_id, alert_type: alert_type,
+            BUDGET_GLOBAL: lambda esp_id, alert_type: None
+        }
+        restored = 0
+        for name, esp_id, alert_type, tat in entries:
+            if name in budgets:
+                budgets[name].restore(keys[name](esp_id, alert_type), self._to_clock(tat))
+                restored += 1
+        return restored
+
+    def replay(self, esp_id: str, alert_type: str, at: float):
+        """Reaplica um alerta aceito no horário `at` (epoch), vindo do log de estado"""
+        now = self._to_clock(at)
+        keys = ((esp_id, alert_type), esp_id, alert_type, None)
+        for (_, budget), key in zip(self.budgets, keys):
+            budget.acquire(key, now)
+
+    def evict_idle(self) -> int:
+        """Descarta as chaves ociosas de todos os orçamentos"""
+        now = self.clock()
+        return sum(budget.evict_idle(now) for _, budget in self.budgets)
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas do rate limiter"""
+        now = self.clock()
+        return {
+            'active_limits': sum(len(budget) for _, budget in self.budgets),
+            'total_limited_keys': sum(budget.limited_keys(now) for _, budget in self.budgets),
+            'accepted': self.accepted,
+            'rejected': dict(self.rejected),
+            'budgets': {name: {'limit': budget.limit, 'period_seconds': budget.period, 'keys': len(budget)}
+                        for name, budget in self.budgets}
+        }
@@ -0,0 +1,418 @@
+# ============================================================================
+# SNAPSHOT E LOG DE DELTAS DO ESTADO DO ALERTMANAGER
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# O estado em memória (histórico de temperatura por sensor, cooldowns, rate
+# limiter) sobrevive a um restart em dois arquivos no diretório configurado:
+#
+#   alert_state.snap   snapshot binário completo, gravado a cada
+#                      snapshot_interval (arquivo temporário + os.replace)
+#   alert_state.log    log append-only dos eventos desde o último snapshot,
+#                      reiniciado a cada snapshot (o anterior fica em .prev
+#                      até o snapshot novo estar no disco)
+#
+# Na inicialização o snapshot é carregado e o log reaplicado por cima. Cada
+# arquivo de log começa com um registro G com a sua geração (sequência que
+# cresce a cada troca de log) e o snapshot guarda a geração do último log que
+# ele já contém: logs dessa geração ou anteriores não são reaplicados. Assim
+# uma queda entre gravar o snapshot e apagar o .prev não conta duas vezes os
+# alertas do rate limiter. O snapshot é escrito com struct/array
+# (little-endian), sem pickle:
+#
+#   cabeçalho  'AMSS' | uint8 versão | float64 salvo_em | uint64 geração do
+#              log coberto | uint32 crc32 do corpo
+#   corpo      seções com uint32 quantidade + registros; strings são uint16
+#              tamanho + UTF-8; o histórico de cada sensor vai como dois
+#              blocos float64 (horários e valores) copiados direto do array
+#
+# Registros do log: uint8 tipo | uint16 tamanho | dados. Um registro cortado
+# no fim (queda no meio da escrita) encerra a leitura sem erro:
+#
+#   G  geração do arquivo de log          uint64 (primeiro registro)
+#   R  leitura recebida   esp_id, horário da amostra, temperatura, umidade
+#   L  alerta aceito pelo rate limiter   esp_id, alert_type, horário
+#   A  alerta tratado (cooldown)          esp_id, alert_type, severidade, horário
+#
+# O log é bufferizado e vai para o disco em flush() (chamado a cada
+# log_flush_interval): uma queda perde no máximo esse intervalo.
+
+import logging
+import os
+import struct
+import threading
+import zlib
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = 'alert_state.snap'
+LOG_FILE = 'alert_state.log'
+
+MAGIC = b'AMSS'
+VERSION = 2
+
+HEADER = struct.Struct('<4sBdQI')
+HEADER_V1 = struct.Struct('<4sBdI')     # sem geração do log: reaplica o log todo
+COUNT = struct.Struct('<I')
+STRING = struct.Struct('<H')
+FLOAT = struct.Struct('<d')
+SENSOR = struct.Struct('<dddiB')        # last_seen, temperatura, umidade, alert_count, online
+RECORD = struct.Struct('<BH')
+
+RECORD_GENERATION = ord('G')
+RECORD_READING = ord('R')
+RECORD_RATE_LIMIT = ord('L')
+RECORD_ALERT = ord('A')
+
+READING = struct.Struct('<ddd')
+GENERATION = struct.Struct('<Q')
+
+
+class SnapshotError(ValueError):
+    """Snapshot de estado ilegível (mágico, versão ou CRC)"""
+
+
+# ----------------------------------------------------------------------------
+# CODIFICAÇÃO
+# ----------------------------------------------------------------------------
+
+def _pack_string(parts: List[bytes], value: str):
+    data = value.encode('utf-8')
+    parts.append(STRING.pack(len(data)))
+    parts.append(data)
+
+
+class _Reader:
+    """Cursor sobre um buffer binário"""
+
+    __slots__ = ('data', 'offset')
+
+    def __init__(self, data: bytes, offset: int = 0):
+        self.data = data
+        self.offset = offset
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def string(self) -> str:
+        (size,) = self.unpack(STRING)
+        start = self.offset
+        self.offset += size
+        return bytes(self.data[start:self.offset]).decode('utf-8')
+
+    def floats(self, count: int) -> array:
+        values = array('d')
+        end = self.offset + 8 * count
+        values.frombytes(self.data[self.offset:end])
+        self.offset = end
+        return values
+
+
+def encode_snapshot(state: Dict, saved_at: float, log_generation: int = 0) -> bytes:
+    """
+    Serializa o estado; log_generation é a geração do último log já contido
+    nele. Formato de `state`:
+
+        sensors:          [(esp_id, last_seen, temperatura, umidade, alert_count,
+                            online, horários, valores)]  (horários/valores: array('d'))
+        last_alert_time:  [(esp_id, horário)]
+        cooldowns:        [(esp_id, alert_type, severidade, prazo)]
+        rate_limits:      [(orçamento, esp_id, alert_type, TAT em epoch)]
+    """
+    parts = []
+
+    sensors = state.get('sensors', [])
+    parts.append(COUNT.pack(len(sensors)))
+    for esp_id, last_seen, temperature, humidity, alert_count, online, timestamps, values in sensors:
+        _pack_string(parts, esp_id)
+        parts.append(SENSOR.pack(last_seen, temperature, humidity, alert_count, 1 if online else 0))
+        parts.append(COUNT.pack(len(timestamps)))
+        parts.append(timestamps.tobytes())
+        parts.append(values.tobytes())
+
+    last_alert_time = state.get('last_alert_time', [])
+    parts.append(COUNT.pack(len(last_alert_time)))
+    for esp_id, at in last_alert_time:
+        _pack_string(parts, esp_id)
+        parts.append(FLOAT.pack(at))
+
+    cooldowns = state.get('cooldowns', [])
+    parts.append(COUNT.pack(len(cooldowns)))
+    for esp_id, alert_type, severity, deadline in cooldowns:
+        _pack_string(parts, esp_id)
+        _pack_string(parts, alert_type)
+        _pack_string(parts, severity)
+        parts.append(FLOAT.pack(deadline))
+
+    rate_limits = state.get('rate_limits', [])
+    parts.append(COUNT.pack(len(rate_limits)))
+    for budget, esp_id, alert_type, tat in rate_limits:
+        _pack_string(parts, budget)
+        _pack_string(parts, esp_id)
+        _pack_string(parts, alert_type)
+        parts.append(FLOAT.pack(tat))
+
+    body = b''.join(parts)
+    return HEADER.pack(MAGIC, VERSION, saved_at, log_generation, zlib.crc32(body)) + body
+
+
+def decode_snapshot(data: bytes) -> Tuple[float, Dict]:
+    """
+    Lê um snapshot; retorna (salvo_em, estado) no formato de encode_snapshot,
+    com a geração do log coberto em estado['log_generation'] (None na versão 1)
+    """
+    if len(data) < HEADER_V1.size:
+        raise SnapshotError("snapshot truncado")
+    magic, version = data[:4], data[4]
+    if magic != MAGIC:
+        raise SnapshotError("mágico inválido")
+    if version == VERSION:
+        if len(data) < HEADER.size:
+            raise SnapshotError("snapshot truncado")
+        _, _, saved_at, log_generation, crc = HEADER.unpack_from(data)
+        header_size = HEADER.size
+    elif version == 1:
+        _, _, saved_at, crc = HEADER_V1.unpack_from(data)
+        log_generation, header_size = None, HEADER_V1.size
+    else:
+        raise SnapshotError(f"versão {version} não suportada")
+    body = memoryview(data)[header_size:]
+    if zlib.crc32(body) != crc:
+        raise SnapshotError("CRC do snapshot não confere")
+
+    reader = _Reader(body)
+    try:
+        sensors = []
+        for _ in range(reader.unpack(COUNT)[0]):
+            esp_id = reader.string()
+            last_seen, temperature, humidity, alert_count, online = reader.unpack(SENSOR)
+            (count,) = reader.unpack(COUNT)
+            timestamps = reader.floats(count)
+            values = reader.floats(count)
+            sensors.append((esp_id, last_seen, temperature, humidity, alert_count, bool(online),
+                            timestamps, values))
+
+        last_alert_time = []
+        for _ in range(reader.unpack(COUNT)[0]):
+            esp_id = reader.string()
+            last_alert_time.append((esp_id, reader.unpack(FLOAT)[0]))
+
+        cooldowns = []
+        for _ in range(reader.unpack(COUNT)[0]):
+            esp_id, alert_type, severity = reader.string(), reader.string(), reader.string()
+            cooldowns.append((esp_id, alert_type, severity, reader.unpack(FLOAT)[0]))
+
+        rate_limits = []
+        for _ in range(reader.unpack(COUNT)[0]):
+            budget, esp_id, alert_type = reader.string(), reader.string(), reader.string()
+            rate_limits.append((budget, esp_id, alert_type, reader.unpack(FLOAT)[0]))
+    except (struct.error, UnicodeDecodeError) as e:
+        raise SnapshotError(f"snapshot malformado: {e}")
+
+    return saved_at, {
+        'sensors': sensors,
+        'last_alert_time': last_alert_time,
+        'cooldowns': cooldowns,
+        'rate_limits': rate_limits,
+        'log_generation': log_generation
+    }
+
+
+def decode_log(data: bytes) -> Iterator[tuple]:
+    """
+    Registros do log em ordem:
+
+        ('G', geração)
+        ('R', esp_id, horário, temperatura, umidade)
+        ('L', esp_id, alert_type, horário)
+        ('A', esp_id, alert_type, severidade, horário)
+    """
+    view = memoryview(data)
+    offset = 0
+    while offset + RECORD.size <= len(view):
+        kind, size = RECORD.unpack_from(view, offset)
+        start = offset + RECORD.size
+        end = start + size
+        if end > len(view):
+            logger.warning("Registro incompleto no fim do log de estado ignorado")
+            return
+        reader = _Reader(view[:end], start)
+        try:
+            if kind == RECORD_READING:
+                esp_id = reader.string()
+                yield ('R', esp_id) + reader.unpack(READING)
+            elif kind == RECORD_GENERATION:
+                yield ('G',) + reader.unpack(GENERATION)
+            elif kind == RECORD_RATE_LIMIT:
+                esp_id, alert_type = reader.string(), reader.string()
+                yield ('L', esp_id, alert_type, reader.unpack(FLOAT)[0])
+            elif kind == RECORD_ALERT:
+                esp_id, alert_type, severity = reader.string(), reader.string(), reader.string()
+                yield ('A', esp_id, alert_type, severity, reader.unpack(FLOAT)[0])
+        except (struct.error, UnicodeDecodeError):
+            logger.warning("Registro malformado no log de estado ignorado")
+        offset = end
+
+
+# ----------------------------------------------------------------------------
+# ARQUIVOS
+# ----------------------------------------------------------------------------
+
+class StateStore:
+    """Snapshot binário + log append-only do estado do AlertManager"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.log_path = os.path.join(directory, LOG_FILE)
+        self.previous_log_path = self.log_path + '.prev'
+        self._lock = threading.Lock()
+        self._log = None
+        # Geração do log atual (cresce a cada snapshot; ajustada em load())
+        self.generation = 1
+        self.stats = {
+            'snapshots': 0,
+            'last_snapshot_bytes': 0,
+            'log_records': 0
+        }
+
+    def _open_log(self):
+        """Abre o log para anexar (chamado com o lock); arquivo novo começa pela geração"""
+        if self._log is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._log = open(self.log_path, 'ab')
+            if self._log.tell() == 0:
+                self._log.write(RECORD.pack(RECORD_GENERATION, GENERATION.size))
+                self._log.write(GENERATION.pack(self.generation))
+        return self._log
+
+    def _append(self, kind: int, payload: List[bytes]):
+        data = b''.join(payload)
+        with self._lock:
+            log = self._open_log()
+            log.write(RECORD.pack(kind, len(data)))
+            log.write(data)
+            self.stats['log_records'] += 1
+
+    def append_reading(self, esp_id: str, sample_time: float, temperature: float, humidity: float):
+        parts = []
+        _pack_string(parts, esp_id)
+        parts.append(READING.pack(sample_time, temperature, humidity))
+        self._append(RECORD_READING, parts)
+
+    def append_rate_limit(self, esp_id: str, alert_type: str, at: float):
+        parts = []
+        _pack_string(parts, esp_id)
+        _pack_string(parts, alert_type)
+        parts.append(FLOAT.pack(at))
+        self._append(RECORD_RATE_LIMIT, parts)
+
+    def append_alert(self, esp_id: str, alert_type: str, severity: str, at: float):
+        parts = []
+        _pack_string(parts, esp_id)
+        _pack_string(parts, alert_type)
+        _pack_string(parts, severity)
+        parts.append(FLOAT.pack(at))
+        self._append(RECORD_ALERT, parts)
+
+    def flush(self):
+        """Envia o log bufferizado para o sistema operacional"""
+        with self._lock:
+            if self._log is not None:
+                self._log.flush()
+
+    def prepare_snapshot(self, build_state, saved_at: float) -> bytes:
+        """
+        Captura o estado e reinicia o log; retorna o snapshot codificado.
+
+        build_state() é chamado com o lock do log: nenhum registro entra entre
+        a captura e a troca do log. O log antigo fica em .prev até
+        write_snapshot() gravar o snapshot, então uma queda no meio não perde
+        deltas; o snapshot leva a geração desse log, que load() deixa de
+        reaplicar se ele sobrar no disco. O log seguinte é da geração nova.
+        """
+        with self._lock:
+            data = encode_snapshot(build_state(), saved_at, self.generation)
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            if os.path.exists(self.log_path):
+                os.replace(self.log_path, self.previous_log_path)
+            self.generation += 1
+        return data
+
+    def write_snapshot(self, data: bytes):
+        """Grava o snapshot (temporário + os.replace) e descarta o log anterior (fora do lock)"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        try:
+            os.remove(self.previous_log_path)
+        except FileNotFoundError:
+            pass
+
+        self.stats['snapshots'] += 1
+        self.stats['last_snapshot_bytes'] = len(data)
+
+    def load(self) -> Tuple[Optional[float], Optional[Dict], List[tuple]]:
+        """
+        Lê snapshot e log do disco: (salvo_em, estado, registros do log).
+
+        Só entram os registros de logs mais novos que o snapshot; a geração
+        do log atual continua a maior encontrada (a próxima, se ele não existe).
+        """
+        saved_at, state = None, None
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                saved_at, state = decode_snapshot(f.read())
+        except FileNotFoundError:
+            pass
+        except SnapshotError as e:
+            logger.error(f"Snapshot de estado ignorado: {e}")
+        covered = state['log_generation'] if state is not None else None
+        latest = covered or 0
+
+        records = []
+        current, current_covered = None, False
+        for path in (self.previous_log_path, self.log_path):
+            try:
+                with open(path, 'rb') as f:
+                    log = list(decode_log(f.read()))
+            except FileNotFoundError:
+                continue
+            # Log sem registro G (versão antiga) é sempre reaplicado
+            generation = log[0][1] if log and log[0][0] == 'G' else None
+            if generation is not None:
+                latest = max(latest, generation)
+                if covered is not None and generation <= covered:
+                    logger.info(f"Log de estado da geração {generation} já está no snapshot, ignorado")
+                    current_covered = path == self.log_path
+                    continue
+            if path == self.log_path:
+                current = generation
+            records.extend(record for record in log if record[0] != 'G')
+
+        with self._lock:
+            if self._log is None:
+                if current is not None:
+                    self.generation = current       # continua anexando ao log atual
+                else:
+                    if current_covered:
+                        # Log atual já contido no snapshot: recomeça numa geração nova
+                        os.remove(self.log_path)
+                    self.generation = latest + 1
+        return saved_at, state, records
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
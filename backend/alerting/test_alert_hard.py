@@ -45,6 +45,9 @@ def test_hard_alert():
         except Exception as e:
             print(f"⚠️ Erro ao salvar no banco: {e}")
         
+        # Grava o buffer do banco e encerra threads
+        alert_manager.shutdown()
+        
         print("\n🎉 TESTE CONCLUÍDO COM SUCESSO!")
         print("📬 Verifique sua caixa de e-mail!")
         
@@ -0,0 +1,80 @@
+# ============================================================================
+# TESTES DO ALERTMANAGER (HORÁRIO DO EVENTO E CONTAGEM DE ALERTAS)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import json
+import time
+
+from prometheus_client import REGISTRY
+
+from metrics import METRICS_PREFIX
+
+
+def _lag_count() -> float:
+    return REGISTRY.get_sample_value(f'{METRICS_PREFIX}_ingest_lag_seconds_count') or 0.0
+
+
+def test_held_reading_alert_reported_by_on_alert(make_manager):
+    manager = make_manager()
+    alerts = []
+    manager.on_alert = alerts.append
+    now = time.time()
+
+    # Retida no buffer de reordenação: nada é avaliado nem retornado ainda
+    assert manager.process_sensor_data('a', 35.0, 50.0, timestamp=now) is None
+    assert alerts == []
+
+    lag_before = _lag_count()
+    manager.release_reordered_readings(drain=True)
+    assert [alert.esp_id for alert in alerts] == ['a']
+    assert [alert.esp_id for alert in manager.sent] == ['a']
+    assert _lag_count() == lag_before + 1
+
+
+def test_return_is_alert_of_released_earlier_reading(make_manager):
+    manager = make_manager()
+    now = time.time()
+    assert manager.process_sensor_data('a', 35.0, 50.0, timestamp=now - 20) is None
+    # A leitura nova libera a anterior (quente); ela mesma fica retida
+    alert = manager.process_sensor_data('a', 22.0, 50.0, timestamp=now)
+    assert alert is not None and alert.data['temperature'] == 35.0
+
+
+def test_stats_count_alerts_released_after_the_message(make_manager):
+    from main import ClusterMonitoringSystem
+
+    system = ClusterMonitoringSystem(alert_manager=make_manager())
+    payload = json.dumps({'temperature': 35.0, 'humidity': 50.0}).encode()
+    system._process_sensor_data('legion32/a', payload)
+    assert system.stats['alerts_generated'] == 0
+
+    system.alert_manager.release_reordered_readings(drain=True)
+    assert system.stats['alerts_generated'] == 1
+
+
+def test_alerts_handled_after_event_lock_is_released(make_manager):
+    manager = make_manager()
+    held = []
+    manager.on_alert = lambda alert: held.append(manager._event_lock.locked())
+    now = time.time()
+    manager.process_sensor_data('a', 35.0, 50.0, timestamp=now - 20)
+    manager.process_sensor_data('a', 36.0, 50.0, timestamp=now)
+    manager.release_reordered_readings(drain=True)
+    assert held == [False, False]
+    assert len(manager.sent) == 1      # a segunda fica no cooldown
+
+
+def test_offline_alert_only_for_sensor_past_its_deadline(make_manager):
+    manager = make_manager()
+    now = time.time()
+    manager.process_sensor_data('a', 22.0, 50.0, timestamp=now - 400)   # limite de offline: 300 s
+    manager.process_sensor_data('b', 22.0, 50.0, timestamp=now)
+    manager.check_sensor_health()
+    assert [(alert.esp_id, alert.alert_type) for alert in manager.sent] == [('a', 'sensor_offline')]
+    assert manager.sensors['a'].status == 'offline' and manager.sensors['b'].status == 'online'
+
+    # Nova leitura re-arma o prazo: nenhum outro alerta de offline
+    manager.process_sensor_data('a', 22.0, 50.0, timestamp=now)
+    manager.check_sensor_health()
+    assert [alert.alert_type for alert in manager.sent] == ['sensor_offline', 'sensor_back_online']
@@ -0,0 +1,83 @@
+# ============================================================================
+# TESTES DO RUNTIME ASYNCIO (TIMERS E WORKERS DE NOTIFICAÇÃO)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import async_runtime
+from alert_manager import AlertEvent
+from notifier import NotificationDispatcher
+
+
+@pytest.fixture
+def system(make_manager, monkeypatch):
+    monkeypatch.setattr(async_runtime, 'AlertManager', lambda start_threads: make_manager())
+    instance = async_runtime.AsyncClusterMonitoringSystem()
+    yield instance
+    instance._db_executor.shutdown(wait=True)
+    instance._blocking_executor.shutdown(wait=True)
+
+
+def _alert(esp_id: str) -> AlertEvent:
+    return AlertEvent(esp_id=esp_id, alert_type='temperature_high', severity='HIGH', message='teste',
+                      timestamp=datetime.now(), data={})
+
+
+def test_every_keeps_running_after_errors(system):
+    calls = []
+
+    def tick():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError('falha na primeira execução')
+
+    async def scenario():
+        system.loop = asyncio.get_running_loop()
+        task = system._every('tick', 0.01, tick)
+        while len(calls) < 3:
+            await asyncio.sleep(0.01)
+        system.running = False
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(scenario())
+    assert calls[:3] == [0, 1, 2]
+
+
+def test_notification_worker_wakes_on_enqueue_and_retry_deadline(system):
+    attempts = []
+    sent = []
+
+    def send(alert):
+        attempts.append(alert.esp_id)
+        if attempts.count(alert.esp_id) == 1 and alert.esp_id == 'a':
+            raise OSError('SMTP indisponível')
+        sent.append(alert.esp_id)
+
+    notifier = NotificationDispatcher(send, workers=1, retry_attempts=2, retry_delay=0.05)
+    system.alert_manager.notifier = notifier
+    system.notification_workers = 1
+
+    async def scenario():
+        system.loop = asyncio.get_running_loop()
+        system._start_notification_workers()
+        # Worker já parado esperando: o enqueue precisa acordá-lo
+        await asyncio.sleep(0.05)
+        notifier.submit(_alert('a'))
+        notifier.submit(_alert('b'))
+        # 'a' volta sem novo enqueue: o worker acorda no prazo da retentativa
+        for _ in range(100):
+            if len(sent) == 2:
+                break
+            await asyncio.sleep(0.01)
+        system.running = False
+        system._notify_event.set()
+        await asyncio.wait(system._notification_tasks, timeout=1)
+
+    asyncio.run(scenario())
+    assert sent == ['b', 'a']
+    assert notifier.get_stats()['retried'] == 1
+    assert all(task.done() for task in system._notification_tasks)
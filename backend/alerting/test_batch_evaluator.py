@@ -0,0 +1,64 @@
+# ============================================================================
+# TESTES DA AVALIAÇÃO DE ALERTAS EM LOTE
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import sys
+import threading
+
+from batch_evaluator import BatchAlertEvaluator
+from cooldown_index import CooldownIndex
+
+
+def test_batch_matches_check_alerts(make_manager):
+    manager = make_manager()
+    evaluator = BatchAlertEvaluator(manager, max_size=8)
+    evaluator.add('a', 28.0, 50.0, 0.0)
+    evaluator.add('b', 22.0, 50.0, 0.0)
+    evaluator.flush()
+    assert [(a.esp_id, a.alert_type, a.severity) for a in manager.sent] == [('a', 'temperature_high', 'HIGH')]
+
+
+def test_batch_thread_and_event_path_send_one_email(make_manager):
+    manager = make_manager()
+    manager.rate_limiter.enabled = False
+    evaluator = BatchAlertEvaluator(manager, max_size=8)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # troca de thread o mais cedo possível
+    try:
+        for _ in range(200):
+            manager.cooldowns = CooldownIndex(300)
+            manager.sent.clear()
+            evaluator.add('a', 28.0, 50.0, 0.0)
+            alert = manager._create_alert('a', 'temperature_high', 'HIGH',
+                                          {'temperature': 28.0, 'humidity': 50.0, 'esp_id': 'a'})
+            barrier = threading.Barrier(2)
+
+            def batch_thread():
+                barrier.wait()
+                evaluator.flush()
+
+            def event_thread():
+                barrier.wait()
+                manager._handle_alert(alert)
+
+            threads = [threading.Thread(target=batch_thread), threading.Thread(target=event_thread)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(manager.sent) == 1
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def test_full_batch_returns_alerts_without_handling(make_manager):
+    manager = make_manager()
+    evaluator = BatchAlertEvaluator(manager, max_size=2)
+    assert evaluator.add('a', 28.0, 50.0, 0.0) == []
+    results = evaluator.add('b', 22.0, 50.0, 0.0)
+    assert [(alert.esp_id, alert.alert_type) for alert, _ in results] == [('a', 'temperature_high')]
+    assert manager.sent == []          # quem chamou add() trata, fora do _event_lock
+    evaluator.handle(results)
+    assert [alert.esp_id for alert in manager.sent] == ['a']
@@ -0,0 +1,62 @@
+# ============================================================================
+# TESTES DO RENDERIZADOR DO GRÁFICO DE TEMPERATURA
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import threading
+import time
+from types import SimpleNamespace
+
+from chart_renderer import TemperatureChartRenderer
+from time_window import SlidingWindow
+
+
+def _sensors(esp_ids, now: float, points: int = 5) -> dict:
+    sensors = {}
+    for esp_id in esp_ids:
+        history = SlidingWindow()
+        for i in range(points):
+            history.append(now - (points - i) * 10, 20.0 + i)
+        sensors[esp_id] = SimpleNamespace(temperature_history=history)
+    return sensors
+
+
+class _RecordingLock:
+    """Lock que conta quantas vezes foi adquirido"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquired = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        self.acquired += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+def test_lines_of_sensors_out_of_render_are_removed():
+    renderer = TemperatureChartRenderer(cache_size=0, dpi=20)
+    now = time.time()
+    for batch in range(5):
+        esp_ids = [f"s{batch}_{i}" for i in range(3)]
+        assert renderer.render(_sensors(esp_ids, now), 10)
+        assert sorted(renderer._lines) == esp_ids
+        assert len(renderer._ax.lines) == 3
+
+    # Sensor que volta ganha linha nova
+    assert renderer.render(_sensors(['s0_0'], now), 10)
+    assert list(renderer._lines) == ['s0_0'] and len(renderer._ax.lines) == 1
+
+
+def test_windows_copied_under_owner_lock_and_filtered_by_period():
+    renderer = TemperatureChartRenderer(dpi=20)
+    now = time.time()
+    sensors = _sensors(['a'], now)
+    sensors.update(_sensors(['old'], now - 3600))   # fora dos últimos 10 minutos
+    lock = _RecordingLock()
+    assert renderer.render(sensors, 10, lock)
+    assert lock.acquired == 1
+    assert list(renderer._lines) == ['a']
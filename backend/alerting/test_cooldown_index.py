@@ -0,0 +1,88 @@
+# ============================================================================
+# TESTES DO ÍNDICE DE COOLDOWN
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+from datetime import datetime
+
+from alert_manager import AlertEvent
+from cooldown_index import CooldownIndex
+
+
+def _alert(esp_id: str, alert_type: str = 'temperature_high', severity: str = 'HIGH') -> AlertEvent:
+    return AlertEvent(esp_id=esp_id, alert_type=alert_type, severity=severity, message='teste',
+                      timestamp=datetime.now(), data={'temperature': 28.0, 'humidity': 50.0})
+
+
+def test_try_start_blocks_repeat_until_deadline():
+    cooldowns = CooldownIndex(300)
+    deadline = cooldowns.try_start('a', 'temperature_high', 'HIGH', now=1000.0)
+    assert deadline == 1300.0
+    assert cooldowns.try_start('a', 'temperature_high', 'HIGH', now=1100.0) is None
+    # Outro tipo e outro sensor têm cooldown próprio
+    assert cooldowns.try_start('a', 'humidity_high', 'HIGH', now=1100.0) is not None
+    assert cooldowns.try_start('b', 'temperature_high', 'HIGH', now=1100.0) is not None
+    assert cooldowns.try_start('a', 'temperature_high', 'HIGH', now=1300.0) == 1600.0
+
+
+def test_severity_escalation_bypasses_lower_cooldown():
+    cooldowns = CooldownIndex(300)
+    assert cooldowns.try_start('a', 'temperature_high', 'MEDIUM', now=1000.0) is not None
+    # Escalada passa; severidade igual ou menor fica suprimida
+    assert cooldowns.try_start('a', 'temperature_high', 'CRITICAL', now=1010.0) is not None
+    assert cooldowns.try_start('a', 'temperature_high', 'HIGH', now=1020.0) is None
+    assert cooldowns.try_start('a', 'temperature_high', 'MEDIUM', now=1020.0) is None
+    assert cooldowns.try_start('a', 'temperature_high', 'CRITICAL', now=1020.0) is None
+
+
+def test_release_undoes_only_own_start():
+    cooldowns = CooldownIndex(300)
+    deadline = cooldowns.try_start('a', 'temperature_high', 'HIGH', now=1000.0)
+    cooldowns.release('a', 'temperature_high', 'HIGH', deadline)
+    assert cooldowns.allows('a', 'temperature_high', 'HIGH', now=1001.0)
+
+    first = cooldowns.try_start('a', 'temperature_high', 'HIGH', now=2000.0)
+    cooldowns.start('a', 'temperature_high', 'HIGH', now=2100.0)  # renovado por outro caminho
+    cooldowns.release('a', 'temperature_high', 'HIGH', first)
+    assert not cooldowns.allows('a', 'temperature_high', 'HIGH', now=2200.0)
+
+
+def test_expire_returns_only_due_keys():
+    cooldowns = CooldownIndex(300)
+    cooldowns.start('a', 'temperature_high', 'HIGH', now=1000.0)
+    cooldowns.start('b', 'temperature_high', 'HIGH', now=1200.0)
+    assert cooldowns.expire(now=1300.0) == [('a', 'temperature_high', 'HIGH')]
+    assert len(cooldowns) == 1
+
+
+def test_handle_alert_suppresses_repeat_and_lets_escalation_through(make_manager):
+    manager = make_manager()
+    manager._handle_alert(_alert('a', severity='HIGH'))
+    manager._handle_alert(_alert('a', severity='HIGH'))
+    manager._handle_alert(_alert('a', alert_type='temperature_high', severity='CRITICAL'))
+    assert [(a.alert_type, a.severity) for a in manager.sent] == [
+        ('temperature_high', 'HIGH'), ('temperature_high', 'CRITICAL')
+    ]
+
+
+def test_cooldowns_restored_from_alert_cooldowns_table(make_manager):
+    first = make_manager()
+    first._handle_alert(_alert('a', severity='HIGH'))
+    first.db_manager.flush()
+    assert len(first.sent) == 1
+
+    # Novo processo no mesmo banco (sem snapshot de estado): o cooldown volta da tabela
+    second = make_manager()
+    assert len(second.cooldowns) == 1
+    second._handle_alert(_alert('a', severity='HIGH'))
+    assert second.sent == []
+    second._handle_alert(_alert('a', severity='CRITICAL'))
+    assert [a.severity for a in second.sent] == ['CRITICAL']
+
+
+def test_expired_cooldowns_are_dropped_from_table(make_manager):
+    manager = make_manager()
+    manager.db_manager.save_cooldown('a', 'temperature_high', 'HIGH', 1.0)
+    manager.db_manager.save_cooldown('b', 'temperature_high', 'HIGH', 4102444800.0)
+    active = manager.db_manager.load_cooldowns(now=1000.0)
+    assert active == [('b', 'temperature_high', 'HIGH', 4102444800.0)]
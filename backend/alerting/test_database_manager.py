@@ -0,0 +1,64 @@
+# ============================================================================
+# TESTES DAS PARTIÇÕES DIÁRIAS DO HISTÓRICO DE LEITURAS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from alert_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'alerts.db'))
+    manager.init_database(start_writer=False)
+    yield manager
+    manager.close()
+
+
+def _tables(db: DatabaseManager):
+    rows = db._get_connection().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'sensor_readings_%'").fetchall()
+    return sorted(name for (name,) in rows)
+
+
+def test_readings_routed_to_partition_of_their_day(db):
+    db.save_reading('a', 20.0, 50.0, datetime(2024, 3, 1, 23, 59, 59))
+    db.save_reading('b', 21.0, 51.0, datetime(2024, 3, 2, 0, 0, 1))
+    db.save_reading('a', 22.0, 52.0, datetime(2024, 3, 2, 12, 0))
+    db.flush()
+
+    assert _tables(db) == ['sensor_readings_20240301', 'sensor_readings_20240302']
+    conn = db._get_connection()
+    assert conn.execute('SELECT COUNT(*) FROM sensor_readings_20240302').fetchone() == (2,)
+    # A view junta todas as partições, como a antiga tabela única
+    rows = conn.execute('SELECT esp_id, temperature FROM sensor_readings ORDER BY timestamp').fetchall()
+    assert rows == [('a', 20.0), ('b', 21.0), ('a', 22.0)]
+
+
+def test_drop_expired_partitions_keeps_retention_window(db):
+    now = datetime.now()
+    for days_ago in (40, 31, 29, 0):
+        db.save_reading('a', float(days_ago), 50.0, now - timedelta(days=days_ago))
+    db.flush()
+
+    expired = db.drop_expired_partitions(30)
+    assert expired == sorted((now - timedelta(days=d)).strftime('%Y%m%d') for d in (40, 31))
+    assert len(_tables(db)) == 2
+    temperatures = db._get_connection().execute('SELECT temperature FROM sensor_readings').fetchall()
+    assert sorted(t for (t,) in temperatures) == [0.0, 29.0]
+    assert db.drop_expired_partitions(30) == []
+
+
+def test_late_reading_recreates_dropped_partition(db):
+    day = datetime.now() - timedelta(days=40)
+    db.save_reading('a', 20.0, 50.0, day)
+    db.flush()
+    db.drop_expired_partitions(30)
+
+    # Leitura atrasada do mesmo dia recria a partição e a view
+    db.save_reading('a', 21.0, 50.0, day)
+    db.flush()
+    assert db._get_connection().execute('SELECT temperature FROM sensor_readings').fetchall() == [(21.0,)]
@@ -0,0 +1,46 @@
+# ============================================================================
+# TESTES DO ROTEAMENTO MQTT DO SISTEMA PRINCIPAL
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import json
+
+import pytest
+
+from main import ClusterMonitoringSystem
+from mqtt_transport import InMemoryMessage
+
+
+@pytest.fixture
+def system(make_manager):
+    manager = make_manager()
+    manager.sensor_registry.auto_register = True
+    return ClusterMonitoringSystem(alert_manager=manager)
+
+
+def _message(system, topic: str, fields: dict):
+    system._on_mqtt_message(None, None, InMemoryMessage(topic, json.dumps(fields).encode()))
+    system.alert_manager.release_reordered_readings(drain=True)
+
+
+def test_status_message_is_not_sensor_data(system):
+    _message(system, 'legion32/status', {'esp_id': 'a', 'status': 'online'})
+    _message(system, 'legion32/alerts', {'esp_id': 'a', 'alert': 'x'})
+    registry = system.alert_manager.sensor_registry
+    assert 'status' not in registry and 'alerts' not in registry
+    assert 'status' not in system.alert_manager.sensors
+    assert system.alert_manager.sent == []
+    assert system.stats['alerts_generated'] == 0
+
+
+def test_only_two_level_sensor_topics_are_processed(system):
+    _message(system, 'legion32/c/extra', {'temperature': 35.0, 'humidity': 50.0})
+    assert 'c' not in system.alert_manager.sensor_registry
+    _message(system, 'legion32/c', {'temperature': 35.0, 'humidity': 50.0})
+    assert 'c' in system.alert_manager.sensor_registry
+    assert [alert.esp_id for alert in system.alert_manager.sent] == ['c']
+
+
+def test_reading_without_temperature_raises_no_alert(system):
+    _message(system, 'legion32/a', {'humidity': 50.0})
+    assert system.alert_manager.sent == []
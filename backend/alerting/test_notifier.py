@@ -0,0 +1,128 @@
+# ============================================================================
+# TESTES DO DESPACHANTE DE NOTIFICAÇÕES
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import notifier as notifier_module
+from alert_manager import AlertEvent
+from notifier import OVERFLOW_DROP_NEW, NotificationDispatcher
+
+
+class _FakeTime:
+    """Substitui o módulo time do notifier: monotonic() manual"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def _alert(esp_id: str, alert_type: str = 'temperature_high') -> AlertEvent:
+    return AlertEvent(esp_id=esp_id, alert_type=alert_type, severity='HIGH', message='teste',
+                      timestamp=datetime.now(), data={})
+
+
+class _FlakySender:
+    """send_fn que falha nas primeiras `failures` tentativas de cada sensor (ou só dos `flaky`)"""
+
+    def __init__(self, failures: int = 1, flaky=None):
+        self.failures = failures
+        self.flaky = flaky
+        self.calls = []
+        self.sent = []
+
+    def __call__(self, alert):
+        self.calls.append(alert.esp_id)
+        if (self.flaky is None or alert.esp_id in self.flaky) and \
+                self.calls.count(alert.esp_id) <= self.failures:
+            raise OSError('SMTP indisponível')
+        self.sent.append(alert.esp_id)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeTime()
+    monkeypatch.setattr(notifier_module, 'time', fake)
+    return fake
+
+
+def test_failed_send_is_rescheduled_not_waited(clock):
+    sender = _FlakySender(failures=1, flaky={'a'})
+    dispatcher = NotificationDispatcher(sender, retry_attempts=3, retry_delay=60)
+    dispatcher.submit(_alert('a'))
+    dispatcher.deliver(dispatcher.poll())
+    assert sender.sent == [] and dispatcher.poll() is None
+    assert dispatcher.next_retry_in() == 60
+
+    # Outro alerta é atendido enquanto 'a' aguarda
+    dispatcher.submit(_alert('b'))
+    dispatcher.deliver(dispatcher.poll())
+    assert sender.sent == ['b'] and dispatcher.poll() is None
+
+    clock.now += 60
+    dispatcher.deliver(dispatcher.poll())
+    assert sender.sent == ['b', 'a']
+    stats = dispatcher.get_stats()
+    assert stats['sent'] == 2 and stats['retried'] == 1 and stats['retry_pending'] == 0
+
+
+def test_gives_up_after_retry_attempts(clock):
+    sender = _FlakySender(failures=10)
+    dispatcher = NotificationDispatcher(sender, retry_attempts=3, retry_delay=5)
+    dispatcher.submit(_alert('a'))
+    for _ in range(3):
+        item = dispatcher.poll()
+        assert item is not None
+        dispatcher.deliver(item)
+        clock.now += 5
+    assert dispatcher.poll() is None
+    assert sender.calls == ['a', 'a', 'a']
+    assert dispatcher.get_stats()['failed'] == 1
+
+
+def test_new_alert_coalesces_into_pending_retry(clock):
+    sender = _FlakySender(failures=1)
+    dispatcher = NotificationDispatcher(sender, retry_delay=5)
+    dispatcher.submit(_alert('a'))
+    dispatcher.deliver(dispatcher.poll())
+    newer = _alert('a')
+    dispatcher.submit(newer)
+    assert dispatcher.queue_depth() == 0 and dispatcher.get_stats()['coalesced'] == 1
+    clock.now += 5
+    item = dispatcher.poll()
+    assert item.alert is newer
+    dispatcher.deliver(item)
+    assert newer.sent
+
+
+def test_overflow_drop_new_when_full(clock):
+    dispatcher = NotificationDispatcher(_FlakySender(failures=0), queue_size=2,
+                                        overflow_policy=OVERFLOW_DROP_NEW)
+    assert dispatcher.submit(_alert('a')) and dispatcher.submit(_alert('b'))
+    assert not dispatcher.submit(_alert('c'))
+    assert dispatcher.submit(_alert('a'))      # coalescido, não ocupa vaga
+    assert dispatcher.get_stats()['dropped'] == 1
+
+
+def test_worker_not_parked_by_failing_sends():
+    sender = _FlakySender(failures=1)
+    dispatcher = NotificationDispatcher(sender, workers=1, retry_attempts=2, retry_delay=0.2)
+    done = threading.Event()
+    dispatcher.on_sent = lambda alert: len(sender.sent) == 4 and done.set()
+    dispatcher.start()
+    try:
+        started = time.monotonic()
+        for esp_id in ('a', 'b', 'c', 'd'):
+            dispatcher.submit(_alert(esp_id))
+        assert done.wait(5)
+        # Um worker, quatro falhas: com espera no worker seriam >= 0.8 s
+        assert time.monotonic() - started < 0.6
+    finally:
+        dispatcher.stop(timeout=1)
@@ -0,0 +1,163 @@
+# ============================================================================
+# TESTES DO RATE LIMITER (GCRA)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+from datetime import datetime
+
+import pytest
+
+import alert_manager as alert_module
+from alert_manager import AlertEvent
+from rate_limiter import (BUDGET_GLOBAL, BUDGET_SENSOR, BUDGET_SENSOR_TYPE, BUDGET_TYPE,
+                          GCRABudget, RateLimiter)
+
+
+class FakeClock:
+    """Relógio manual para o rate limiter e o AlertManager"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _limiter(clock, sensor_type=10, sensor=5, alert_type=30, global_=60) -> RateLimiter:
+    return RateLimiter({
+        'enabled': True,
+        'max_emails_per_hour': sensor_type,
+        'max_alerts_per_minute': sensor,
+        'max_alerts_per_type_per_minute': alert_type,
+        'max_alerts_global_per_minute': global_,
+        'shards': 4
+    }, clock=clock)
+
+
+def test_budget_allows_burst_then_one_per_interval():
+    budget = GCRABudget(limit=5, period=60.0)
+    assert all(budget.acquire('a', 0.0) for _ in range(5))
+    assert not budget.acquire('a', 0.0)
+    assert not budget.acquire('a', 11.9)
+    assert budget.acquire('a', 12.0)       # intervalo = 60 / 5
+    assert not budget.acquire('a', 12.0)
+    # Chaves independentes
+    assert budget.acquire('b', 0.0)
+
+
+def test_budget_refund_returns_slot():
+    budget = GCRABudget(limit=2, period=60.0)
+    assert budget.acquire('a', 0.0) and budget.acquire('a', 0.0)
+    assert not budget.acquire('a', 0.0)
+    budget.refund('a')
+    assert budget.acquire('a', 0.0)
+
+
+def test_budget_zero_limit_is_unlimited():
+    budget = GCRABudget(limit=0, period=60.0)
+    assert all(budget.acquire('a', 0.0) for _ in range(100))
+    assert len(budget) == 0
+
+
+def test_budget_evict_idle_drops_only_full_buckets():
+    budget = GCRABudget(limit=5, period=60.0)
+    budget.acquire('a', 0.0)
+    budget.acquire('b', 50.0)
+    assert budget.evict_idle(20.0) == 1     # TAT de 'a' = 12, de 'b' = 62
+    assert len(budget) == 1
+    assert budget.limited_keys(50.0) == 0
+
+
+def test_limiter_rejection_refunds_earlier_budgets():
+    clock = FakeClock()
+    limiter = _limiter(clock, sensor_type=10, sensor=2)
+    assert limiter.acquire('a', 'temperature_high') is None
+    assert limiter.acquire('a', 'humidity_high') is None
+    # Orçamento do sensor esgotado: sensor/tipo é devolvido
+    assert limiter.acquire('a', 'temperature_variation') == BUDGET_SENSOR
+    assert limiter.rejected[BUDGET_SENSOR] == 1
+    assert limiter.accepted == 2
+    sensor_type = dict(limiter.budgets)[BUDGET_SENSOR_TYPE]
+    tats = dict(sensor_type.items(clock.now))
+    assert set(tats) == {('a', 'temperature_high'), ('a', 'humidity_high')}
+    assert tats[('a', 'temperature_high')] == pytest.approx(clock.now + 360.0)
+
+
+def test_limiter_type_and_global_budgets():
+    clock = FakeClock()
+    limiter = _limiter(clock, sensor_type=0, sensor=0, alert_type=3, global_=4)
+    results = [limiter.acquire(f"s{i}", 'temperature_high') for i in range(4)]
+    assert results == [None, None, None, BUDGET_TYPE]
+    assert limiter.acquire('s9', 'humidity_high') is None
+    assert limiter.acquire('s9', 'humidity_low') == BUDGET_GLOBAL
+    clock.now += 20.0                        # intervalo do tipo = 60 / 3
+    assert limiter.acquire('s5', 'temperature_high') is None
+
+
+def test_limiter_evict_idle_after_recovery():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    limiter.acquire('a', 'temperature_high')
+    assert limiter.get_stats()['active_limits'] == 4
+    clock.now += 3600.0
+    assert limiter.evict_idle() == 4
+    assert limiter.get_stats()['active_limits'] == 0
+
+
+def test_export_restore_state_round_trip():
+    clock = FakeClock()
+    limiter = _limiter(clock, sensor=2)
+    limiter.acquire('a', 'temperature_high')
+    limiter.acquire('a', 'temperature_high')
+    entries = limiter.export_state()
+    assert {name for name, *_ in entries} == {BUDGET_SENSOR_TYPE, BUDGET_SENSOR, BUDGET_TYPE, BUDGET_GLOBAL}
+
+    restored = _limiter(clock, sensor=2)
+    assert restored.restore_state(entries) == len(entries)
+    assert restored.acquire('a', 'humidity_high') == BUDGET_SENSOR
+    assert restored.acquire('b', 'humidity_high') is None
+
+
+# ----------------------------------------------------------------------------
+# Integração com o AlertManager: repetições em cooldown não gastam orçamento
+# ----------------------------------------------------------------------------
+
+class _FakeTime:
+    """Substitui o módulo time do alert_manager: time() manual, o resto real"""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.perf_counter = alert_module.time.perf_counter
+        self.monotonic = alert_module.time.monotonic
+        self.sleep = alert_module.time.sleep
+
+    def time(self) -> float:
+        return self.clock.now
+
+
+def _alert(esp_id: str) -> AlertEvent:
+    return AlertEvent(esp_id=esp_id, alert_type='temperature_high', severity='HIGH', message='teste',
+                      timestamp=datetime.now(), data={'temperature': 28.0, 'humidity': 50.0})
+
+
+def test_new_sensor_alert_not_starved_by_sensors_in_cooldown(make_manager, monkeypatch):
+    sensors = [f"s{i:02d}" for i in range(30)]
+    manager = make_manager(sensors=sensors + ['late'])
+    clock = FakeClock(1_000_000.0)
+    monkeypatch.setattr(alert_module, 'time', _FakeTime(clock))
+    manager.rate_limiter.clock = clock
+
+    # 30 sensores presos em 28 °C (um alerta a cada leitura, a cada 2 s);
+    # 'late' começa a alertar em t=60 s
+    start = clock.now
+    while clock.now - start <= 180:
+        for esp_id in sensors:
+            manager._handle_alert(_alert(esp_id))
+        if clock.now - start >= 60:
+            manager._handle_alert(_alert('late'))
+        clock.now += 2.0
+
+    emailed = [alert.esp_id for alert in manager.sent]
+    assert 'late' in emailed
+    assert sorted(emailed) == sorted(sensors + ['late'])   # um email por sensor (cooldown de 300 s)
+    assert manager.rate_limiter.rejected[BUDGET_TYPE] == 0
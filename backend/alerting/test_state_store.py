@@ -0,0 +1,96 @@
+# ============================================================================
+# TESTES DO SNAPSHOT E LOG DE DELTAS DO ESTADO
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import struct
+import zlib
+from datetime import datetime
+
+import pytest
+
+from alert_manager import AlertEvent
+from state_store import HEADER, HEADER_V1, MAGIC, StateStore, decode_snapshot, encode_snapshot
+
+STATE = {'rate_limits': [('sensor', 'a', '', 1234.5)]}
+
+
+def _crash_before_prev_removed(store: StateStore, build_state):
+    """Snapshot gravado, mas o .prev sobrou no disco (queda antes do os.remove)"""
+    data = store.prepare_snapshot(build_state, 1000.0)
+    with open(store.previous_log_path, 'rb') as f:
+        previous = f.read()
+    store.write_snapshot(data)
+    with open(store.previous_log_path, 'wb') as f:
+        f.write(previous)
+
+
+def test_log_covered_by_snapshot_is_not_replayed(tmp_path):
+    store = StateStore(str(tmp_path))
+    store.append_rate_limit('a', 'temperature_high', 1000.0)
+    store.append_alert('a', 'temperature_high', 'HIGH', 1000.0)
+    _crash_before_prev_removed(store, lambda: STATE)
+    store.append_rate_limit('b', 'humidity_high', 1001.0)
+    store.close()
+
+    reopened = StateStore(str(tmp_path))
+    _, state, records = reopened.load()
+    assert state['log_generation'] == 1
+    assert records == [('L', 'b', 'humidity_high', 1001.0)]
+    assert reopened.generation == 2          # continua no log atual
+
+
+def test_snapshot_of_current_log_starts_new_generation(tmp_path):
+    store = StateStore(str(tmp_path))
+    store.append_rate_limit('a', 'temperature_high', 1000.0)
+    store.write_snapshot(store.prepare_snapshot(lambda: STATE, 1000.0))
+    store.close()
+
+    reopened = StateStore(str(tmp_path))
+    assert reopened.load()[2] == []
+    assert reopened.generation == 2
+    reopened.append_rate_limit('a', 'temperature_high', 1002.0)
+    reopened.close()
+    assert StateStore(str(tmp_path)).load()[2] == [('L', 'a', 'temperature_high', 1002.0)]
+
+
+def test_version_1_snapshot_replays_whole_log(tmp_path):
+    data = encode_snapshot(STATE, 1000.0, 7)
+    body = data[HEADER.size:]
+    legacy = HEADER_V1.pack(MAGIC, 1, 1000.0, zlib.crc32(body)) + body
+    saved_at, state = decode_snapshot(legacy)
+    assert saved_at == 1000.0 and state['log_generation'] is None
+    assert state['rate_limits'] == STATE['rate_limits']
+
+    store = StateStore(str(tmp_path))
+    store.append_rate_limit('a', 'temperature_high', 1000.0)
+    store.close()
+    with open(store.snapshot_path, 'wb') as f:
+        f.write(legacy)
+    assert StateStore(str(tmp_path)).load()[2] == [('L', 'a', 'temperature_high', 1000.0)]
+
+
+def test_rate_limits_not_double_counted_after_crash(make_manager):
+    first = make_manager(state=True)
+    for esp_id in ('a', 'b'):
+        first._handle_alert(AlertEvent(esp_id=esp_id, alert_type='temperature_high', severity='HIGH',
+                                       message='teste', timestamp=datetime.now(),
+                                       data={'temperature': 28.0, 'humidity': 50.0}))
+    first.state_store.flush()
+    _crash_before_prev_removed(first.state_store, first._export_state)
+    expected = sorted(first.rate_limiter.export_state())
+
+    second = make_manager(state=True)
+    restored = sorted(second.rate_limiter.export_state())
+    assert [entry[:3] for entry in restored] == [entry[:3] for entry in expected]
+    for (*_, tat), (*_, expected_tat) in zip(restored, expected):
+        assert tat == pytest.approx(expected_tat, abs=0.5)
+
+
+def test_corrupted_snapshot_rejected():
+    data = bytearray(encode_snapshot(STATE, 1000.0, 3))
+    data[-1] ^= 0xFF
+    with pytest.raises(ValueError):
+        decode_snapshot(bytes(data))
+    with pytest.raises(ValueError):
+        decode_snapshot(struct.pack('<4sB', b'XXXX', 2) + bytes(HEADER.size))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# ============================================================================
+# BENCHMARK DA DECODIFICAÇÃO DOS PAYLOADS DOS SENSORES
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Compara a vazão de decodificação de uma leitura em legion32/<id>:
+#   antes  - msg.payload.decode() + json.loads (JSON do firmware)
+#   depois - decode_payload sobre o payload binário (struct.unpack_from)
+# e mede o custo da detecção de formato sobre payloads JSON.
+#
+# Uso: python bench_codec.py [--messages 500000]
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from payload_codec import decode_payload, encode_reading
+
+
+def _payloads(count: int):
+    """Mesma sequência de leituras nos dois formatos"""
+    rng = random.Random(42)
+    json_payloads = []
+    binary_payloads = []
+    for i in range(count):
+        temperature = round(rng.uniform(18.0, 30.0), 2)
+        humidity = round(rng.uniform(35.0, 65.0), 2)
+        uptime = 2000 * i
+        alert = 'high_temperature' if temperature > 27.0 else None
+
+        doc = {'esp_id': 'esp32_a', 'temperature': temperature, 'humidity': humidity,
+               'timestamp': f"{uptime // 86400000}T12:30:45Z", 'uptime': uptime}
+        if alert:
+            doc['alert'] = alert
+        json_payloads.append(json.dumps(doc, separators=(',', ':')).encode())
+        binary_payloads.append(encode_reading(temperature, humidity, uptime, alert))
+    return json_payloads, binary_payloads
+
+
+def _rate(fn, payloads) -> float:
+    started = time.perf_counter()
+    for payload in payloads:
+        fn(payload)
+    return len(payloads) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da decodificação dos payloads')
+    parser.add_argument('--messages', type=int, default=500000, help='Payloads decodificados (padrão: 500000)')
+    args = parser.parse_args()
+
+    json_payloads, binary_payloads = _payloads(args.messages)
+
+    # Sanidade: os dois formatos devem dar os mesmos valores
+    for raw_json, raw_binary in zip(json_payloads[:1000], binary_payloads[:1000]):
+        from_json, from_binary = json.loads(raw_json), decode_payload(raw_binary)
+        assert abs(from_json['temperature'] - from_binary['temperature']) < 1e-9
+        assert abs(from_json['humidity'] - from_binary['humidity']) < 1e-9
+        assert from_json.get('alert') == from_binary.get('alert')
+
+    print(f"=== Benchmark de decodificação: {args.messages} payloads ===")
+    print(f"Tamanho: JSON ~{sum(map(len, json_payloads)) / args.messages:.0f} bytes | "
+          f"binário {len(binary_payloads[0])} bytes")
+
+    before = _rate(lambda payload: json.loads(payload.decode()), json_payloads)
+    print(f"📉 Antes  (decode + json.loads):     {before:10.0f} msg/s")
+
+    sniffed = _rate(decode_payload, json_payloads)
+    print(f"🔎 JSON via decode_payload:          {sniffed:10.0f} msg/s")
+
+    after = _rate(decode_payload, binary_payloads)
+    print(f"📈 Depois (binário, unpack_from):    {after:10.0f} msg/s")
+
+    print(f"🚀 Ganho: {after / before:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# ============================================================================
+# CONTROLE DE CARDINALIDADE DOS LABELS PROMETHEUS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Valores de label que vêm do payload (location, alert, esp_id do status)
+# são controlados pelo nó que publica: um firmware com bug pode criar uma
+# série nova por mensagem. O guard admite até N valores distintos por label;
+# os seguintes caem no valor de estouro ('__overflow__'), então o número de
+# séries fica limitado mesmo com payloads arbitrários:
+#
+#   guard = CardinalityGuard({'location': 64})
+#   gauge.labels(esp_id=esp_id, location=guard.resolve('location', location))
+#
+# Valores já admitidos seguem pelo caminho rápido (só um "in" no set). O guard
+# também é um coletor Prometheus e exporta quantas séries descartou:
+#
+#   <prefixo>_series_dropped_total{label}      valores distintos recusados
+#   <prefixo>_label_overflow_total{label}      amostras redirecionadas
+
+import logging
+import threading
+from typing import Dict, Optional
+
+from prometheus_client.core import CounterMetricFamily
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_VALUE = '__overflow__'
+
+
+def parse_label_limits(value: str) -> Dict[str, int]:
+    """Converte 'location=64, alert_type=16' em {'location': 64, 'alert_type': 16}"""
+    limits = {}
+    for item in (value or '').split(','):
+        if '=' not in item:
+            continue
+        label, limit = item.split('=', 1)
+        if label.strip() and limit.strip():
+            limits[label.strip()] = int(limit)
+    return limits
+
+
+class CardinalityGuard:
+    """Limita os valores distintos por label e conta o que foi descartado"""
+
+    def __init__(self, limits: Dict[str, int], overflow_value: str = OVERFLOW_VALUE,
+                 metric_prefix: str = 'cluster_exporter', max_tracked_rejections: int = 1024):
+        self.limits = dict(limits)
+        self.overflow_value = overflow_value
+        self.metric_prefix = metric_prefix
+        # Recusados guardados para contar séries distintas; o set também é
+        # limitado para o próprio guard não crescer sem fim
+        self.max_tracked_rejections = max_tracked_rejections
+        self._admitted = {label: set() for label in self.limits}
+        self._rejected = {label: set() for label in self.limits}
+        self._dropped_series = {label: 0 for label in self.limits}
+        self._overflow_samples = {label: 0 for label in self.limits}
+        self._lock = threading.Lock()
+
+    def resolve(self, label: str, value) -> str:
+        """Valor a usar no label: o próprio, se admitido, ou o de estouro"""
+        value = str(value)
+        admitted = self._admitted.get(label)
+        if admitted is None or value in admitted:
+            return value
+
+        with self._lock:
+            if value in admitted:
+                return value
+            if len(admitted) < self.limits[label]:
+                admitted.add(value)
+                return value
+
+            self._overflow_samples[label] += 1
+            rejected = self._rejected[label]
+            if value not in rejected:
+                if not self._dropped_series[label]:
+                    logger.warning(f"⚠️ Label '{label}' atingiu {self.limits[label]} valores distintos; "
+                                   f"novos valores vão para '{self.overflow_value}'")
+                self._dropped_series[label] += 1
+                if len(rejected) < self.max_tracked_rejections:
+                    rejected.add(value)
+            return self.overflow_value
+
+    def release(self, label: str, value):
+        """Libera a vaga de um valor cuja série saiu do registro (ex.: sensor expirado)"""
+        admitted = self._admitted.get(label)
+        if admitted is not None:
+            with self._lock:
+                admitted.discard(str(value))
+
+    def dropped_series(self, label: Optional[str] = None) -> int:
+        """Valores distintos recusados (de um label ou de todos)"""
+        if label is not None:
+            return self._dropped_series.get(label, 0)
+        return sum(self._dropped_series.values())
+
+    def get_statistics(self) -> Dict:
+        """Valores admitidos, séries descartadas e amostras redirecionadas por label"""
+        with self._lock:
+            return {
+                label: {
+                    'limit': self.limits[label],
+                    'admitted': len(self._admitted[label]),
+                    'dropped_series': self._dropped_series[label],
+                    'overflow_samples': self._overflow_samples[label]
+                }
+                for label in self.limits
+            }
+
+    def describe(self):
+        return [
+            CounterMetricFamily(f'{self.metric_prefix}_series_dropped',
+                                'Valores de label distintos recusados pelo limite de cardinalidade',
+                                labels=['label']),
+            CounterMetricFamily(f'{self.metric_prefix}_label_overflow',
+                                'Amostras redirecionadas para o valor de estouro do label',
+                                labels=['label'])
+        ]
+
+    def collect(self):
+        dropped, overflow = self.describe()
+        with self._lock:
+            for label in self.limits:
+                dropped.add_metric([label], self._dropped_series[label])
+                overflow.add_metric([label], self._overflow_samples[label])
+        yield dropped
+        yield overflow
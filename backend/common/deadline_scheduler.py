@@ -0,0 +1,91 @@
+# ============================================================================
+# AGENDADOR DE PRAZOS (HEAP COM INVALIDAÇÃO PREGUIÇOSA)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Guarda um prazo por chave (ex.: last_seen + limite de offline por sensor) e
+# devolve as chaves vencidas sem varrer todas. O prazo atual de cada chave
+# fica em um dicionário; o heap tem no máximo uma entrada "viva" por chave.
+#
+#   arm(k, t)       O(1) quando o prazo só avança (caso de toda leitura nova),
+#                   O(log n) quando a chave é nova ou o prazo recua
+#   cancel(k)       O(1) (a entrada do heap é descartada quando chegar ao topo)
+#   pop_expired(t)  O(log n) por entrada retirada; O(1) se nada venceu
+#
+# Quando uma entrada chega ao topo com prazo desatualizado (a chave foi
+# re-armada para mais tarde), ela é recolocada com o prazo atual em vez de
+# disparar.
+
+import heapq
+import threading
+import time
+from typing import Hashable, List, Optional, Tuple
+
+
+class DeadlineScheduler:
+    """Prazos por chave; pop_expired() retorna só as chaves vencidas"""
+
+    def __init__(self):
+        self._deadlines = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def arm(self, key: Hashable, deadline: float):
+        """Define (ou re-arma) o prazo da chave"""
+        with self._lock:
+            previous = self._deadlines.get(key)
+            self._deadlines[key] = deadline
+            # Prazo que só avançou: a entrada já no heap é corrigida ao chegar ao topo
+            if previous is None or deadline < previous:
+                heapq.heappush(self._heap, (deadline, key))
+
+    def cancel(self, key: Hashable):
+        """Remove o prazo da chave (se houver)"""
+        with self._lock:
+            self._deadlines.pop(key, None)
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        """Prazo atual da chave, ou None"""
+        return self._deadlines.get(key)
+
+    def items(self) -> List[Tuple[Hashable, float]]:
+        """Pares (chave, prazo) pendentes"""
+        with self._lock:
+            return list(self._deadlines.items())
+
+    def next_deadline(self) -> Optional[float]:
+        """Menor prazo pendente (pode ser anterior ao real, nunca posterior)"""
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, now: float = None) -> List[Hashable]:
+        """Retira e retorna as chaves cujo prazo é <= now"""
+        if now is None:
+            now = time.time()
+
+        expired = []
+        with self._lock:
+            heap = self._heap
+            deadlines = self._deadlines
+            while heap and heap[0][0] <= now:
+                _, key = heapq.heappop(heap)
+                current = deadlines.get(key)
+                if current is None:
+                    continue  # cancelada ou já disparada
+                if current <= now:
+                    del deadlines[key]
+                    expired.append(key)
+                else:
+                    heapq.heappush(heap, (current, key))
+        return expired
+
+    def clear(self):
+        with self._lock:
+            self._deadlines.clear()
+            self._heap.clear()
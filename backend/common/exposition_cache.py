@@ -0,0 +1,72 @@
+# ============================================================================
+# CACHE DA EXPOSIÇÃO PROMETHEUS (/metrics)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# generate_latest() serializa todas as séries a cada scrape. Como as métricas
+# só mudam quando chega uma mensagem, o texto codificado é guardado e
+# reaproveitado até a próxima invalidate() (chamada após cada atualização).
+# max_age limita a idade do cache para que métricas que mudam sozinhas
+# (process_*, python_gc_*) não fiquem congeladas.
+
+import threading
+import time
+from typing import Optional
+
+from prometheus_client import REGISTRY, generate_latest
+
+
+class ExpositionCache:
+    """generate_latest() memoizado até a próxima atualização das métricas"""
+
+    def __init__(self, registry=REGISTRY, max_age: float = 5.0):
+        self.registry = registry
+        self.max_age = max_age
+
+        self._generation = 0
+        self._body = None
+        self._body_generation = -1
+        self._rendered_at = 0.0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'renders': 0,
+            'cache_hits': 0,
+            'last_render_ms': 0.0
+        }
+
+    def invalidate(self):
+        """Marca a exposição como desatualizada (chamar após atualizar métricas)"""
+        self._generation += 1
+
+    def peek(self) -> Optional[bytes]:
+        """Exposição em cache se ainda válida, senão None (não serializa)"""
+        body = self._body
+        if (body is not None and self._body_generation == self._generation
+                and time.monotonic() - self._rendered_at < self.max_age):
+            self.stats['cache_hits'] += 1
+            return body
+        return None
+
+    def get(self) -> bytes:
+        """Exposição atual, serializando só se algo mudou"""
+        body = self.peek()
+        if body is not None:
+            return body
+
+        # Scrapes simultâneos esperam a mesma serialização
+        with self._lock:
+            body = self.peek()
+            if body is not None:
+                return body
+
+            generation = self._generation
+            started = time.perf_counter()
+            body = generate_latest(self.registry)
+            self.stats['renders'] += 1
+            self.stats['last_render_ms'] = round((time.perf_counter() - started) * 1000, 3)
+
+            self._body = body
+            self._body_generation = generation
+            self._rendered_at = time.monotonic()
+            return body
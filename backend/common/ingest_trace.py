@@ -0,0 +1,115 @@
+# ============================================================================
+# TRACE ESTRUTURADO DA INGESTÃO DE MENSAGENS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Substitui os logger.info("[DEBUG] ...") por mensagem. A decisão de rastrear
+# é tomada uma vez por mensagem em IngestTracer.begin(): sensores listados
+# são sempre rastreados e os demais por amostragem (1 a cada N mensagens).
+# Mensagens não rastreadas recebem NO_TRACE, que é falso, então o caminho
+# quente custa só um "if trace:" por ponto de trace:
+#
+#   trace = tracer.begin(esp_id)
+#   if trace:
+#       trace.event('parsed', temperature=t, humidity=h)
+#
+# As linhas saem no logger 'ingest.trace' em formato chave=valor, com
+# formatação preguiçosa (só quando o registro é de fato emitido):
+#
+#   trace=42 esp=a event=parsed temperature=23.5 humidity=51.0
+
+import itertools
+import logging
+from typing import Iterable
+
+# Nível abaixo de DEBUG para detalhes volumosos (janela, limites, etc.)
+TRACE = 5
+logging.addLevelName(TRACE, 'TRACE')
+
+
+def parse_sensor_list(value: str) -> set:
+    """Converte 'a,b, c' em {'a', 'b', 'c'}"""
+    return {item.strip() for item in (value or '').split(',') if item.strip()}
+
+
+class _Fields:
+    """Formata os campos do evento só quando o logging emite o registro"""
+
+    __slots__ = ('fields',)
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __str__(self):
+        return ' '.join(f"{key}={value}" for key, value in self.fields.items())
+
+
+class _NoTrace:
+    """Trace nulo: falso e sem efeito"""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def event(self, name, **fields):
+        pass
+
+    def detail(self, name, **fields):
+        pass
+
+
+NO_TRACE = _NoTrace()
+
+
+class Trace:
+    """Trace de uma mensagem; todos os eventos compartilham o mesmo id"""
+
+    __slots__ = ('tracer', 'trace_id', 'esp_id')
+
+    def __init__(self, tracer, trace_id: int, esp_id: str):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.esp_id = esp_id
+
+    def __bool__(self):
+        return True
+
+    def event(self, name: str, **fields):
+        """Evento de uma etapa (nível DEBUG)"""
+        self.tracer._emit(logging.DEBUG, self, name, fields)
+
+    def detail(self, name: str, **fields):
+        """Evento detalhado (nível TRACE)"""
+        self.tracer._emit(TRACE, self, name, fields)
+
+
+class IngestTracer:
+    """Decide por mensagem se ela é rastreada e emite os eventos"""
+
+    def __init__(self, sensors: Iterable[str] = (), sample_rate: float = 0.0,
+                 level: str = 'DEBUG', logger_name: str = 'ingest.trace'):
+        self.sensors = frozenset(sensors)
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self._sample_every = round(1 / self.sample_rate) if self.sample_rate > 0 else 0
+        self._counter = itertools.count(1)
+        self._ids = itertools.count(1)
+
+        self.logger = logging.getLogger(logger_name)
+        self.logger.setLevel(logging.getLevelName(level) if isinstance(level, str) else level)
+
+        # Desligado por completo: begin() retorna NO_TRACE sem mais nada
+        self.enabled = bool(self.sensors or self._sample_every) and self.logger.isEnabledFor(logging.DEBUG)
+
+    def begin(self, esp_id: str):
+        """Retorna um Trace se a mensagem deve ser rastreada, senão NO_TRACE"""
+        if not self.enabled:
+            return NO_TRACE
+        if esp_id in self.sensors or (self._sample_every and next(self._counter) % self._sample_every == 0):
+            return Trace(self, next(self._ids), esp_id)
+        return NO_TRACE
+
+    def _emit(self, level: int, trace: Trace, name: str, fields):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, 'trace=%d esp=%s event=%s %s',
+                            trace.trace_id, trace.esp_id, name, _Fields(fields))
@@ -0,0 +1,52 @@
+# ============================================================================
+# TÓPICOS MQTT DOS SENSORES
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Roteamento compartilhado pelo exportador e pelo sistema de alertas. As
+# leituras chegam em legion32/<id> (assinatura 'legion32/+'), mas o curinga
+# também casa com os tópicos de serviço de dois níveis (legion32/status,
+# legion32/alerts): eles são conferidos antes, e seus nomes nunca viram
+# esp_id (RESERVED_SENSOR_IDS, recusados também pelo SensorRegistry).
+
+from typing import Optional, Tuple
+
+TOPIC_PREFIX = 'legion32'
+STATUS_TOPIC = f'{TOPIC_PREFIX}/status'
+ALERTS_TOPIC = f'{TOPIC_PREFIX}/alerts'
+SYSTEM_STATS_TOPIC = f'{TOPIC_PREFIX}/system/stats'
+
+# Folhas de tópicos de serviço sob legion32/
+RESERVED_SENSOR_IDS = frozenset({'status', 'alerts', 'system'})
+
+TOPIC_SENSOR = 'sensor'
+TOPIC_STATUS = 'status'
+TOPIC_SYSTEM_STATS = 'system_stats'
+TOPIC_ALERTS = 'alerts'
+TOPIC_UNKNOWN = 'unknown'
+
+_SERVICE_TOPICS = {
+    STATUS_TOPIC: TOPIC_STATUS,
+    SYSTEM_STATS_TOPIC: TOPIC_SYSTEM_STATS,
+    ALERTS_TOPIC: TOPIC_ALERTS
+}
+
+
+def sensor_topic(esp_id: str) -> str:
+    """Tópico das leituras do sensor"""
+    return f'{TOPIC_PREFIX}/{esp_id}'
+
+
+def classify_topic(topic: str) -> Tuple[str, Optional[str]]:
+    """
+    Tipo do tópico e, para leituras, o esp_id: (TOPIC_SENSOR, 'a') para
+    'legion32/a'. Só legion32/<id> com exatamente dois níveis e id não
+    reservado é leitura de sensor.
+    """
+    kind = _SERVICE_TOPICS.get(topic)
+    if kind is not None:
+        return kind, None
+    prefix, sep, esp_id = topic.partition('/')
+    if prefix != TOPIC_PREFIX or not sep or not esp_id or '/' in esp_id or esp_id in RESERVED_SENSOR_IDS:
+        return TOPIC_UNKNOWN, None
+    return TOPIC_SENSOR, esp_id
@@ -0,0 +1,281 @@
+# ============================================================================
+# TRANSPORTE MQTT PLUGÁVEL
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Os serviços criam o cliente MQTT por create_client() em vez de instanciar
+# paho.mqtt.client.Client direto. MQTT_TRANSPORT escolhe a implementação:
+#
+#   paho    (padrão) cliente paho real, socket TCP até o Mosquitto
+#   memory  InMemoryClient ligado a um InMemoryBroker do próprio processo
+#
+# O InMemoryClient expõe o subconjunto da API do paho que os serviços usam
+# (on_connect/on_message/on_disconnect, connect, subscribe, publish,
+# loop_start/loop_stop, is_connected, socket...). publish() entrega
+# (tópico, payload) direto ao on_message de cada assinante, na thread de quem
+# publica e sem cópia do payload: sem socket, sem parser de pacotes e sem a
+# thread de rede do paho. Serve para benchmarks medirem só o custo do
+# processamento por mensagem:
+#
+#   broker = get_broker()
+#   system.setup_mqtt(); system.connect_mqtt()      # com MQTT_TRANSPORT=memory
+#   broker.publish('legion32/a', b'{"temperature": 25.0, ...}')
+#
+# No runtime asyncio (ALERT_RUNTIME=asyncio) a entrega também acontece na
+# thread de quem publica: publique a partir da thread do event loop.
+
+import itertools
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+TRANSPORT_PAHO = 'paho'
+TRANSPORT_MEMORY = 'memory'
+TRANSPORTS = (TRANSPORT_PAHO, TRANSPORT_MEMORY)
+
+# Códigos de retorno com os mesmos valores do paho
+MQTT_ERR_SUCCESS = 0
+MQTT_ERR_NO_CONN = 4
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """Confere um tópico contra um filtro com + e #"""
+    filter_parts = topic_filter.split('/')
+    topic_parts = topic.split('/')
+    for index, part in enumerate(filter_parts):
+        if part == '#':
+            return True
+        if index >= len(topic_parts):
+            return False
+        if part != '+' and part != topic_parts[index]:
+            return False
+    return len(filter_parts) == len(topic_parts)
+
+
+def create_client(transport: str = None, client_id: str = ''):
+    """Cliente MQTT do transporte pedido (ou de MQTT_TRANSPORT)"""
+    transport = (transport or os.getenv('MQTT_TRANSPORT', TRANSPORT_PAHO)).lower()
+    if transport == TRANSPORT_PAHO:
+        import paho.mqtt.client as mqtt
+        return mqtt.Client(client_id=client_id)
+    if transport == TRANSPORT_MEMORY:
+        return InMemoryClient(client_id, broker=get_broker())
+    raise ValueError(f"Transporte MQTT desconhecido: {transport} (use {' ou '.join(TRANSPORTS)})")
+
+# ============================================================================
+# TRANSPORTE EM MEMÓRIA
+# ============================================================================
+
+class InMemoryMessage:
+    """Mensagem entregue ao on_message (mesmos atributos do MQTTMessage)"""
+
+    __slots__ = ('topic', 'payload', 'qos', 'retain', 'mid')
+
+    def __init__(self, topic: str, payload, qos: int = 0, retain: bool = False, mid: int = 0):
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+        self.mid = mid
+
+
+class InMemoryPublishInfo:
+    """Retorno de publish() (como o MQTTMessageInfo do paho): já entregue"""
+
+    __slots__ = ('rc', 'mid')
+
+    def __init__(self, rc: int, mid: int):
+        self.rc = rc
+        self.mid = mid
+
+    def is_published(self) -> bool:
+        return self.rc == MQTT_ERR_SUCCESS
+
+    def wait_for_publish(self, timeout: float = None):
+        return None
+
+
+class InMemoryBroker:
+    """Roteia publicações para os clientes em memória do processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = []
+        # tópico -> assinantes; refeito sob demanda quando as assinaturas mudam
+        self._routes: Dict[str, Tuple['InMemoryClient', ...]] = {}
+        self.stats = {'published': 0, 'delivered': 0}
+
+    def _attach(self, client: 'InMemoryClient'):
+        with self._lock:
+            if client not in self._clients:
+                self._clients.append(client)
+            self._routes = {}
+
+    def _detach(self, client: 'InMemoryClient'):
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+            self._routes = {}
+
+    def _subscriptions_changed(self):
+        with self._lock:
+            self._routes = {}
+
+    def subscribers(self, topic: str) -> Tuple['InMemoryClient', ...]:
+        """Clientes com alguma assinatura que casa com o tópico"""
+        routes = self._routes
+        subscribers = routes.get(topic)
+        if subscribers is None:
+            with self._lock:
+                subscribers = tuple(
+                    client for client in self._clients
+                    if any(topic_matches(topic_filter, topic) for topic_filter in client.filters)
+                )
+                self._routes[topic] = subscribers
+        return subscribers
+
+    def publish(self, topic: str, payload=b'', qos: int = 0, retain: bool = False) -> int:
+        """Entrega a mensagem a cada assinante e retorna quantos a receberam"""
+        if payload is None:
+            payload = b''
+        elif isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        elif isinstance(payload, (int, float)):
+            payload = str(payload).encode('ascii')
+        # bytes/bytearray/memoryview seguem sem cópia: não altere o buffer depois
+        subscribers = self.subscribers(topic)
+        self.stats['published'] += 1
+        if subscribers:
+            message = InMemoryMessage(topic, payload, qos, retain)
+            for client in subscribers:
+                client._deliver(message)
+            self.stats['delivered'] += len(subscribers)
+        return len(subscribers)
+
+    def reset(self):
+        """Desconecta todos os clientes e zera as estatísticas"""
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.disconnect()
+        self.stats = {'published': 0, 'delivered': 0}
+
+
+class InMemoryClient:
+    """Subconjunto da API do paho.mqtt.client.Client sobre um InMemoryBroker"""
+
+    def __init__(self, client_id: str = '', broker: InMemoryBroker = None, userdata=None):
+        self._client_id = client_id
+        self._broker = broker or get_broker()
+        self._userdata = userdata
+        self._connected = False
+        self._mid = itertools.count(1)
+        self.filters: List[str] = []
+
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_message = None
+        self.on_publish = None
+        self.on_subscribe = None
+        self.on_unsubscribe = None
+
+    # Configuração sem efeito em memória (mantida pela compatibilidade)
+
+    def reconnect_delay_set(self, min_delay: int = 1, max_delay: int = 120):
+        pass
+
+    def username_pw_set(self, username: str, password: str = None):
+        pass
+
+    def user_data_set(self, userdata):
+        self._userdata = userdata
+
+    # Conexão
+
+    def connect(self, host: str = 'localhost', port: int = 1883, keepalive: int = 60, **kwargs) -> int:
+        self._broker._attach(self)
+        self._connected = True
+        if self.on_connect:
+            self.on_connect(self, self._userdata, {'session present': 0}, 0)
+        return MQTT_ERR_SUCCESS
+
+    def reconnect(self) -> int:
+        return self.connect()
+
+    def disconnect(self, **kwargs) -> int:
+        if not self._connected:
+            return MQTT_ERR_NO_CONN
+        self._connected = False
+        self._broker._detach(self)
+        if self.on_disconnect:
+            self.on_disconnect(self, self._userdata, 0)
+        return MQTT_ERR_SUCCESS
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def socket(self):
+        """Sem socket: o backlog do MQTT (ingest_metrics) fica em 0"""
+        return None
+
+    def loop_start(self) -> int:
+        return MQTT_ERR_SUCCESS
+
+    def loop_stop(self, force: bool = False) -> int:
+        return MQTT_ERR_SUCCESS
+
+    # Assinaturas e publicação
+
+    def subscribe(self, topic, qos: int = 0) -> Tuple[int, Optional[int]]:
+        """Aceita um filtro ou uma lista de (filtro, qos), como o paho"""
+        if not self._connected:
+            return MQTT_ERR_NO_CONN, None
+        topics = [topic] if isinstance(topic, str) else [item[0] for item in topic]
+        for topic_filter in topics:
+            if topic_filter not in self.filters:
+                self.filters.append(topic_filter)
+        self._broker._subscriptions_changed()
+        mid = next(self._mid)
+        if self.on_subscribe:
+            self.on_subscribe(self, self._userdata, mid, tuple(qos for _ in topics))
+        return MQTT_ERR_SUCCESS, mid
+
+    def unsubscribe(self, topic) -> Tuple[int, Optional[int]]:
+        if not self._connected:
+            return MQTT_ERR_NO_CONN, None
+        for topic_filter in ([topic] if isinstance(topic, str) else topic):
+            if topic_filter in self.filters:
+                self.filters.remove(topic_filter)
+        self._broker._subscriptions_changed()
+        mid = next(self._mid)
+        if self.on_unsubscribe:
+            self.on_unsubscribe(self, self._userdata, mid)
+        return MQTT_ERR_SUCCESS, mid
+
+    def publish(self, topic: str, payload=None, qos: int = 0, retain: bool = False) -> InMemoryPublishInfo:
+        mid = next(self._mid)
+        if not self._connected:
+            return InMemoryPublishInfo(MQTT_ERR_NO_CONN, mid)
+        self._broker.publish(topic, payload, qos, retain)
+        if self.on_publish:
+            self.on_publish(self, self._userdata, mid)
+        return InMemoryPublishInfo(MQTT_ERR_SUCCESS, mid)
+
+    def _deliver(self, message: InMemoryMessage):
+        handler = self.on_message
+        if handler is not None:
+            handler(self, self._userdata, message)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> InMemoryBroker:
+    """InMemoryBroker compartilhado pelo processo (criado no primeiro uso)"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = InMemoryBroker()
+    return _broker
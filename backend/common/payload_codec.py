@@ -0,0 +1,175 @@
+# ============================================================================
+# CODIFICAÇÃO DOS PAYLOADS DOS SENSORES (JSON OU BINÁRIO)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Além do JSON, os ESP32 podem publicar em legion32/<id> um payload binário
+# de tamanho fixo (firmware compilado com -DPAYLOAD_FORMAT_BINARY). O formato
+# é identificado pelo primeiro byte: JSON começa com '{' (ou espaço) e o
+# binário com o byte mágico 0xB1, então os dois convivem no mesmo tópico.
+#
+# Layout v1 (12 bytes, little-endian, igual ao struct do firmware):
+#
+#   offset  tipo     campo
+#   0       uint8    mágico (0xB1)
+#   1       uint8    versão (1)
+#   2       uint8    flags de alerta (bit0 temperatura alta, bit1 umidade fora da faixa)
+#   3       uint8    reservado
+#   4       int16    temperatura em centésimos de °C
+#   6       uint16   umidade em centésimos de %
+#   8       uint32   uptime em ms (millis())
+#
+# O binário é lido com struct.unpack_from direto sobre msg.payload, sem
+# decode() de string.
+#
+# Lotes (firmware com -DPUBLISH_BATCH_SIZE=K) trazem K leituras por mensagem,
+# cada uma com o millis() da amostra, e o millis() do envio:
+#
+#   binário: cabeçalho de 8 bytes (0xB2, versão, quantidade, reservado,
+#            uint32 uptime do envio) + quantidade registros v1 de 12 bytes
+#   JSON:    {"esp_id": ..., "uptime": <envio>, "readings": [{"temperature",
+#            "humidity", "uptime", "alert"?}, ...]}
+#
+# O ESP32 não tem relógio, então decode_readings() converte o uptime de cada
+# amostra em horário de parede: recebido_em - (uptime_envio - uptime_amostra).
+
+import json
+import struct
+from typing import Dict, List, Optional
+
+MAGIC = 0xB1
+BATCH_MAGIC = 0xB2
+VERSION = 1
+
+READING = struct.Struct('<BBBBhHI')
+BATCH_HEADER = struct.Struct('<BBBBI')
+
+FLAG_HIGH_TEMPERATURE = 0x01
+FLAG_HUMIDITY_OUT_OF_RANGE = 0x02
+
+# Mesmos nomes do campo "alert" do JSON do firmware
+ALERT_FLAGS = (
+    (FLAG_HIGH_TEMPERATURE, 'high_temperature'),
+    (FLAG_HUMIDITY_OUT_OF_RANGE, 'humidity_out_of_range')
+)
+
+
+class PayloadError(ValueError):
+    """Payload malformado (binário inválido ou JSON que não é um objeto)"""
+
+
+def is_binary(payload) -> bool:
+    """Verdadeiro se o payload começa com o byte mágico do formato binário"""
+    return len(payload) > 0 and payload[0] == MAGIC
+
+
+def encode_reading(temperature: float, humidity: float, uptime_ms: int = 0,
+                   alert: Optional[str] = None) -> bytes:
+    """Codifica uma leitura no formato binário v1 (usado em testes e benchmarks)"""
+    flags = 0
+    for flag, name in ALERT_FLAGS:
+        if alert == name:
+            flags |= flag
+    return READING.pack(MAGIC, VERSION, flags, 0,
+                        round(temperature * 100), round(humidity * 100),
+                        uptime_ms & 0xFFFFFFFF)
+
+
+def decode_binary(payload, offset: int = 0) -> Dict:
+    """Decodifica uma leitura binária (bytes, bytearray ou memoryview)"""
+    if len(payload) - offset < READING.size:
+        raise PayloadError(f"payload binário com {len(payload) - offset} bytes (esperado {READING.size})")
+
+    magic, version, flags, _, temperature, humidity, uptime = READING.unpack_from(payload, offset)
+    if magic != MAGIC:
+        raise PayloadError(f"byte mágico inválido: 0x{magic:02x}")
+    if version != VERSION:
+        raise PayloadError(f"versão de payload não suportada: {version}")
+
+    data = {
+        'temperature': temperature / 100.0,
+        'humidity': humidity / 100.0,
+        'uptime': uptime
+    }
+    for flag, name in ALERT_FLAGS:
+        if flags & flag:
+            data['alert'] = name
+            break
+    return data
+
+
+def encode_batch(readings, sent_uptime_ms: int) -> bytes:
+    """Codifica [(temperatura, umidade, uptime_ms, alerta)] como lote binário"""
+    header = BATCH_HEADER.pack(BATCH_MAGIC, VERSION, len(readings), 0, sent_uptime_ms & 0xFFFFFFFF)
+    return header + b''.join(encode_reading(*reading) for reading in readings)
+
+
+def decode_batch(payload) -> Dict:
+    """Decodifica um lote binário em {'uptime': envio, 'readings': [...]}"""
+    if len(payload) < BATCH_HEADER.size:
+        raise PayloadError(f"lote binário com {len(payload)} bytes (cabeçalho tem {BATCH_HEADER.size})")
+
+    magic, version, count, _, sent_uptime = BATCH_HEADER.unpack_from(payload)
+    if magic != BATCH_MAGIC:
+        raise PayloadError(f"byte mágico de lote inválido: 0x{magic:02x}")
+    if version != VERSION:
+        raise PayloadError(f"versão de lote não suportada: {version}")
+    expected = BATCH_HEADER.size + count * READING.size
+    if len(payload) < expected:
+        raise PayloadError(f"lote binário com {len(payload)} bytes (esperado {expected} para {count} leituras)")
+
+    readings = [decode_binary(payload, BATCH_HEADER.size + i * READING.size) for i in range(count)]
+    return {'uptime': sent_uptime, 'readings': readings}
+
+
+def decode_payload(payload) -> Dict:
+    """Decodifica o payload de legion32/<id>, binário ou JSON (leitura ou lote)"""
+    if payload:
+        first = payload[0]
+        if first == MAGIC:
+            return decode_binary(payload)
+        if first == BATCH_MAGIC:
+            return decode_batch(payload)
+    # decode() explícito: json.loads(bytes) detecta o encoding e é mais lento
+    if isinstance(payload, (bytes, bytearray)):
+        payload = payload.decode('utf-8')
+    return json.loads(payload)
+
+
+def decode_readings(payload, received_at: float) -> List[Dict]:
+    """
+    Decodifica o payload em uma lista de leituras com 'sample_time' (epoch).
+
+    Leitura avulsa: sample_time = received_at. Lote: cada amostra é datada
+    pela diferença entre o uptime do envio e o dela.
+    """
+    data = decode_payload(payload)
+    if not isinstance(data, dict):
+        raise PayloadError(f"payload JSON deve ser um objeto, não {type(data).__name__}")
+    readings = data.get('readings')
+    if readings is None:
+        data['sample_time'] = received_at
+        return [data]
+
+    if not isinstance(readings, list):
+        raise PayloadError("campo 'readings' do lote deve ser uma lista")
+
+    sent_uptime = data.get('uptime')
+    batch = []
+    for reading in readings:
+        if not isinstance(reading, dict):
+            raise PayloadError("leitura do lote deve ser um objeto")
+        uptime = reading.get('uptime')
+        if sent_uptime is None or uptime is None:
+            reading['sample_time'] = received_at
+        else:
+            # millis() do ESP32 é de 32 bits e dá a volta em ~49 dias
+            age_ms = (int(sent_uptime) - int(uptime)) & 0xFFFFFFFF
+            if age_ms > 0x7FFFFFFF:
+                age_ms = 0  # amostra "depois" do envio: relógio inconsistente
+            reading['sample_time'] = received_at - age_ms / 1000.0
+        for key, value in data.items():
+            if key not in ('readings', 'uptime'):
+                reading.setdefault(key, value)
+        batch.append(reading)
+    return batch
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# ============================================================================
+# REGISTRO DE SENSORES (COMPARTILHADO ENTRE ALERTAS E EXPORTADOR)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Os sensores aceitos ficam na tabela sensor_registry de um SQLite
+# compartilhado pelos serviços. Na inicialização a tabela é carregada em um
+# dicionário (esp_id -> SensorProfile) e uma thread recarrega o índice quando
+# outro processo altera o banco (PRAGMA data_version). Cadastrar um sensor
+# novo é só uma linha no banco:
+#
+#   python sensor_registry.py --db /app/registry/sensors.db add c --location rack2
+#   python sensor_registry.py --db ... add d --threshold temperature.high=28
+#   python sensor_registry.py --db ... list
+#
+# Nomes de tópicos de serviço (status, alerts...) não são esp_id válidos:
+# register() os recusa e is_valid() nunca os aceita, mesmo com auto_register.
+
+import argparse
+import copy
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from mqtt_topics import RESERVED_SENSOR_IDS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SensorProfile:
+    """Cadastro de um sensor com limites já mesclados aos padrões"""
+    esp_id: str
+    location: str = 'unknown'
+    enabled: bool = True
+    overrides: Dict = field(default_factory=dict)
+    thresholds: Dict = field(default_factory=dict)
+
+
+def merge_thresholds(defaults: Dict, overrides: Dict) -> Dict:
+    """Mescla recursivamente overrides sobre uma cópia de defaults"""
+    merged = copy.deepcopy(defaults)
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_thresholds(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class SensorRegistry:
+    """Índice em memória dos sensores cadastrados, com recarga a quente"""
+
+    def __init__(self, db_path: str, default_thresholds: Dict = None,
+                 reload_interval: float = 5.0, auto_register: bool = False,
+                 seed_sensors: Iterable[str] = ()):
+        self.db_path = db_path
+        self.default_thresholds = default_thresholds or {}
+        self.reload_interval = reload_interval
+        self.auto_register = auto_register
+
+        self._profiles = {}
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._reload_thread = None
+        self._data_version = None
+        self.version = 0  # Incrementado a cada troca do índice
+
+        self._init_database(seed_sensors)
+        self.load()
+
+    # ------------------------------------------------------------------------
+    # BANCO DE DADOS
+    # ------------------------------------------------------------------------
+
+    def _init_database(self, seed_sensors: Iterable[str]):
+        """Cria a tabela e cadastra os sensores iniciais se estiver vazia"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA busy_timeout=5000')
+
+        with self._lock, self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS sensor_registry (
+                    esp_id TEXT PRIMARY KEY,
+                    location TEXT NOT NULL DEFAULT 'unknown',
+                    enabled INTEGER NOT NULL DEFAULT 1,
+                    thresholds TEXT,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
+
+            empty = self._conn.execute('SELECT COUNT(*) FROM sensor_registry').fetchone()[0] == 0
+            if empty:
+                now = datetime.now().isoformat()
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO sensor_registry (esp_id, updated_at) VALUES (?, ?)',
+                    [(esp_id, now) for esp_id in seed_sensors if esp_id not in RESERVED_SENSOR_IDS]
+                )
+
+    def _read_data_version(self) -> int:
+        """Contador do SQLite que muda quando outra conexão grava no banco"""
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _build_profile(self, esp_id: str, location: str, enabled: bool, overrides: Dict) -> SensorProfile:
+        return SensorProfile(
+            esp_id=esp_id,
+            location=location or 'unknown',
+            enabled=bool(enabled),
+            overrides=overrides,
+            thresholds=merge_thresholds(self.default_thresholds, overrides)
+        )
+
+    def load(self):
+        """Recarrega todo o índice a partir do banco"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT esp_id, location, enabled, thresholds FROM sensor_registry'
+            ).fetchall()
+            self._data_version = self._read_data_version()
+
+            profiles = {}
+            for esp_id, location, enabled, thresholds in rows:
+                try:
+                    overrides = json.loads(thresholds) if thresholds else {}
+                except ValueError:
+                    logger.error(f"Limites inválidos no registro do sensor {esp_id}, usando padrões")
+                    overrides = {}
+                profiles[esp_id] = self._build_profile(esp_id, location, enabled, overrides)
+
+            # Troca atômica da referência: leitores nunca veem o índice pela metade
+            self._profiles = profiles
+            self.version += 1
+
+        logger.info(f"Registro de sensores carregado: {len(profiles)} sensores")
+
+    # ------------------------------------------------------------------------
+    # RECARGA A QUENTE
+    # ------------------------------------------------------------------------
+
+    def start(self):
+        """Inicia a thread que recarrega o índice quando o banco muda"""
+        if self._reload_thread is not None or self.reload_interval <= 0:
+            return
+
+        def reload_worker():
+            while not self._stop_event.wait(self.reload_interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    logger.error(f"Erro ao recarregar registro de sensores: {e}")
+
+        self._reload_thread = threading.Thread(target=reload_worker, name='sensor-registry', daemon=True)
+        self._reload_thread.start()
+
+    def reload_if_changed(self) -> bool:
+        """Recarrega o índice se outro processo alterou o banco"""
+        with self._lock:
+            if self._conn is None:
+                return False
+            changed = self._read_data_version() != self._data_version
+        if changed:
+            self.load()
+        return changed
+
+    def stop(self):
+        """Para a recarga e fecha a conexão"""
+        self._stop_event.set()
+        if self._reload_thread is not None:
+            self._reload_thread.join(timeout=5)
+            self._reload_thread = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------------
+    # CONSULTAS (O(1), SEM LOCK)
+    # ------------------------------------------------------------------------
+
+    def get(self, esp_id: str) -> Optional[SensorProfile]:
+        """Retorna o cadastro do sensor ou None"""
+        return self._profiles.get(esp_id)
+
+    def is_valid(self, esp_id: str) -> bool:
+        """Sensor cadastrado e habilitado (cadastra sozinho com auto_register)"""
+        if esp_id in RESERVED_SENSOR_IDS:
+            return False
+        profile = self._profiles.get(esp_id)
+        if profile is None and self.auto_register and esp_id:
+            profile = self.register(esp_id)
+        return profile is not None and profile.enabled
+
+    def thresholds(self, esp_id: str) -> Dict:
+        """Limites do sensor (padrões + overrides do cadastro)"""
+        profile = self._profiles.get(esp_id)
+        return profile.thresholds if profile is not None else self.default_thresholds
+
+    def location(self, esp_id: str) -> str:
+        """Localização cadastrada do sensor"""
+        profile = self._profiles.get(esp_id)
+        return profile.location if profile is not None else 'unknown'
+
+    def sensor_ids(self) -> List[str]:
+        return list(self._profiles)
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __contains__(self, esp_id: str) -> bool:
+        return esp_id in self._profiles
+
+    # ------------------------------------------------------------------------
+    # ALTERAÇÕES
+    # ------------------------------------------------------------------------
+
+    def register(self, esp_id: str, location: str = None, enabled: bool = True,
+                 thresholds: Dict = None) -> SensorProfile:
+        """Cadastra ou atualiza um sensor no banco e no índice"""
+        if esp_id in RESERVED_SENSOR_IDS:
+            raise ValueError(f"'{esp_id}' é nome de tópico de serviço, não pode ser sensor")
+        current = self._profiles.get(esp_id)
+        if location is None:
+            location = current.location if current else 'unknown'
+        if thresholds is None:
+            thresholds = current.overrides if current else {}
+
+        profile = self._build_profile(esp_id, location, enabled, thresholds)
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute('''
+                    INSERT OR REPLACE INTO sensor_registry (esp_id, location, enabled, thresholds, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (esp_id, location, 1 if enabled else 0,
+                      json.dumps(thresholds) if thresholds else None, datetime.now().isoformat()))
+
+            # Copia e troca sob o lock para não perder cadastros concorrentes
+            profiles = dict(self._profiles)
+            profiles[esp_id] = profile
+            self._profiles = profiles
+            self.version += 1
+
+        logger.info(f"Sensor '{esp_id}' cadastrado no registro (localização: {location})")
+        return profile
+
+    def remove(self, esp_id: str) -> bool:
+        """Remove um sensor do cadastro"""
+        with self._lock:
+            with self._conn:
+                removed = self._conn.execute(
+                    'DELETE FROM sensor_registry WHERE esp_id = ?', (esp_id,)
+                ).rowcount > 0
+
+            profiles = dict(self._profiles)
+            profiles.pop(esp_id, None)
+            self._profiles = profiles
+            self.version += 1
+
+        return removed
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def _parse_threshold_args(items: List[str]) -> Dict:
+    """Converte ['temperature.high=28', ...] em {'temperature': {'high': 28.0}}"""
+    overrides = {}
+    for item in items or []:
+        path, _, value = item.partition('=')
+        if not value:
+            raise ValueError(f"Limite inválido '{item}', use secao.chave=valor")
+        target = overrides
+        keys = path.split('.')
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = float(value)
+    return overrides
+
+
+def main():
+    """Administração do registro de sensores"""
+    parser = argparse.ArgumentParser(description='Registro de sensores do cluster')
+    parser.add_argument('--db', default=os.getenv('SENSOR_REGISTRY_PATH', '/app/registry/sensors.db'),
+                        help='Caminho do banco do registro')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help='Lista sensores cadastrados')
+
+    add_parser = subparsers.add_parser('add', help='Cadastra ou atualiza sensores')
+    add_parser.add_argument('esp_ids', nargs='+')
+    add_parser.add_argument('--location')
+    add_parser.add_argument('--threshold', action='append', help='Override de limite, ex: temperature.high=28')
+    add_parser.add_argument('--disabled', action='store_true', help='Cadastra desabilitado')
+
+    remove_parser = subparsers.add_parser('remove', help='Remove sensores')
+    remove_parser.add_argument('esp_ids', nargs='+')
+
+    args = parser.parse_args()
+    registry = SensorRegistry(args.db, reload_interval=0)
+
+    try:
+        if args.command == 'list':
+            for esp_id in sorted(registry.sensor_ids()):
+                profile = registry.get(esp_id)
+                status = 'habilitado' if profile.enabled else 'desabilitado'
+                overrides = json.dumps(profile.overrides) if profile.overrides else '-'
+                print(f"{esp_id:20s} {profile.location:15s} {status:12s} {overrides}")
+            print(f"Total: {len(registry)} sensores")
+        elif args.command == 'add':
+            thresholds = _parse_threshold_args(args.threshold) if args.threshold else None
+            for esp_id in args.esp_ids:
+                registry.register(esp_id, location=args.location, enabled=not args.disabled,
+                                  thresholds=thresholds)
+                print(f"✅ Sensor {esp_id} cadastrado")
+        elif args.command == 'remove':
+            for esp_id in args.esp_ids:
+                removed = registry.remove(esp_id)
+                print(f"{'✅' if removed else '⚠️'} Sensor {esp_id} {'removido' if removed else 'não encontrado'}")
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        registry.stop()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+# ============================================================================
+# TESTES DO CONTROLE DE CARDINALIDADE DOS LABELS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+from cardinality_guard import OVERFLOW_VALUE, CardinalityGuard, parse_label_limits
+
+
+def test_parse_label_limits():
+    assert parse_label_limits('location=64, alert_type=16,,bad, =3') == {'location': 64, 'alert_type': 16}
+    assert parse_label_limits('') == {}
+
+
+def test_values_past_limit_go_to_overflow():
+    guard = CardinalityGuard({'location': 2})
+    assert [guard.resolve('location', v) for v in ('r1', 'r2', 'r3', 'r1', 'r4', 'r3')] == \
+        ['r1', 'r2', OVERFLOW_VALUE, 'r1', OVERFLOW_VALUE, OVERFLOW_VALUE]
+    # Séries distintas recusadas (r3, r4) x amostras redirecionadas (3)
+    assert guard.get_statistics()['location'] == {
+        'limit': 2, 'admitted': 2, 'dropped_series': 2, 'overflow_samples': 3}
+    assert guard.dropped_series() == 2
+
+
+def test_unlimited_label_and_non_string_values_pass_through():
+    guard = CardinalityGuard({'location': 1})
+    assert guard.resolve('esp_id', 'qualquer') == 'qualquer'
+    assert guard.resolve('location', 7) == '7'
+    assert guard.resolve('location', '7') == '7'
+
+
+def test_release_frees_a_slot():
+    guard = CardinalityGuard({'esp_id': 1}, overflow_value='__x__')
+    assert guard.resolve('esp_id', 'a') == 'a'
+    assert guard.resolve('esp_id', 'b') == '__x__'
+    guard.release('esp_id', 'a')
+    assert guard.resolve('esp_id', 'b') == 'b'
+
+
+def test_collect_exports_dropped_and_overflow_counters():
+    guard = CardinalityGuard({'topic': 0}, metric_prefix='test')
+    guard.resolve('topic', 'legion32/a')
+    guard.resolve('topic', 'legion32/a')
+    samples = {(s.name, s.labels['label']): s.value for family in guard.collect() for s in family.samples}
+    assert samples == {('test_series_dropped_total', 'topic'): 1, ('test_label_overflow_total', 'topic'): 2}
@@ -0,0 +1,49 @@
+# ============================================================================
+# TESTES DO AGENDADOR DE PRAZOS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+from deadline_scheduler import DeadlineScheduler
+
+
+def test_pop_expired_returns_only_due_keys():
+    scheduler = DeadlineScheduler()
+    for key, deadline in (('a', 10.0), ('b', 20.0), ('c', 30.0)):
+        scheduler.arm(key, deadline)
+    assert scheduler.pop_expired(5.0) == []
+    assert scheduler.pop_expired(20.0) == ['a', 'b']
+    assert len(scheduler) == 1 and 'c' in scheduler
+    assert scheduler.pop_expired(20.0) == []
+
+
+def test_rearming_later_does_not_push_and_fires_at_new_deadline():
+    scheduler = DeadlineScheduler()
+    scheduler.arm('a', 10.0)
+    for deadline in (11.0, 12.0, 25.0):
+        scheduler.arm('a', deadline)
+    assert len(scheduler._heap) == 1        # prazo que avança não entra no heap
+
+    # Entrada antiga chega ao topo desatualizada: volta com o prazo atual
+    assert scheduler.pop_expired(15.0) == []
+    assert scheduler.next_deadline() == 25.0
+    assert scheduler.pop_expired(25.0) == ['a']
+
+
+def test_rearming_earlier_fires_once():
+    scheduler = DeadlineScheduler()
+    scheduler.arm('a', 30.0)
+    scheduler.arm('a', 10.0)
+    assert scheduler.next_deadline() == 10.0
+    assert scheduler.pop_expired(10.0) == ['a']
+    # A entrada de 30.0 ficou no heap, mas a chave já disparou
+    assert scheduler.pop_expired(30.0) == []
+
+
+def test_cancelled_key_never_fires():
+    scheduler = DeadlineScheduler()
+    scheduler.arm('a', 10.0)
+    scheduler.arm('b', 10.0)
+    scheduler.cancel('a')
+    assert scheduler.deadline('a') is None and scheduler.items() == [('b', 10.0)]
+    assert scheduler.pop_expired(10.0) == ['b']
+    assert scheduler._heap == []
@@ -0,0 +1,49 @@
+# ============================================================================
+# TESTES DO TRACE AMOSTRADO DA INGESTÃO
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import logging
+
+from ingest_trace import NO_TRACE, TRACE, IngestTracer, parse_sensor_list
+
+
+def test_parse_sensor_list():
+    assert parse_sensor_list(' a,b,, c ') == {'a', 'b', 'c'}
+    assert parse_sensor_list('') == set() and parse_sensor_list(None) == set()
+
+
+def test_disabled_tracer_returns_no_trace():
+    tracer = IngestTracer(logger_name='test.trace.off')
+    assert not tracer.enabled
+    trace = tracer.begin('a')
+    assert trace is NO_TRACE and not trace
+    trace.event('parsed', temperature=1.0)    # sem efeito
+
+    # Com o logger acima de DEBUG também não rastreia nada
+    assert not IngestTracer(['a'], level='INFO', logger_name='test.trace.info').enabled
+
+
+def test_listed_sensors_always_traced_others_sampled():
+    tracer = IngestTracer(['a'], sample_rate=0.25, logger_name='test.trace.sample')
+    assert all(tracer.begin('a') for _ in range(10))
+    sampled = [bool(tracer.begin('b')) for _ in range(8)]
+    assert sampled == [False, False, False, True] * 2
+
+
+def test_events_share_trace_id_and_detail_uses_trace_level(caplog):
+    tracer = IngestTracer(['a'], logger_name='test.trace.emit')
+    first, second = tracer.begin('a'), tracer.begin('a')
+    assert second.trace_id == first.trace_id + 1
+
+    with caplog.at_level(logging.DEBUG, logger='test.trace.emit'):
+        first.event('parsed', temperature=23.5, humidity=51.0)
+        first.detail('window', points=3)      # TRACE < DEBUG: descartado
+    assert [r.getMessage() for r in caplog.records] == [
+        f"trace={first.trace_id} esp=a event=parsed temperature=23.5 humidity=51.0"]
+
+    caplog.clear()
+    with caplog.at_level(TRACE, logger='test.trace.emit'):
+        first.detail('window', points=3)
+    assert [(r.levelname, r.getMessage()) for r in caplog.records] == [
+        ('TRACE', f"trace={first.trace_id} esp=a event=window points=3")]
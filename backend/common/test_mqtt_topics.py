@@ -0,0 +1,47 @@
+# ============================================================================
+# TESTES DO ROTEAMENTO DE TÓPICOS E DOS IDS RESERVADOS DO REGISTRO
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import pytest
+
+from mqtt_topics import (TOPIC_ALERTS, TOPIC_SENSOR, TOPIC_STATUS, TOPIC_SYSTEM_STATS,
+                         TOPIC_UNKNOWN, classify_topic, sensor_topic)
+from sensor_registry import SensorRegistry
+
+
+@pytest.mark.parametrize('topic, expected', [
+    ('legion32/a', (TOPIC_SENSOR, 'a')),
+    ('legion32/rack-2_x', (TOPIC_SENSOR, 'rack-2_x')),
+    ('legion32/status', (TOPIC_STATUS, None)),
+    ('legion32/alerts', (TOPIC_ALERTS, None)),
+    ('legion32/system/stats', (TOPIC_SYSTEM_STATS, None)),
+    ('legion32/system', (TOPIC_UNKNOWN, None)),
+    ('legion32/a/extra', (TOPIC_UNKNOWN, None)),
+    ('legion32/', (TOPIC_UNKNOWN, None)),
+    ('legion32', (TOPIC_UNKNOWN, None)),
+    ('other/a', (TOPIC_UNKNOWN, None)),
+])
+def test_classify_topic(topic, expected):
+    assert classify_topic(topic) == expected
+
+
+def test_sensor_topic_round_trip():
+    assert classify_topic(sensor_topic('b')) == (TOPIC_SENSOR, 'b')
+
+
+def test_registry_never_accepts_reserved_ids(tmp_path):
+    registry = SensorRegistry(str(tmp_path / 'sensors.db'), reload_interval=0, auto_register=True,
+                              seed_sensors=['a', 'status'])
+    try:
+        assert registry.sensor_ids() == ['a']
+        assert not registry.is_valid('status')
+        assert not registry.is_valid('alerts')
+        assert 'status' not in registry
+        with pytest.raises(ValueError):
+            registry.register('status')
+        # Id comum continua sendo cadastrado sozinho
+        assert registry.is_valid('c')
+        assert sorted(registry.sensor_ids()) == ['a', 'c']
+    finally:
+        registry.stop()
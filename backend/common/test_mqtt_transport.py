@@ -0,0 +1,82 @@
+# ============================================================================
+# TESTES DO TRANSPORTE MQTT EM MEMÓRIA
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import pytest
+
+from mqtt_transport import (MQTT_ERR_NO_CONN, MQTT_ERR_SUCCESS, InMemoryBroker, InMemoryClient,
+                            create_client, topic_matches)
+
+
+@pytest.mark.parametrize('topic_filter, topic, expected', [
+    ('legion32/+', 'legion32/a', True),
+    ('legion32/+', 'legion32/a/extra', False),
+    ('legion32/+', 'legion32', False),
+    ('legion32/#', 'legion32/system/stats', True),
+    ('legion32/status', 'legion32/status', True),
+    ('legion32/status', 'legion32/a', False),
+    ('+/stats', 'system/stats', True),
+])
+def test_topic_matches(topic_filter, topic, expected):
+    assert topic_matches(topic_filter, topic) is expected
+
+
+def _client(broker: InMemoryBroker, *filters):
+    client = InMemoryClient(broker=broker)
+    client.received = []
+    client.on_message = lambda c, userdata, msg: client.received.append((msg.topic, msg.payload))
+    client.connect()
+    if filters:
+        client.subscribe([(topic_filter, 0) for topic_filter in filters])
+    return client
+
+
+def test_publish_delivers_to_matching_subscribers_only():
+    broker = InMemoryBroker()
+    sensors = _client(broker, 'legion32/+')
+    status = _client(broker, 'legion32/status')
+    publisher = _client(broker)
+
+    info = publisher.publish('legion32/a', '{"temperature": 25.0}')
+    assert info.rc == MQTT_ERR_SUCCESS and info.is_published()
+    assert broker.publish('legion32/status', b'online') == 2
+    assert sensors.received == [('legion32/a', b'{"temperature": 25.0}'), ('legion32/status', b'online')]
+    assert status.received == [('legion32/status', b'online')]
+    assert broker.stats == {'published': 2, 'delivered': 3}
+
+
+def test_payload_delivered_without_copy():
+    broker = InMemoryBroker()
+    client = _client(broker, '#')
+    payload = bytearray(b'\xb1\x01')
+    broker.publish('legion32/a', payload)
+    assert client.received[0][1] is payload
+
+
+def test_routes_follow_subscription_changes():
+    broker = InMemoryBroker()
+    client = _client(broker, 'legion32/a')
+    assert broker.publish('legion32/a', b'1') == 1      # rota em cache
+    client.unsubscribe('legion32/a')
+    assert broker.publish('legion32/a', b'2') == 0
+    client.subscribe('legion32/+')
+    assert broker.publish('legion32/a', b'3') == 1
+    client.disconnect()
+    assert broker.publish('legion32/a', b'4') == 0
+    assert [payload for _, payload in client.received] == [b'1', b'3']
+
+
+def test_disconnected_client_reports_no_connection():
+    broker = InMemoryBroker()
+    client = InMemoryClient(broker=broker)
+    assert client.publish('legion32/a', b'x').rc == MQTT_ERR_NO_CONN
+    assert client.subscribe('legion32/+') == (MQTT_ERR_NO_CONN, None)
+    assert client.disconnect() == MQTT_ERR_NO_CONN
+    assert broker.stats['published'] == 0
+
+
+def test_create_client_selects_transport():
+    assert isinstance(create_client('memory'), InMemoryClient)
+    with pytest.raises(ValueError):
+        create_client('udp')
@@ -0,0 +1,66 @@
+# ============================================================================
+# TESTES DA CODIFICAÇÃO DOS PAYLOADS DOS SENSORES
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import json
+
+import pytest
+
+from payload_codec import (PayloadError, decode_payload, decode_readings, encode_batch,
+                           encode_reading, is_binary)
+
+
+def test_binary_reading_round_trip():
+    payload = encode_reading(27.35, 61.2, uptime_ms=123456, alert='high_temperature')
+    assert len(payload) == 12 and is_binary(payload)
+    data = decode_payload(memoryview(payload))
+    assert data == {'temperature': 27.35, 'humidity': 61.2, 'uptime': 123456, 'alert': 'high_temperature'}
+
+    negative = decode_payload(encode_reading(-5.5, 0.0))
+    assert negative['temperature'] == -5.5 and 'alert' not in negative
+
+
+def test_binary_batch_round_trip_with_uptime_sample_times():
+    payload = encode_batch([(20.0, 50.0, 10_000, None), (21.0, 51.0, 15_000, 'humidity_out_of_range')],
+                           sent_uptime_ms=20_000)
+    assert payload[0] == 0xB2 and len(payload) == 8 + 2 * 12
+    readings = decode_readings(payload, received_at=1000.0)
+    assert [r['temperature'] for r in readings] == [20.0, 21.0]
+    assert [r['sample_time'] for r in readings] == [990.0, 995.0]
+    assert readings[1]['alert'] == 'humidity_out_of_range'
+
+
+def test_json_batch_uses_uptime_and_inherits_envelope_fields():
+    payload = json.dumps({'esp_id': 'a', 'location': 'rack1', 'uptime': 5_000, 'readings': [
+        {'temperature': 20.0, 'humidity': 50.0, 'uptime': 2_000},
+        {'temperature': 21.0, 'humidity': 51.0}
+    ]}).encode()
+    readings = decode_readings(payload, received_at=1000.0)
+    assert [r['sample_time'] for r in readings] == [997.0, 1000.0]
+    assert all(r['location'] == 'rack1' and r['esp_id'] == 'a' for r in readings)
+
+
+def test_batch_uptime_wraps_around_32_bits():
+    payload = encode_batch([(20.0, 50.0, 0xFFFFFF00, None)], sent_uptime_ms=0x100)
+    (reading,) = decode_readings(payload, received_at=1000.0)
+    assert reading['sample_time'] == pytest.approx(1000.0 - 0x200 / 1000.0)
+
+
+def test_single_json_reading_dated_at_arrival():
+    (reading,) = decode_readings(b'{"temperature": 25.0, "humidity": 40.0}', received_at=1000.0)
+    assert reading['sample_time'] == 1000.0
+
+
+@pytest.mark.parametrize('payload', [b'[1,2]', b'42', b'"a"', b'null', b'{"readings": 3}',
+                                     b'{"readings": [1]}'])
+def test_non_object_json_rejected(payload):
+    with pytest.raises(PayloadError):
+        decode_readings(payload, received_at=1000.0)
+
+
+@pytest.mark.parametrize('payload', [encode_reading(20.0, 50.0)[:8], b'\xb2\x01\x02\x00\x00\x00\x00\x00',
+                                     b'\xb1\x09' + bytes(10)])
+def test_malformed_binary_rejected(payload):
+    with pytest.raises(PayloadError):
+        decode_readings(payload, received_at=1000.0)
@@ -0,0 +1,101 @@
+# ============================================================================
+# TESTES DA JANELA DESLIZANTE E DO BUFFER DE REORDENAÇÃO
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Uso: cd backend/common && python -m pytest -q
+
+from array import array
+
+from time_window import ReorderBuffer, SlidingWindow
+
+
+def test_ring_buffer_keeps_last_capacity_readings():
+    window = SlidingWindow(capacity=4, retention_seconds=1000, window_seconds=1000)
+    for i in range(10):
+        window.append(float(i), float(i * 10))
+    assert len(window) == 4
+    assert list(window) == [(6.0, 60.0), (7.0, 70.0), (8.0, 80.0), (9.0, 90.0)]
+    assert window.last_timestamp() == 9.0
+    assert list(window.readings(since=8.0)) == [(8.0, 80.0), (9.0, 90.0)]
+    timestamps, values = window.export()
+    assert list(timestamps) == [6.0, 7.0, 8.0, 9.0] and list(values) == [60.0, 70.0, 80.0, 90.0]
+
+
+def test_retention_drops_old_readings():
+    window = SlidingWindow(capacity=16, retention_seconds=10, window_seconds=10)
+    for t in (0.0, 5.0, 11.0, 16.0):
+        window.append(t, 1.0)
+    assert [t for t, _ in window] == [11.0, 16.0]
+
+
+def test_min_max_after_eviction():
+    window = SlidingWindow(capacity=64, retention_seconds=100, window_seconds=10)
+    # Máximo (30) e mínimo (5) no começo; saem da janela com o tempo
+    for t, value in ((0, 30.0), (2, 5.0), (4, 20.0), (6, 22.0), (8, 21.0)):
+        window.append(float(t), value)
+    assert window.window_stats(8.0) == (5, 5.0, 30.0)
+    assert window.window_stats(11.0) == (4, 5.0, 22.0)      # 30 (t=0) saiu
+    assert window.window_stats(13.0) == (3, 20.0, 22.0)     # 5 (t=2) saiu
+    window.append(14.0, 25.0)
+    assert window.spread(14.0) == 5.0
+    assert window.window_stats(30.0) == (0, None, None)
+    assert window.spread(30.0) == 0.0
+
+
+def test_rate_between_first_and_last_in_window():
+    window = SlidingWindow(capacity=64, retention_seconds=100, window_seconds=60)
+    window.append(0.0, 20.0)
+    assert window.rate(0.0) == 0.0
+    window.append(30.0, 23.0)
+    assert window.rate(30.0) == 0.1
+
+
+def test_load_then_rebuild_extrema():
+    window = SlidingWindow(capacity=4, retention_seconds=100, window_seconds=100)
+    # Mais leituras que a capacidade: ficam as 4 últimas
+    window.load(array('d', [1.0, 2.0, 3.0, 4.0, 5.0]), array('d', [9.0, 1.0, 7.0, 3.0, 5.0]))
+    assert list(window) == [(2.0, 1.0), (3.0, 7.0), (4.0, 3.0), (5.0, 5.0)]
+    # Deques refeitas na primeira consulta
+    assert window.window_stats(5.0) == (4, 1.0, 7.0)
+    window.append(6.0, 8.0)                                  # sobrescreve (2.0, 1.0)
+    assert window.window_stats(6.0) == (4, 3.0, 8.0)
+
+    # append() logo depois de load(), sem consulta no meio
+    window.load(array('d', [1.0, 2.0]), array('d', [4.0, 6.0]))
+    window.append(3.0, 2.0)
+    assert window.window_stats(3.0) == (3, 2.0, 6.0)
+
+
+def test_reorder_buffer_releases_in_event_order():
+    buffer = ReorderBuffer(allowed_lateness=5.0)
+    assert buffer.push(10.0, 'a', arrival=100.0) == []
+    assert buffer.push(8.0, 'b', arrival=100.1) == []
+    # Marca d'água 16 - 5 = 11: saem 8 e 10, em ordem
+    assert buffer.push(16.0, 'c', arrival=100.2) == [(8.0, 'b'), (10.0, 'a')]
+    assert buffer.watermark == 11.0
+    assert len(buffer) == 1
+
+    # Anterior à última liberada: atrasada demais
+    assert buffer.push(9.0, 'late', arrival=100.3) is None
+    assert buffer.late == 1
+    # Dentro da tolerância: ainda entra
+    assert buffer.push(12.0, 'd', arrival=100.4) == []
+
+
+def test_reorder_buffer_release_due_and_drain():
+    buffer = ReorderBuffer(allowed_lateness=5.0)
+    buffer.push(10.0, 'a', arrival=100.0)
+    buffer.push(12.0, 'b', arrival=101.0)
+    assert buffer.release_due(105.0) == []                  # 4 s sem chegadas
+    assert buffer.release_due(106.0) == [(10.0, 'a'), (12.0, 'b')]
+    buffer.push(20.0, 'c', arrival=107.0)
+    assert buffer.drain() == [(20.0, 'c')]
+    assert len(buffer) == 0
+
+
+def test_reorder_buffer_without_lateness_passes_through():
+    buffer = ReorderBuffer(allowed_lateness=0.0)
+    assert buffer.push(1.0, 'a', arrival=1.0) == [(1.0, 'a')]
+    assert buffer.push(1.0, 'b', arrival=1.0) == [(1.0, 'b')]
+    assert buffer.push(0.5, 'c', arrival=1.0) is None
@@ -0,0 +1,263 @@
+# ============================================================================
+# JANELA DESLIZANTE DE LEITURAS
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import heapq
+from array import array
+from collections import deque
+from typing import Any, Iterator, List, Optional, Tuple
+
+
+class SlidingWindow:
+    """
+    Histórico de leituras (timestamp, valor) de capacidade fixa.
+
+    As leituras ficam em um buffer circular de arrays 'd', então a memória
+    por sensor é limitada por capacity. Duas deques monotônicas guardam os
+    candidatos a mínimo e máximo da janela de window_seconds, o que torna
+    a variação (max - min) O(1) amortizado por leitura.
+
+    As leituras devem ser inseridas em ordem não decrescente de timestamp.
+    """
+
+    __slots__ = (
+        'capacity', 'retention_seconds', 'window_seconds',
+        '_timestamps', '_values', '_head', '_next', '_window_start',
+        '_min', '_max'
+    )
+
+    def __init__(self, capacity: int = 512, retention_seconds: float = 360,
+                 window_seconds: float = 300):
+        self.capacity = capacity
+        self.retention_seconds = retention_seconds
+        self.window_seconds = window_seconds
+
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._values = array('d', bytes(8 * capacity))
+
+        # Números de sequência absolutos; posição no buffer = seq % capacity
+        self._head = 0           # Leitura mais antiga retida
+        self._next = 0           # Próxima posição de escrita
+        self._window_start = 0   # Primeira leitura dentro da janela
+
+        # Deques de (seq, valor): _min crescente, _max decrescente; None depois
+        # de load() até o primeiro uso (refeitas em _rebuild_extrema)
+        self._min = deque()
+        self._max = deque()
+
+    def __len__(self) -> int:
+        return self._next - self._head
+
+    def __bool__(self) -> bool:
+        return self._next > self._head
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        return self.readings()
+
+    def last_timestamp(self) -> Optional[float]:
+        """Timestamp da leitura mais recente, ou None se vazio"""
+        if self._next == self._head:
+            return None
+        return self._timestamps[(self._next - 1) % self.capacity]
+
+    def append(self, timestamp: float, value: float):
+        """Adiciona uma leitura e descarta as que saíram da retenção"""
+        seq = self._next
+        pos = seq % self.capacity
+        self._timestamps[pos] = timestamp
+        self._values[pos] = value
+        self._next = seq + 1
+
+        # Buffer cheio: a leitura mais antiga foi sobrescrita
+        if self._next - self._head > self.capacity:
+            self._head = self._next - self.capacity
+
+        cutoff = timestamp - self.retention_seconds
+        while self._head < seq and self._timestamps[self._head % self.capacity] <= cutoff:
+            self._head += 1
+
+        if self._window_start < self._head:
+            self._window_start = self._head
+
+        # Depois de load(): as deques só são refeitas quando consultadas
+        if self._min is None:
+            return
+
+        mins = self._min
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        mins.append((seq, value))
+
+        maxs = self._max
+        while maxs and maxs[-1][1] <= value:
+            maxs.pop()
+        maxs.append((seq, value))
+
+        self._drop_before(self._window_start)
+
+    def load(self, timestamps: array, values: array):
+        """
+        Substitui o conteúdo por leituras já em ordem (ex.: snapshot de estado).
+
+        Copia os arrays direto para o buffer; as deques de mínimo/máximo só
+        são refeitas na primeira consulta (window_stats), então carregar
+        milhares de janelas custa uma cópia de memória por janela.
+        """
+        count = min(len(timestamps), self.capacity)
+        skip = len(timestamps) - count
+        self._timestamps[0:count] = timestamps[skip:]
+        self._values[0:count] = values[skip:]
+        self._head = 0
+        self._next = count
+        self._window_start = 0
+        self._min = None
+        self._max = None
+
+    def _rebuild_extrema(self):
+        """Refaz as deques de mínimo/máximo a partir do início da janela"""
+        mins, maxs = deque(), deque()
+        for seq in range(self._window_start, self._next):
+            value = self._values[seq % self.capacity]
+            while mins and mins[-1][1] >= value:
+                mins.pop()
+            mins.append((seq, value))
+            while maxs and maxs[-1][1] <= value:
+                maxs.pop()
+            maxs.append((seq, value))
+        self._min = mins
+        self._max = maxs
+
+    def _drop_before(self, seq: int):
+        """Remove das deques os candidatos anteriores a seq"""
+        if self._min is None:
+            return
+        while self._min and self._min[0][0] < seq:
+            self._min.popleft()
+        while self._max and self._max[0][0] < seq:
+            self._max.popleft()
+
+    def _advance_window(self, now: float):
+        """Move o início da janela para a primeira leitura >= now - window"""
+        cutoff = now - self.window_seconds
+        start = max(self._window_start, self._head)
+        while start < self._next and self._timestamps[start % self.capacity] < cutoff:
+            start += 1
+        self._window_start = start
+        self._drop_before(start)
+
+    def window_stats(self, now: float) -> Tuple[int, Optional[float], Optional[float]]:
+        """Retorna (quantidade, mínimo, máximo) das leituras da janela"""
+        self._advance_window(now)
+        count = self._next - self._window_start
+        if count == 0:
+            return 0, None, None
+        if self._min is None:
+            self._rebuild_extrema()
+        return count, self._min[0][1], self._max[0][1]
+
+    def spread(self, now: float) -> float:
+        """Variação (max - min) na janela; 0.0 com menos de duas leituras"""
+        count, minimum, maximum = self.window_stats(now)
+        if count < 2:
+            return 0.0
+        return maximum - minimum
+
+    def rate(self, now: float) -> float:
+        """Taxa de variação (por segundo) entre a primeira e a última leitura da janela"""
+        self._advance_window(now)
+        if self._next - self._window_start < 2:
+            return 0.0
+        first = self._window_start % self.capacity
+        last = (self._next - 1) % self.capacity
+        elapsed = self._timestamps[last] - self._timestamps[first]
+        if elapsed <= 0:
+            return 0.0
+        return (self._values[last] - self._values[first]) / elapsed
+
+    def readings(self, since: float = None) -> Iterator[Tuple[float, float]]:
+        """Itera (timestamp, valor) retidos, opcionalmente a partir de since"""
+        capacity = self.capacity
+        for seq in range(self._head, self._next):
+            pos = seq % capacity
+            timestamp = self._timestamps[pos]
+            if since is None or timestamp >= since:
+                yield timestamp, self._values[pos]
+
+    def export(self) -> Tuple[array, array]:
+        """Cópia das leituras retidas em dois arrays ('d'): horários e valores"""
+        count = self._next - self._head
+        start = self._head % self.capacity
+        first = min(count, self.capacity - start)
+        timestamps = self._timestamps[start:start + first] + self._timestamps[:count - first]
+        values = self._values[start:start + first] + self._values[:count - first]
+        return timestamps, values
+
+
+class ReorderBuffer:
+    """
+    Reordena leituras de um sensor pelo horário do evento.
+
+    As leituras ficam em um heap até a marca d'água (maior horário de evento
+    visto menos allowed_lateness) passar por elas e então saem em ordem, prontas
+    para a SlidingWindow. Leituras mais antigas que a última já liberada
+    chegaram tarde demais e são recusadas (contadas em late). Se o sensor
+    para de enviar, release_due() libera o que sobrou depois de
+    allowed_lateness sem chegadas. Com allowed_lateness=0 nada espera.
+    """
+
+    __slots__ = ('allowed_lateness', '_heap', '_seq', '_max_event', '_last_arrival',
+                 '_released', 'late')
+
+    def __init__(self, allowed_lateness: float = 5.0):
+        self.allowed_lateness = allowed_lateness
+        self._heap = []
+        self._seq = 0
+        self._max_event = float('-inf')
+        self._last_arrival = 0.0
+        self._released = float('-inf')
+        self.late = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def watermark(self) -> float:
+        """Horário de evento até o qual as leituras são consideradas completas"""
+        return self._max_event - self.allowed_lateness
+
+    def push(self, event_time: float, item: Any, arrival: float) -> Optional[List[Tuple[float, Any]]]:
+        """
+        Acrescenta uma leitura; retorna as liberadas [(horário, item)] em ordem,
+        ou None se ela chegou depois da última liberada (atrasada demais).
+        """
+        if event_time < self._released:
+            self.late += 1
+            return None
+
+        self._seq += 1
+        heapq.heappush(self._heap, (event_time, self._seq, item))
+        if event_time > self._max_event:
+            self._max_event = event_time
+        self._last_arrival = arrival
+        return self._release(self.watermark)
+
+    def release_due(self, now: float) -> List[Tuple[float, Any]]:
+        """Libera tudo se o sensor ficou allowed_lateness sem enviar"""
+        if self._heap and now - self._last_arrival >= self.allowed_lateness:
+            return self._release(self._max_event)
+        return []
+
+    def drain(self) -> List[Tuple[float, Any]]:
+        """Libera tudo (shutdown)"""
+        return self._release(float('inf'))
+
+    def _release(self, until: float) -> List[Tuple[float, Any]]:
+        heap = self._heap
+        ready = []
+        while heap and heap[0][0] <= until:
+            event_time, _, item = heapq.heappop(heap)
+            ready.append((event_time, item))
+        if ready:
+            self._released = ready[-1][0]
+        return ready
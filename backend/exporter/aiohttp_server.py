@@ -0,0 +1,108 @@
+# ============================================================================
+# SERVIDOR HTTP ASSÍNCRONO DO EXPORTADOR (AIOHTTP)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Substitui o servidor de desenvolvimento do Flask em produção: um único
+# event loop na thread principal atende /metrics, /health, /, /webhook e
+# /webhook/batch com conexões keep-alive concorrentes. O MQTT continua na
+# thread do paho.
+# Os handlers reaproveitam a lógica de mqtt_exporter.py (passada em
+# create_app) para que os dois servidores respondam igual.
+
+import asyncio
+import logging
+from datetime import datetime
+
+from aiohttp import web
+from prometheus_client import CONTENT_TYPE_LATEST
+
+logger = logging.getLogger(__name__)
+
+INDEX_HTML = '''
+    <html>
+    <head><title>MQTT Exporter</title></head>
+    <body>
+        <h1>MQTT Exporter - Monitoramento Inteligente de Clusters</h1>
+        <p><a href="/metrics">Métricas Prometheus</a></p>
+        <p><a href="/health">Health Check</a></p>
+    </body>
+    </html>
+    '''
+
+
+# Lotes do /webhook/batch com milhares de leituras passam do 1 MB padrão
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+
+def create_app(exposition_cache, process_webhook, process_webhook_batch=None) -> web.Application:
+    """
+    Monta a aplicação.
+
+    exposition_cache:      ExpositionCache do /metrics
+    process_webhook:       função(dict) -> (dict de resposta, status HTTP)
+    process_webhook_batch: função(bytes, content_type) -> (dict de resposta, status HTTP)
+    """
+    app = web.Application(client_max_size=MAX_BODY_SIZE)
+
+    async def metrics(request):
+        body = exposition_cache.peek()
+        if body is None:
+            # Serialização fora do loop para não atrasar outras requisições
+            body = await asyncio.get_running_loop().run_in_executor(None, exposition_cache.get)
+        return web.Response(body=body, headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+    async def health(request):
+        return web.json_response({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+
+    async def index(request):
+        return web.Response(text=INDEX_HTML, content_type='text/html')
+
+    async def webhook(request):
+        try:
+            data = await request.json()
+        except Exception:
+            data = None
+        response, status = process_webhook(data)
+        return web.json_response(response, status=status)
+
+    async def webhook_batch(request):
+        body = await request.read()
+        response, status = process_webhook_batch(body, request.content_type)
+        return web.json_response(response, status=status)
+
+    app.router.add_get('/metrics', metrics)
+    app.router.add_get('/health', health)
+    app.router.add_get('/', index)
+    app.router.add_post('/webhook', webhook)
+    if process_webhook_batch is not None:
+        app.router.add_post('/webhook/batch', webhook_batch)
+    return app
+
+
+class AiohttpServer:
+    """Executa a aplicação na thread principal enquanto should_run() for verdadeiro"""
+
+    def __init__(self, app: web.Application, host: str = '0.0.0.0', port: int = 8000):
+        self.app = app
+        self.host = host
+        self.port = port
+
+    async def _serve(self, should_run, on_tick=None):
+        runner = web.AppRunner(self.app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, self.host, self.port, reuse_address=True)
+        await site.start()
+        logger.info(f"Servidor HTTP (aiohttp) ouvindo em {self.host}:{self.port}")
+        try:
+            while should_run():
+                await asyncio.sleep(1)
+                if on_tick is not None:
+                    on_tick()
+        finally:
+            await runner.cleanup()
+            logger.info("Servidor HTTP encerrado")
+
+    def serve_forever(self, should_run, on_tick=None):
+        """on_tick(): chamado a cada segundo no loop (tarefas periódicas curtas)"""
+        asyncio.run(self._serve(should_run, on_tick))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# ============================================================================
+# BENCHMARK DE CARGA DO HTTP DO EXPORTADOR
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Mede requisições/s em /metrics e /webhook com clientes concorrentes:
+#   antes  - Flask (servidor de desenvolvimento, thread por requisição,
+#            generate_latest() a cada scrape)
+#   depois - aiohttp em um único event loop, /metrics servido do cache
+# Cada servidor roda em um subprocesso com as mesmas métricas pré-carregadas
+# (--sensors séries por gauge); o MQTT fica desconectado, então o webhook
+# mede validação + publish local.
+#
+# Também mede leituras/s no /webhook/batch (--batch leituras por requisição).
+#
+# Uso: python bench_http.py [--sensors 200] [--requests 5000] [--concurrency 32] [--batch 1000]
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_PORT = 18080
+
+
+def serve(kind: str, port: int, sensors: int):
+    """Modo subprocesso: sobe o servidor escolhido com métricas pré-carregadas"""
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['SENSOR_REGISTRY_PATH'] = os.path.join(tmp.name, 'sensors.db')
+    os.environ['PROMETHEUS_PORT'] = str(port)
+
+    import logging
+    import paho.mqtt.client as mqtt
+    import mqtt_exporter as exporter_module
+    from sensor_registry import SensorRegistry
+
+    logging.getLogger().setLevel(logging.WARNING)
+    for i in range(sensors):
+        esp_id = f"esp{i:04d}"
+        exporter_module.temperature_gauge.labels(esp_id=esp_id, location='rack').set(22.0 + i % 5)
+        exporter_module.humidity_gauge.labels(esp_id=esp_id, location='rack').set(50.0)
+        exporter_module.sensor_status_gauge.labels(esp_id=esp_id, location='rack').set(1)
+        exporter_module.messages_received_counter.labels(esp_id=esp_id, topic=f'legion32/{esp_id}').inc()
+        exporter_module.message_processing_duration.labels(esp_id=esp_id).observe(0.001)
+    exporter_module.exposition_cache.invalidate()
+
+    exporter_module.sensor_registry_global = SensorRegistry(os.environ['SENSOR_REGISTRY_PATH'], seed_sensors=['a', 'b'])
+    exporter_module.mqtt_client_global = mqtt.Client()
+
+    if kind == 'flask':
+        # Sem cache: o comportamento anterior (generate_latest por scrape)
+        exporter_module.exposition_cache.max_age = 0
+        exporter_module.app.run(host='127.0.0.1', port=port, debug=False, threaded=True)
+    else:
+        from aiohttp_server import AiohttpServer, create_app
+        app = create_app(exporter_module.exposition_cache, exporter_module.process_webhook,
+                         exporter_module.process_webhook_batch)
+        server = AiohttpServer(app, host='127.0.0.1', port=port)
+        server.serve_forever(lambda: True)
+
+
+def _wait_port(port: int, timeout: float = 15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Servidor não respondeu na porta {port}")
+
+
+async def _load(url: str, method: str, total: int, concurrency: int, body=None, data=None) -> tuple:
+    import aiohttp
+
+    done = 0
+    errors = 0
+
+    async def worker(session):
+        nonlocal done, errors
+        while done < total:
+            done += 1
+            async with session.request(method, url, json=body, data=data) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return total / elapsed, errors
+
+
+def bench_server(kind: str, args) -> dict:
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', kind,
+         '--port', str(BENCH_PORT), '--sensors', str(args.sensors)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_port(BENCH_PORT)
+        base = f"http://127.0.0.1:{BENCH_PORT}"
+        reading = {'esp_id': 'a', 'temperature': 22.5, 'humidity': 50.0}
+        results = {}
+        for name, method, path, body in (('metrics', 'GET', '/metrics', None),
+                                         ('webhook', 'POST', '/webhook', reading)):
+            rate, errors = asyncio.run(_load(base + path, method, args.requests, args.concurrency, body))
+            results[name] = rate
+            if errors:
+                print(f"⚠️ {kind} {path}: {errors} respostas com erro")
+
+        # Lote NDJSON: leituras/s (e não requisições/s)
+        ndjson = '\n'.join(json.dumps({'esp_id': 'ab'[i % 2], 'temperature': 22.5, 'humidity': 50.0})
+                           for i in range(args.batch))
+        batch_requests = max(args.concurrency, args.requests // 50)
+        rate, errors = asyncio.run(_load(base + '/webhook/batch', 'POST', batch_requests,
+                                         args.concurrency, data=ndjson))
+        results['batch'] = rate * args.batch
+        if errors:
+            print(f"⚠️ {kind} /webhook/batch: {errors} respostas com erro")
+        return results
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de carga do HTTP do exportador')
+    parser.add_argument('--sensors', type=int, default=200, help='Sensores com séries exportadas (padrão: 200)')
+    parser.add_argument('--requests', type=int, default=5000, help='Requisições por endpoint (padrão: 5000)')
+    parser.add_argument('--concurrency', type=int, default=32, help='Clientes concorrentes (padrão: 32)')
+    parser.add_argument('--batch', type=int, default=1000, help='Leituras por requisição no /webhook/batch (padrão: 1000)')
+    parser.add_argument('--serve', choices=['flask', 'aiohttp'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=BENCH_PORT, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.sensors)
+        return 0
+
+    print(f"=== Benchmark HTTP do exportador: {args.sensors} sensores, {args.requests} requisições, "
+          f"{args.concurrency} clientes ===")
+
+    before = bench_server('flask', args)
+    print(f"📉 Antes  (Flask):   /metrics {before['metrics']:8.0f} req/s | /webhook {before['webhook']:8.0f} req/s")
+
+    after = bench_server('aiohttp', args)
+    print(f"📈 Depois (aiohttp): /metrics {after['metrics']:8.0f} req/s | /webhook {after['webhook']:8.0f} req/s")
+
+    print(f"📦 Lote de {args.batch}: Flask {before['batch']:8.0f} leituras/s | aiohttp {after['batch']:8.0f} leituras/s")
+
+    print(f"🚀 Ganho: /metrics {after['metrics'] / before['metrics']:.1f}x | "
+          f"/webhook {after['webhook'] / before['webhook']:.1f}x | "
+          f"lote vs /webhook {after['batch'] / after['webhook']:.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,17 +8,31 @@ import logging
 import os
 import signal
 import sys
+import threading
 import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-import paho.mqtt.client as mqtt
 from prometheus_client import (
     start_http_server, Gauge, Counter, Histogram, 
-    generate_latest, CONTENT_TYPE_LATEST
+    CONTENT_TYPE_LATEST, REGISTRY
 )
 from flask import Flask, Response, request, jsonify
 
+# Módulos compartilhados: no container ficam em /app, localmente em ../common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from cardinality_guard import CardinalityGuard, parse_label_limits
+from deadline_scheduler import DeadlineScheduler
+from exposition_cache import ExpositionCache
+from ingest_metrics import IngestMetrics
+from ingest_trace import IngestTracer, parse_sensor_list
+from mqtt_topics import (STATUS_TOPIC, SYSTEM_STATS_TOPIC, TOPIC_SENSOR, TOPIC_STATUS,
+                         TOPIC_SYSTEM_STATS, classify_topic, sensor_topic)
+from mqtt_transport import create_client
+from payload_codec import PayloadError, decode_readings
+from sensor_registry import SensorRegistry
+from time_window import SlidingWindow
+
 # ============================================================================
 # CONFIGURAÇÃO DE LOGGING
 # ============================================================================
@@ -33,8 +47,40 @@ logger = logging.getLogger(__name__)
 # ============================================================================
 MQTT_BROKER = os.getenv('MQTT_BROKER', 'localhost')
 MQTT_PORT = int(os.getenv('MQTT_PORT', 1883))
+# paho (padrão) ou memory (broker em memória do processo, para benchmarks)
+MQTT_TRANSPORT = os.getenv('MQTT_TRANSPORT', 'paho')
 PROMETHEUS_PORT = int(os.getenv('PROMETHEUS_PORT', 8000))
 
+# Servidor HTTP: aiohttp (assíncrono, produção) ou flask (servidor de desenvolvimento)
+HTTP_SERVER = os.getenv('EXPORTER_HTTP_SERVER', 'aiohttp').lower()
+# Idade máxima da exposição em cache no /metrics (segundos)
+METRICS_CACHE_MAX_AGE = float(os.getenv('METRICS_CACHE_MAX_AGE', 5))
+# Máximo de leituras por requisição no /webhook/batch
+WEBHOOK_BATCH_MAX_ITEMS = int(os.getenv('WEBHOOK_BATCH_MAX_ITEMS', 10000))
+
+# Registro de sensores compartilhado com o sistema de alertas
+SENSOR_REGISTRY_PATH = os.getenv('SENSOR_REGISTRY_PATH', '/app/registry/sensors.db')
+SENSOR_REGISTRY_RELOAD = float(os.getenv('SENSOR_REGISTRY_RELOAD', 5))
+SENSOR_AUTO_REGISTER = os.getenv('SENSOR_AUTO_REGISTER', 'false').lower() == 'true'
+SENSOR_REGISTRY_SEED = [s for s in os.getenv('SENSOR_REGISTRY_SEED', 'a,b').split(',') if s]
+
+# Trace por mensagem (logger 'ingest.trace'); desligado por padrão
+INGEST_TRACE_SENSORS = parse_sensor_list(os.getenv('INGEST_TRACE_SENSORS', ''))
+INGEST_TRACE_SAMPLE_RATE = float(os.getenv('INGEST_TRACE_SAMPLE_RATE', '0'))
+INGEST_TRACE_LEVEL = os.getenv('INGEST_TRACE_LEVEL', 'DEBUG')
+
+# Máximo de valores distintos por label vindo de payload/tópico; o excedente
+# vai para '__overflow__'
+EXPORTER_LABEL_LIMITS = parse_label_limits(
+    os.getenv('EXPORTER_LABEL_LIMITS', 'esp_id=1000,location=64,topic=1000,alert_type=16')
+)
+
+# Janela (segundos) da variação e das taxas de temperatura/umidade
+EXPORTER_VARIATION_WINDOW = float(os.getenv('EXPORTER_VARIATION_WINDOW', 300))
+
+# Séries de um sensor sem mensagens há mais que isso são removidas (0 desliga)
+EXPORTER_SERIES_TTL = float(os.getenv('EXPORTER_SERIES_TTL', 900))
+
 # ============================================================================
 # MÉTRICAS PROMETHEUS
 # ============================================================================
@@ -52,13 +98,26 @@ humidity_gauge = Gauge(
     ['esp_id', 'location']
 )
 
-# Métricas de variação
+# Métricas de variação (max - min e taxa na janela, calculadas aqui para as
+# regras do Prometheus não precisarem de max_over_time - min_over_time)
 temperature_variation_gauge = Gauge(
     'cluster_temperature_variation_celsius',
     'Variação de temperatura',
     ['esp_id', 'location']
 )
 
+temperature_rate_gauge = Gauge(
+    'cluster_temperature_rate_celsius_per_minute',
+    'Taxa de variação da temperatura na janela',
+    ['esp_id', 'location']
+)
+
+humidity_rate_gauge = Gauge(
+    'cluster_humidity_rate_percent_per_minute',
+    'Taxa de variação da umidade na janela',
+    ['esp_id', 'location']
+)
+
 # Métricas de status
 sensor_status_gauge = Gauge(
     'cluster_sensor_status',
@@ -105,6 +164,132 @@ free_heap_gauge = Gauge(
     ['esp_id']
 )
 
+# Etapas da ingestão (buckets abaixo de 1 ms), atraso e backlog do MQTT
+ingest_metrics = IngestMetrics('cluster_exporter')
+STAGE_DECODE = ingest_metrics.stage('decode')
+STAGE_VALIDATE = ingest_metrics.stage('validate')
+STAGE_METRICS = ingest_metrics.stage('metrics')
+STAGE_STATUS = ingest_metrics.stage('status')
+
+series_expired_counter = Counter(
+    'cluster_exporter_series_expired_sensors_total',
+    'Sensores cujas séries foram removidas por falta de mensagens'
+)
+
+# Limite de cardinalidade dos labels (também exporta as séries descartadas)
+label_guard = CardinalityGuard(EXPORTER_LABEL_LIMITS)
+REGISTRY.register(label_guard)
+
+# Texto do /metrics reaproveitado entre scrapes até a próxima mensagem
+exposition_cache = ExpositionCache(max_age=METRICS_CACHE_MAX_AGE)
+
+# ============================================================================
+# HANDLES DAS SÉRIES POR SENSOR
+# ============================================================================
+
+class SensorHandles:
+    """
+    Filhos das métricas de um sensor, sem .labels() por mensagem.
+    
+    Cada filho é resolvido no primeiro uso (séries só aparecem quando o
+    sensor manda o campo, como antes) e reaproveitado nas mensagens seguintes.
+    """
+    
+    # nome -> (métrica, usa location?)
+    METRICS = {
+        'temperature': (temperature_gauge, True),
+        'humidity': (humidity_gauge, True),
+        'status': (sensor_status_gauge, True),
+        'variation': (temperature_variation_gauge, True),
+        'temperature_rate': (temperature_rate_gauge, True),
+        'humidity_rate': (humidity_rate_gauge, True),
+        'uptime': (uptime_gauge, False),
+        'wifi_rssi': (wifi_rssi_gauge, False),
+        'free_heap': (free_heap_gauge, False),
+        'duration': (message_processing_duration, False)
+    }
+    
+    __slots__ = ('esp_id', 'raw_location', 'location', 'children', 'alerts', '_messages', '_topic')
+    
+    def __init__(self, esp_id: str, raw_location, guard: CardinalityGuard):
+        self.esp_id = esp_id
+        self.raw_location = raw_location
+        self.location = guard.resolve('location', raw_location)
+        self.children = {}
+        # (alert_type, severity) -> filho do contador de alertas
+        self.alerts = {}
+        self._messages = None
+        self._topic = None
+    
+    def __getitem__(self, name: str):
+        child = self.children.get(name)
+        if child is None:
+            metric, with_location = self.METRICS[name]
+            if with_location:
+                child = metric.labels(esp_id=self.esp_id, location=self.location)
+            else:
+                child = metric.labels(esp_id=self.esp_id)
+            self.children[name] = child
+        return child
+    
+    def messages(self, guard: CardinalityGuard):
+        """Filho do contador de mensagens (label topic também limitado)"""
+        if self._messages is None:
+            self._topic = guard.resolve('topic', sensor_topic(self.esp_id))
+            self._messages = messages_received_counter.labels(esp_id=self.esp_id, topic=self._topic)
+        return self._messages
+    
+    def alert(self, alert_type, severity: str, guard: CardinalityGuard):
+        """Filho do contador de alertas, criado na primeira ocorrência"""
+        alert_type = guard.resolve('alert_type', alert_type)
+        child = self.alerts.get((alert_type, severity))
+        if child is None:
+            child = alerts_generated_counter.labels(
+                esp_id=self.esp_id,
+                alert_type=alert_type,
+                severity=severity
+            )
+            self.alerts[(alert_type, severity)] = child
+        return child
+    
+    def relocate(self, raw_location, guard: CardinalityGuard):
+        """Troca a location; as séries da location anterior saem do registro"""
+        self.raw_location = raw_location
+        location = guard.resolve('location', raw_location)
+        if location == self.location:
+            return
+        for name in [name for name in self.children if self.METRICS[name][1]]:
+            _remove_series(self.METRICS[name][0], self.esp_id, self.location)
+            del self.children[name]
+        self.location = location
+    
+    def remove(self) -> int:
+        """Remove do registro todas as séries criadas pelos handles; retorna quantas"""
+        removed = 0
+        for name in self.children:
+            metric, with_location = self.METRICS[name]
+            if with_location:
+                removed += _remove_series(metric, self.esp_id, self.location)
+            else:
+                removed += _remove_series(metric, self.esp_id)
+        if self._messages is not None:
+            removed += _remove_series(messages_received_counter, self.esp_id, self._topic)
+        for alert_type, severity in self.alerts:
+            removed += _remove_series(alerts_generated_counter, self.esp_id, alert_type, severity)
+        self.children.clear()
+        self.alerts.clear()
+        self._messages = None
+        return removed
+
+
+def _remove_series(metric, *labelvalues) -> int:
+    """metric.remove() tolerante a série inexistente (outro sensor no __overflow__)"""
+    try:
+        metric.remove(*labelvalues)
+        return 1
+    except KeyError:
+        return 0
+
 # ============================================================================
 # CLASSE PRINCIPAL DO EXPORTADOR
 # ============================================================================
@@ -114,8 +299,27 @@ class MQTTExporter:
     
     def __init__(self):
         self.mqtt_client = None
+        self.http_server = None
         self.running = True
         self.sensor_data = {}
+        self.sensor_handles = {}
+        # esp_id -> (janela de temperatura, janela de umidade)
+        self.sensor_windows = {}
+        # Prazo de expiração das séries por sensor (última mensagem + TTL);
+        # o lock serializa a remoção com o callback do MQTT
+        self.series_expiry = DeadlineScheduler()
+        self.series_lock = threading.Lock()
+        self.sensor_registry = SensorRegistry(
+            SENSOR_REGISTRY_PATH,
+            reload_interval=SENSOR_REGISTRY_RELOAD,
+            auto_register=SENSOR_AUTO_REGISTER,
+            seed_sensors=SENSOR_REGISTRY_SEED
+        )
+        self.tracer = IngestTracer(
+            sensors=INGEST_TRACE_SENSORS,
+            sample_rate=INGEST_TRACE_SAMPLE_RATE,
+            level=INGEST_TRACE_LEVEL
+        )
         
         # Configuração de sinais
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -129,7 +333,7 @@ class MQTTExporter:
     def setup_mqtt(self):
         """Configura cliente MQTT"""
         try:
-            self.mqtt_client = mqtt.Client()
+            self.mqtt_client = create_client(MQTT_TRANSPORT)
             self.mqtt_client.on_connect = self._on_mqtt_connect
             self.mqtt_client.on_message = self._on_mqtt_message
             self.mqtt_client.on_disconnect = self._on_mqtt_disconnect
@@ -137,7 +341,7 @@ class MQTTExporter:
             # Configurações de reconexão
             self.mqtt_client.reconnect_delay_set(min_delay=1, max_delay=120)
             
-            logger.info("Cliente MQTT configurado")
+            logger.info(f"Cliente MQTT configurado (transporte: {MQTT_TRANSPORT})")
             
         except Exception as e:
             logger.error(f"Erro ao configurar MQTT: {e}")
@@ -151,8 +355,8 @@ class MQTTExporter:
             # Inscreve nos tópicos
             topics = [
                 ('legion32/+', 0),  # Dados dos sensores (legion32/a, legion32/b)
-                ('legion32/status', 0),  # Status dos sensores
-                ('legion32/system/stats', 0)  # Estatísticas do sistema
+                (STATUS_TOPIC, 0),  # Status dos sensores
+                (SYSTEM_STATS_TOPIC, 0)  # Estatísticas do sistema
             ]
             
             for topic, qos in topics:
@@ -173,100 +377,203 @@ class MQTTExporter:
         start_time = time.time()
         
         try:
-            # Log da mensagem recebida
-            logger.debug(f"Mensagem recebida: {msg.topic} - {msg.payload.decode()}")
-            
-            # Processa diferentes tipos de mensagem
-            if msg.topic.startswith('legion32/') and len(msg.topic.split('/')) == 2:
-                self._process_sensor_data(msg.topic, msg.payload.decode())
-            elif msg.topic == 'legion32/status':
-                self._process_status_message(msg.payload.decode())
-            elif msg.topic == 'legion32/system/stats':
-                self._process_system_stats(msg.payload.decode())
-            else:
-                logger.warning(f"Tópico não reconhecido: {msg.topic}")
-            
-            # Registra tempo de processamento
-            duration = time.time() - start_time
-            esp_id = msg.topic.split('/')[-1] if len(msg.topic.split('/')) >= 2 else 'unknown'
-            message_processing_duration.labels(esp_id=esp_id).observe(duration)
+            with self.series_lock:
+                # Processa diferentes tipos de mensagem (status antes do
+                # curinga: 'legion32/status' também tem dois níveis)
+                kind, _ = classify_topic(msg.topic)
+                if kind == TOPIC_STATUS:
+                    self._process_status_message(msg.payload.decode())
+                    STAGE_STATUS.observe(time.time() - start_time)
+                elif kind == TOPIC_SYSTEM_STATS:
+                    self._process_system_stats(msg.payload.decode())
+                elif kind == TOPIC_SENSOR:
+                    # Payload bruto: JSON ou binário (decidido pelo primeiro byte)
+                    esp_id = self._process_sensor_data(msg.topic, msg.payload)
+                    
+                    # Tempo total por sensor (só sensores aceitos)
+                    if esp_id is not None:
+                        self._handles(esp_id)['duration'].observe(time.time() - start_time)
+                else:
+                    logger.warning(f"Tópico não reconhecido: {msg.topic}")
             
         except Exception as e:
             logger.error(f"Erro ao processar mensagem MQTT: {e}")
+        finally:
+            exposition_cache.invalidate()
+    
+    def _handles(self, esp_id: str, location=None) -> SensorHandles:
+        """
+        Handles do sensor; location None mantém a já conhecida.
+        
+        São refeitos só quando a location do payload muda.
+        """
+        handles = self.sensor_handles.get(esp_id)
+        if handles is None:
+            # Sensor novo: esp_id passa pelo limite (status traz esp_id livre)
+            esp_id = label_guard.resolve('esp_id', esp_id)
+            handles = self.sensor_handles.get(esp_id)
+            if handles is None:
+                handles = SensorHandles(esp_id, 'unknown' if location is None else location, label_guard)
+                self.sensor_handles[esp_id] = handles
+        
+        if location is not None and location != handles.raw_location:
+            handles.relocate(location, label_guard)
+        
+        # Toda atividade adia a expiração das séries do sensor
+        if EXPORTER_SERIES_TTL > 0:
+            self.series_expiry.arm(handles.esp_id, time.time() + EXPORTER_SERIES_TTL)
+        return handles
     
-    def _process_sensor_data(self, topic: str, payload: str):
-        """Processa dados de sensores"""
+    def _tick(self):
+        """Tarefas periódicas do loop principal (uma vez por segundo)"""
+        self.expire_stale_series()
+        ingest_metrics.sample_backlog(self.mqtt_client)
+    
+    def expire_stale_series(self, now: float = None) -> int:
+        """Remove as séries dos sensores sem mensagens há mais de EXPORTER_SERIES_TTL"""
+        expired = self.series_expiry.pop_expired(now)
+        if not expired:
+            return 0
+        
+        removed = 0
+        sensors = 0
+        with self.series_lock:
+            for esp_id in expired:
+                # Re-armado entre o pop e o lock: o sensor voltou
+                if esp_id in self.series_expiry:
+                    continue
+                sensors += 1
+                handles = self.sensor_handles.pop(esp_id, None)
+                if handles is not None:
+                    removed += handles.remove()
+                self.sensor_data.pop(esp_id, None)
+                self.sensor_windows.pop(esp_id, None)
+                if esp_id != label_guard.overflow_value:
+                    label_guard.release('esp_id', esp_id)
+                    label_guard.release('topic', sensor_topic(esp_id))
+        
+        series_expired_counter.inc(sensors)
+        exposition_cache.invalidate()
+        logger.info(f"🧹 Séries expiradas: {sensors} sensores sem mensagens há "
+                    f"{EXPORTER_SERIES_TTL:.0f}s ({removed} séries removidas)")
+        return removed
+    
+    def _process_sensor_data(self, topic: str, payload: bytes) -> Optional[str]:
+        """Processa dados de sensores; retorna o esp_id se a mensagem foi aceita"""
         try:
             # Extrai ESP ID do tópico (legion32/a, legion32/b, etc.)
             esp_id = topic.split('/')[-1]
-            
-            # APENAS sensores 'a' e 'b' são aceitos
-            sensores_validos = {'a', 'b'}
-            if esp_id not in sensores_validos:
-                logger.warning(f"🚫 MQTT: Sensor '{esp_id}' REJEITADO - Apenas sensores 'a' e 'b' são aceitos")
-                return
-            
-            # Parse do JSON
-            data = json.loads(payload)
+            trace = self.tracer.begin(esp_id)
+            if trace:
+                trace.detail('received', topic=topic, payload=payload)
+            
+            # Apenas sensores cadastrados no registro são aceitos
+            started = time.perf_counter()
+            valid = self.sensor_registry.is_valid(esp_id)
+            STAGE_VALIDATE.observe(time.perf_counter() - started)
+            if not valid:
+                logger.warning(f"🚫 MQTT: Sensor '{esp_id}' REJEITADO - não cadastrado no registro de sensores")
+                return None
+            
+            # Parse do payload (JSON ou binário, leitura avulsa ou lote)
+            started = time.perf_counter()
+            readings = decode_readings(payload, time.time())
+            STAGE_DECODE.observe(time.perf_counter() - started)
+            if not readings:
+                return None
+            
+            started = time.perf_counter()
+            # Gauges refletem a amostra mais recente
+            data = readings[-1]
+            handles = self._handles(esp_id, data.get('location', 'unknown'))
             
             # Incrementa contador de mensagens
-            messages_received_counter.labels(esp_id=esp_id, topic=topic).inc()
+            handles.messages(label_guard).inc()
+            
+            # Processa alertas de todas as amostras do lote
+            for reading in readings:
+                if 'alert' in reading:
+                    severity = self._get_alert_severity(reading)
+                    handles.alert(reading['alert'], severity, label_guard).inc()
             
             # Atualiza métricas de temperatura e umidade
             if 'temperature' in data:
-                temperature_gauge.labels(
-                    esp_id=esp_id,
-                    location=data.get('location', 'unknown')
-                ).set(data['temperature'])
+                handles['temperature'].set(data['temperature'])
             
             if 'humidity' in data:
-                humidity_gauge.labels(
-                    esp_id=esp_id,
-                    location=data.get('location', 'unknown')
-                ).set(data['humidity'])
+                handles['humidity'].set(data['humidity'])
             
-            # Métrica de variação de temperatura é calculada no AlertManager
-            # Não precisa mais processar aqui
+            # Variação e taxas na janela (todas as amostras do lote entram)
+            if handles.esp_id != label_guard.overflow_value:
+                self._update_variation(handles, readings)
             
             # Atualiza métricas de sistema
             if 'uptime' in data:
-                uptime_gauge.labels(esp_id=esp_id).set(data['uptime'])
+                handles['uptime'].set(data['uptime'])
             
             if 'wifi_rssi' in data:
-                wifi_rssi_gauge.labels(esp_id=esp_id).set(data['wifi_rssi'])
+                handles['wifi_rssi'].set(data['wifi_rssi'])
             
             if 'free_heap' in data:
-                free_heap_gauge.labels(esp_id=esp_id).set(data['free_heap'])
-            
-            # Processa alertas
-            if 'alert' in data:
-                alert_type = data['alert']
-                severity = self._get_alert_severity(data)
-                alerts_generated_counter.labels(
-                    esp_id=esp_id,
-                    alert_type=alert_type,
-                    severity=severity
-                ).inc()
+                handles['free_heap'].set(data['free_heap'])
             
             # Atualiza status do sensor
-            sensor_status_gauge.labels(
-                esp_id=esp_id,
-                location=data.get('location', 'unknown')
-            ).set(1)  # Online
+            handles['status'].set(1)  # Online
             
-            # Armazena dados para referência
-            self.sensor_data[esp_id] = {
+            # Armazena dados para referência, pelo mesmo esp_id (já limitado) com
+            # que a expiração é armada: sensores no __overflow__ dividem a entrada
+            self.sensor_data[handles.esp_id] = {
                 'last_update': datetime.now(),
                 'data': data
             }
+            STAGE_METRICS.observe(time.perf_counter() - started)
+            
+            # Atraso dispositivo -> exportação de cada amostra
+            exported_at = time.time()
+            for reading in readings:
+                ingest_metrics.observe_lag(reading, exported_at)
             
-            logger.debug(f"Dados processados para {esp_id}: Temp={data.get('temperature')}°C, "
-                        f"Umidade={data.get('humidity')}%")
+            if trace:
+                trace.event('exported', temperature=data.get('temperature'), humidity=data.get('humidity'),
+                            readings=len(readings))
+            return esp_id
             
         except json.JSONDecodeError as e:
             logger.error(f"Erro ao decodificar JSON: {e}")
+        except PayloadError as e:
+            logger.error(f"Erro ao decodificar payload: {e}")
         except Exception as e:
             logger.error(f"Erro ao processar dados do sensor: {e}")
+        return None
+    
+    def _update_variation(self, handles: SensorHandles, readings: list):
+        """Alimenta as janelas do sensor e publica variação e taxas"""
+        windows = self.sensor_windows.get(handles.esp_id)
+        if windows is None:
+            windows = tuple(
+                SlidingWindow(retention_seconds=EXPORTER_VARIATION_WINDOW,
+                              window_seconds=EXPORTER_VARIATION_WINDOW)
+                for _ in range(2)
+            )
+            self.sensor_windows[handles.esp_id] = windows
+        temperature_window, humidity_window = windows
+        
+        for reading in readings:
+            sample_time = reading['sample_time']
+            # A janela exige ordem de tempo: amostra anterior à última é ignorada
+            if reading.get('temperature') is not None and \
+                    sample_time >= (temperature_window.last_timestamp() or 0.0):
+                temperature_window.append(sample_time, float(reading['temperature']))
+            if reading.get('humidity') is not None and \
+                    sample_time >= (humidity_window.last_timestamp() or 0.0):
+                humidity_window.append(sample_time, float(reading['humidity']))
+        
+        if temperature_window:
+            now = temperature_window.last_timestamp()
+            handles['variation'].set(temperature_window.spread(now))
+            handles['temperature_rate'].set(temperature_window.rate(now) * 60)
+        if humidity_window:
+            handles['humidity_rate'].set(humidity_window.rate(humidity_window.last_timestamp()) * 60)
     
     def _process_status_message(self, payload: str):
         """Processa mensagens de status"""
@@ -276,10 +583,9 @@ class MQTTExporter:
             status = data.get('status', 'unknown')
             
             # Atualiza status do sensor
-            sensor_status_gauge.labels(
-                esp_id=esp_id,
-                location=data.get('location', 'unknown')
-            ).set(1 if status == 'online' else 0)
+            self._handles(str(esp_id), data.get('location'))['status'].set(
+                1 if status == 'online' else 0
+            )
             
             logger.info(f"Status atualizado: {esp_id} - {status}")
             
@@ -338,19 +644,26 @@ class MQTTExporter:
             logger.info("=== Iniciando Exportador MQTT para Prometheus ===")
             logger.info(f"Versão: 1.0")
             logger.info(f"Broker MQTT: {MQTT_BROKER}:{MQTT_PORT}")
-            logger.info(f"Porta HTTP: 8000")
+            logger.info(f"Porta HTTP: {PROMETHEUS_PORT}")
             
-            # Configura MQTT
-            self.setup_mqtt()
+            # Configura e conecta ao MQTT (main() já pode ter feito isso)
+            if self.mqtt_client is None:
+                self.setup_mqtt()
+                self.connect_mqtt()
             
-            # Conecta ao MQTT
-            self.connect_mqtt()
+            # Recarga a quente do registro de sensores
+            self.sensor_registry.start()
             
             logger.info("Exportador iniciado com sucesso!")
             
-            # Loop principal
-            while self.running:
-                time.sleep(1)
+            # Loop principal (o servidor assíncrono ocupa a thread principal);
+            # a cada segundo expira séries de sensores parados e mede o backlog
+            if self.http_server is not None:
+                self.http_server.serve_forever(lambda: self.running, on_tick=self._tick)
+            else:
+                while self.running:
+                    time.sleep(1)
+                    self._tick()
                 
         except KeyboardInterrupt:
             logger.info("Interrupção do teclado recebida")
@@ -374,6 +687,8 @@ class MQTTExporter:
             except Exception as e:
                 logger.error(f"Erro ao desconectar MQTT: {e}")
         
+        self.sensor_registry.stop()
+        
         logger.info("Exportador desligado com sucesso")
         sys.exit(0)
 
@@ -383,13 +698,14 @@ class MQTTExporter:
 
 app = Flask(__name__)
 
-# Cliente MQTT global para uso no webhook
+# Cliente MQTT e registro de sensores globais para uso no webhook
 mqtt_client_global = None
+sensor_registry_global = None
 
 @app.route('/metrics')
 def metrics():
     """Endpoint para métricas Prometheus"""
-    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+    return Response(exposition_cache.get(), mimetype=CONTENT_TYPE_LATEST)
 
 @app.route('/health')
 def health():
@@ -410,39 +726,44 @@ def index():
     </html>
     '''
 
-@app.route('/webhook', methods=['POST'])
-def webhook():
-    """Webhook para receber dados de sensores via HTTP"""
+def _validate_reading(data) -> tuple:
+    """Retorna (mensagem de erro ou None, sensor fora do registro?)"""
+    if not data:
+        return 'No data received', False
+    if not isinstance(data, dict):
+        return 'reading must be a JSON object', False
+    
+    esp_id = data.get('esp_id')
+    if not esp_id:
+        return 'esp_id is required', False
+    
+    # Apenas sensores cadastrados no registro são aceitos
+    if sensor_registry_global is None or not sensor_registry_global.is_valid(esp_id):
+        return f'Sensor {esp_id} não está cadastrado no registro de sensores.', True
+    
+    if data.get('temperature') is None or data.get('humidity') is None:
+        return 'temperature and humidity are required', False
+    return None, False
+
+def process_webhook(data) -> tuple:
+    """Valida a leitura do webhook e publica no MQTT; retorna (resposta, status)"""
     try:
-        data = request.get_json()
+        error, unregistered = _validate_reading(data)
+        if error:
+            if unregistered:
+                logger.warning(f"🚫 Webhook: Sensor '{data['esp_id']}' REJEITADO - não cadastrado no registro de sensores")
+            return {'error': error}, 400
         
-        if not data:
-            return jsonify({'error': 'No data received'}), 400
-        
-        esp_id = data.get('esp_id')
-        if not esp_id:
-            return jsonify({'error': 'esp_id is required'}), 400
-        
-        # APENAS sensores 'a' e 'b' são aceitos
-        sensores_validos = {'a', 'b'}
-        if esp_id not in sensores_validos:
-            logger.warning(f"🚫 Webhook: Sensor '{esp_id}' REJEITADO - Apenas sensores 'a' e 'b' são aceitos")
-            return jsonify({'error': f'Sensor {esp_id} não é válido. Apenas sensores "a" e "b" são aceitos.'}), 400
-        
-        temperature = data.get('temperature')
-        humidity = data.get('humidity')
-        
-        if temperature is None or humidity is None:
-            return jsonify({'error': 'temperature and humidity are required'}), 400
+        esp_id = data['esp_id']
         
         # Cria tópico MQTT
-        topic = f"legion32/{esp_id}"
+        topic = sensor_topic(esp_id)
         
         # Payload para MQTT
         mqtt_payload = {
             'esp_id': esp_id,
-            'temperature': temperature,
-            'humidity': humidity,
+            'temperature': data['temperature'],
+            'humidity': data['humidity'],
             'timestamp': datetime.now().isoformat()
         }
         
@@ -453,14 +774,113 @@ def webhook():
         else:
             logger.warning("Cliente MQTT não disponível para webhook")
         
-        return jsonify({
+        return {
             'status': 'success',
             'message': f'Dados do sensor {esp_id} recebidos e publicados no MQTT'
-        }), 200
+        }, 200
         
     except Exception as e:
         logger.error(f"Erro no webhook: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return {'error': 'Internal server error'}, 500
+
+def _parse_batch(body: bytes, content_type: str = '') -> list:
+    """Lê um array JSON ou NDJSON (uma leitura por linha)"""
+    text = body.decode('utf-8') if isinstance(body, bytes) else body
+    if 'ndjson' not in (content_type or '') and text.lstrip().startswith('['):
+        items = json.loads(text)
+        if not isinstance(items, list):
+            raise ValueError('expected a JSON array')
+        return items
+    
+    # NDJSON: linha inválida vira item com erro, sem derrubar o lote
+    items = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            items.append(ValueError(f'invalid JSON: {e.msg}'))
+    return items
+
+def process_webhook_batch(body: bytes, content_type: str = '') -> tuple:
+    """
+    Valida um lote de leituras em uma passada e publica as válidas em rajada.
+    
+    Retorna (resposta, status) com o resultado de cada item na ordem recebida.
+    """
+    try:
+        try:
+            items = _parse_batch(body, content_type)
+        except (ValueError, UnicodeDecodeError) as e:
+            return {'error': f'Invalid batch: {e}'}, 400
+        
+        if not items:
+            return {'error': 'No data received'}, 400
+        if len(items) > WEBHOOK_BATCH_MAX_ITEMS:
+            return {'error': f'Batch too large: {len(items)} items (max {WEBHOOK_BATCH_MAX_ITEMS})'}, 413
+        
+        # Validação: uma passada, sem publicar nada ainda
+        results = []
+        accepted = []
+        rejected_sensors = set()
+        for index, data in enumerate(items):
+            if isinstance(data, Exception):
+                error, unregistered = str(data), False
+            else:
+                error, unregistered = _validate_reading(data)
+            if error:
+                if unregistered:
+                    rejected_sensors.add(str(data['esp_id']))
+                results.append({'index': index, 'status': 'error', 'error': error})
+            else:
+                results.append({'index': index, 'status': 'accepted'})
+                accepted.append(data)
+        
+        if rejected_sensors:
+            logger.warning(f"🚫 Webhook (lote): sensores REJEITADOS - não cadastrados no registro: "
+                           f"{', '.join(sorted(rejected_sensors))}")
+        
+        # Publicação em rajada: um timestamp por lote, sem log por leitura
+        if accepted:
+            if mqtt_client_global:
+                timestamp = datetime.now().isoformat()
+                publish = mqtt_client_global.publish
+                for data in accepted:
+                    esp_id = data['esp_id']
+                    publish(sensor_topic(esp_id), json.dumps({
+                        'esp_id': esp_id,
+                        'temperature': data['temperature'],
+                        'humidity': data['humidity'],
+                        'timestamp': timestamp
+                    }))
+                logger.info(f"✅ Webhook (lote): {len(accepted)} leituras publicadas no MQTT")
+            else:
+                logger.warning("Cliente MQTT não disponível para webhook")
+        
+        return {
+            'status': 'success' if len(accepted) == len(items) else ('partial' if accepted else 'error'),
+            'accepted': len(accepted),
+            'rejected': len(items) - len(accepted),
+            'results': results
+        }, 200 if accepted else 400
+        
+    except Exception as e:
+        logger.error(f"Erro no webhook (lote): {e}")
+        return {'error': 'Internal server error'}, 500
+
+@app.route('/webhook', methods=['POST'])
+def webhook():
+    """Webhook para receber dados de sensores via HTTP"""
+    response, status = process_webhook(request.get_json(silent=True))
+    return jsonify(response), status
+
+@app.route('/webhook/batch', methods=['POST'])
+def webhook_batch():
+    """Webhook para lotes de leituras (array JSON ou NDJSON)"""
+    response, status = process_webhook_batch(request.get_data(), request.content_type)
+    return jsonify(response), status
 
 # ============================================================================
 # FUNÇÃO PRINCIPAL
@@ -468,7 +888,7 @@ def webhook():
 
 def main():
     """Função principal"""
-    global mqtt_client_global
+    global mqtt_client_global, sensor_registry_global
     
     try:
         # Cria exporter global para uso no webhook
@@ -480,16 +900,28 @@ def main():
         # Conecta ao MQTT
         exporter.connect_mqtt()
         
-        # Armazena cliente MQTT globalmente para uso no webhook
+        # Armazena cliente MQTT e registro globalmente para uso no webhook
         mqtt_client_global = exporter.mqtt_client
+        sensor_registry_global = exporter.sensor_registry
         
-        # Inicia Flask app em thread separada
-        import threading
-        flask_thread = threading.Thread(
-            target=lambda: app.run(host='0.0.0.0', port=8000, debug=False)
-        )
-        flask_thread.daemon = True
-        flask_thread.start()
+        if HTTP_SERVER == 'aiohttp':
+            try:
+                from aiohttp_server import AiohttpServer, create_app
+                exporter.http_server = AiohttpServer(
+                    create_app(exposition_cache, process_webhook, process_webhook_batch),
+                    port=PROMETHEUS_PORT
+                )
+            except ImportError:
+                logger.warning("aiohttp não instalado, usando o servidor do Flask")
+        
+        # Sem aiohttp: Flask app em thread separada
+        if exporter.http_server is None:
+            import threading
+            flask_thread = threading.Thread(
+                target=lambda: app.run(host='0.0.0.0', port=PROMETHEUS_PORT, debug=False, threaded=True)
+            )
+            flask_thread.daemon = True
+            flask_thread.start()
         
         # Executa exportador MQTT
         exporter.run()
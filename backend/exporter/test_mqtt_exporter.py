@@ -0,0 +1,97 @@
+# ============================================================================
+# TESTES DA EXPIRAÇÃO DE SÉRIES DO EXPORTADOR
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Uso: cd backend/exporter && python -m pytest -q
+
+import json
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+import mqtt_exporter
+from cardinality_guard import CardinalityGuard
+from mqtt_transport import InMemoryMessage
+
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    """Exportador com registro em tmp_path e no máximo 2 esp_id distintos"""
+    monkeypatch.setattr(mqtt_exporter, 'SENSOR_REGISTRY_PATH', str(tmp_path / 'sensors.db'))
+    monkeypatch.setattr(mqtt_exporter, 'SENSOR_REGISTRY_SEED', ['a', 'b', 'c', 'd'])
+    monkeypatch.setattr(mqtt_exporter, 'label_guard',
+                        CardinalityGuard({'esp_id': 2, 'location': 8, 'topic': 8, 'alert_type': 4}))
+    instance = mqtt_exporter.MQTTExporter()
+    yield instance
+    instance.sensor_registry.stop()
+
+
+def _publish(exporter, esp_id: str):
+    payload = json.dumps({'temperature': 25.0, 'humidity': 50.0}).encode()
+    return exporter._process_sensor_data(f"legion32/{esp_id}", payload)
+
+
+def test_overflow_sensors_share_entry_and_expire(exporter):
+    for esp_id in ('a', 'b', 'c', 'd'):
+        assert _publish(exporter, esp_id) == esp_id
+    overflow = mqtt_exporter.label_guard.overflow_value
+    assert sorted(exporter.sensor_data) == sorted(['a', 'b', overflow])
+
+    exporter.expire_stale_series(time.time() + mqtt_exporter.EXPORTER_SERIES_TTL + 1)
+    assert exporter.sensor_data == {}
+    assert exporter.sensor_handles == {}
+    assert len(exporter.series_expiry) == 0
+
+
+def test_status_topic_routed_before_sensor_wildcard(exporter):
+    exporter.sensor_registry.auto_register = True
+    status = json.dumps({'esp_id': 'a', 'status': 'offline'}).encode()
+    exporter._on_mqtt_message(None, None, InMemoryMessage('legion32/status', status))
+    exporter._on_mqtt_message(None, None, InMemoryMessage('legion32/a/extra', b'{"temperature": 1}'))
+    assert 'status' not in exporter.sensor_registry
+    assert exporter.sensor_data == {}
+    assert REGISTRY.get_sample_value('cluster_sensor_status', {'esp_id': 'a', 'location': 'unknown'}) == 0
+
+
+def test_location_change_moves_series_of_cached_handles(exporter):
+    def publish(location):
+        payload = json.dumps({'temperature': 25.0, 'humidity': 50.0, 'location': location}).encode()
+        exporter._process_sensor_data('legion32/a', payload)
+
+    def temperature(location):
+        return REGISTRY.get_sample_value('cluster_temperature_celsius', {'esp_id': 'a', 'location': location})
+
+    publish('rack1')
+    handles = exporter.sensor_handles['a']
+    child = handles['temperature']
+    publish('rack1')
+    assert handles['temperature'] is child        # sem .labels() por mensagem
+
+    publish('rack2')
+    assert exporter.sensor_handles['a'] is handles
+    assert temperature('rack1') is None and temperature('rack2') == 25.0
+    assert REGISTRY.get_sample_value('cluster_humidity_percent', {'esp_id': 'a', 'location': 'rack1'}) is None
+
+
+def test_variation_and_rates_from_batch_sample_times(exporter):
+    def gauge(name):
+        return REGISTRY.get_sample_value(name, {'esp_id': 'b', 'location': 'unknown'})
+
+    # Amostras a t-120 s, t-60 s e t (uptime do lote em ms)
+    batch = {'uptime': 130_000, 'readings': [
+        {'temperature': 20.0, 'humidity': 50.0, 'uptime': 10_000},
+        {'temperature': 23.0, 'humidity': 50.0, 'uptime': 70_000},
+        {'temperature': 22.0, 'humidity': 56.0, 'uptime': 130_000}
+    ]}
+    exporter._process_sensor_data('legion32/b', json.dumps(batch).encode())
+    assert gauge('cluster_temperature_variation_celsius') == pytest.approx(3.0)
+    assert gauge('cluster_temperature_rate_celsius_per_minute') == pytest.approx(1.0)
+    assert gauge('cluster_humidity_rate_percent_per_minute') == pytest.approx(3.0)
+
+    # Amostra anterior à última da janela é ignorada (não mexe na variação)
+    late = {'uptime': 200_000, 'readings': [{'temperature': 40.0, 'humidity': 50.0, 'uptime': 0}]}
+    exporter._process_sensor_data('legion32/b', json.dumps(late).encode())
+    assert gauge('cluster_temperature_variation_celsius') == pytest.approx(3.0)
+    assert len(exporter.sensor_windows['b'][0]) == 3
@@ -0,0 +1,77 @@
+# ============================================================================
+# TESTES DO WEBHOOK EM LOTE
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+
+import json
+
+import pytest
+
+import mqtt_exporter
+from sensor_registry import SensorRegistry
+
+
+class _RecordingClient:
+    """Cliente MQTT que só guarda o que foi publicado"""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, payload):
+        self.published.append((topic, json.loads(payload)))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    registry = SensorRegistry(str(tmp_path / 'sensors.db'), reload_interval=0, seed_sensors=['a', 'b'])
+    recorder = _RecordingClient()
+    monkeypatch.setattr(mqtt_exporter, 'sensor_registry_global', registry)
+    monkeypatch.setattr(mqtt_exporter, 'mqtt_client_global', recorder)
+    yield recorder
+    registry.stop()
+
+
+def _reading(esp_id: str, temperature: float = 25.0) -> dict:
+    return {'esp_id': esp_id, 'temperature': temperature, 'humidity': 50.0}
+
+
+def test_array_batch_reports_each_item_and_publishes_valid_ones(client):
+    body = json.dumps([_reading('a'), _reading('x'), {'esp_id': 'b'}, _reading('b', 30.0)]).encode()
+    response, status = mqtt_exporter.process_webhook_batch(body, 'application/json')
+    assert status == 200 and response['status'] == 'partial'
+    assert (response['accepted'], response['rejected']) == (2, 2)
+    assert [item['status'] for item in response['results']] == ['accepted', 'error', 'error', 'accepted']
+
+    assert [topic for topic, _ in client.published] == ['legion32/a', 'legion32/b']
+    assert client.published[1][1]['temperature'] == 30.0
+    # Um timestamp para o lote inteiro
+    assert client.published[0][1]['timestamp'] == client.published[1][1]['timestamp']
+
+
+def test_ndjson_bad_line_is_item_error(client):
+    body = b'\n'.join([json.dumps(_reading('a')).encode(), b'{nope', b'', json.dumps(_reading('b')).encode()])
+    response, status = mqtt_exporter.process_webhook_batch(body, 'application/x-ndjson')
+    assert status == 200
+    assert [item['status'] for item in response['results']] == ['accepted', 'error', 'accepted']
+    assert response['results'][1]['error'].startswith('invalid JSON')
+    assert len(client.published) == 2
+
+
+@pytest.mark.parametrize('body, expected_status', [
+    (b'[{"esp_id": "a", "temperature": 1', 400),     # array JSON inválido: lote inteiro rejeitado
+    (b'{"esp_id": "a"}', 400),                        # NDJSON de uma linha sem campos obrigatórios
+    (json.dumps([_reading('x'), _reading('y')]).encode(), 400),
+    (b'', 400),
+])
+def test_batch_without_valid_items_publishes_nothing(client, body, expected_status):
+    _, status = mqtt_exporter.process_webhook_batch(body, 'application/json')
+    assert status == expected_status
+    assert client.published == []
+
+
+def test_batch_too_large_rejected_before_validation(client, monkeypatch):
+    monkeypatch.setattr(mqtt_exporter, 'WEBHOOK_BATCH_MAX_ITEMS', 2)
+    body = json.dumps([_reading('a')] * 3).encode()
+    response, status = mqtt_exporter.process_webhook_batch(body, 'application/json')
+    assert status == 413 and 'results' not in response
+    assert client.published == []
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# ============================================================================
+# BENCHMARK DO PIPELINE POR TRANSPORTE MQTT
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# ClusterMonitoringSystem e MQTTExporter no mesmo processo recebem as mesmas
+# mensagens da frota simulada (fleet.py) por dois transportes:
+#   antes  - paho + StandInBroker em TCP local (socket, parser de pacotes e
+#            threads de rede disputando o GIL com o processamento)
+#   depois - MQTT_TRANSPORT=memory (mqtt_transport.InMemoryClient): publish()
+#            chama o on_message dos serviços direto, sem cópia do payload
+# Mostra a vazão, o tempo por mensagem dentro de cada _on_mqtt_message e, no
+# transporte em memória, a alocação por mensagem (tracemalloc e coletas do gc).
+#
+# Uso: python bench_transport.py [--sensors 500] [--messages 50000] [--alloc-messages 5000]
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(LOADTEST_DIR, '..')
+for directory in ('common', 'alerting', 'exporter'):
+    sys.path.append(os.path.join(BACKEND_DIR, directory))
+
+from fleet import FleetProfile, FleetSimulator, fleet_ids
+
+
+def _payloads(sensors: int, count: int, seed: int, prefix: str) -> list:
+    """(tópico, payload) das primeiras `count` mensagens da frota, já codificados"""
+    fleet = FleetSimulator(sensors, seed=seed, profile=FleetProfile(), prefix=prefix)
+    messages = []
+    for _, topic, fields in fleet.events():
+        fields['timestamp'] = datetime.now().isoformat()
+        messages.append((topic, json.dumps(fields, separators=(',', ':')).encode()))
+        if len(messages) == count:
+            return messages
+    return messages
+
+
+class _Timed:
+    """Envolve _on_mqtt_message: conta mensagens e soma o tempo no callback"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, client, userdata, msg):
+        started = time.perf_counter()
+        self.handler(client, userdata, msg)
+        self.seconds += time.perf_counter() - started
+        self.count += 1
+
+
+def _start_services(transport: str, host: str, port: int):
+    import config
+    import mqtt_exporter
+    from main import ClusterMonitoringSystem
+
+    config.MQTT_CONFIG.update({'transport': transport, 'broker': host, 'port': port})
+    mqtt_exporter.MQTT_TRANSPORT = transport
+    mqtt_exporter.MQTT_BROKER, mqtt_exporter.MQTT_PORT = host, port
+
+    services = {'alerting': ClusterMonitoringSystem(), 'exporter': mqtt_exporter.MQTTExporter()}
+    timers = {}
+    for name, service in services.items():
+        timers[name] = service._on_mqtt_message = _Timed(service._on_mqtt_message)
+        service.setup_mqtt()
+        service.connect_mqtt()
+    deadline = time.time() + 10
+    while not all(s.mqtt_client.is_connected() for s in services.values()) and time.time() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.3 if transport == 'paho' else 0)  # SUBACK
+    return services, timers
+
+
+def _stop_services(services: dict):
+    for service in services.values():
+        service.mqtt_client.loop_stop()
+        service.mqtt_client.disconnect()
+    services['alerting'].alert_manager.shutdown()
+    services['exporter'].sensor_registry.stop()
+
+
+def _run(transport: str, messages: list, host: str = '127.0.0.1', port: int = 0):
+    """Publica as mensagens e espera os dois serviços processarem todas"""
+    from mqtt_transport import create_client
+
+    services, timers = _start_services(transport, host, port)
+    publisher = create_client(transport, client_id=f'bench-{transport}')
+    publisher.connect(host, port, 60)
+    publisher.loop_start()
+
+    started = time.perf_counter()
+    for topic, payload in messages:
+        publisher.publish(topic, payload)
+    deadline = time.time() + 120
+    while min(t.count for t in timers.values()) < len(messages) and time.time() < deadline:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - started
+
+    publisher.loop_stop()
+    publisher.disconnect()
+    return services, timers, elapsed
+
+
+def _report(label: str, messages: int, timers: dict, elapsed: float) -> float:
+    rate = messages / elapsed
+    per_service = ', '.join(f"{name} {timer.seconds / max(timer.count, 1) * 1e6:.0f} µs/msg"
+                            for name, timer in timers.items())
+    print(f"{label} {rate:9.0f} msg/s ({per_service})")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline por transporte MQTT')
+    parser.add_argument('--sensors', type=int, default=500, help='Sensores simulados (padrão: 500)')
+    parser.add_argument('--messages', type=int, default=50000, help='Mensagens por transporte (padrão: 50000)')
+    parser.add_argument('--alloc-messages', type=int, default=5000,
+                        help='Mensagens medidas com tracemalloc (padrão: 5000)')
+    parser.add_argument('--seed', type=int, default=42, help='Semente da frota (padrão: 42)')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    limit = 2 * args.sensors + 16
+    os.environ.update({
+        'ALERTS_DB_PATH': os.path.join(tmp.name, 'alerts.db'),
+        'SENSOR_REGISTRY_PATH': os.path.join(tmp.name, 'sensors.db'),
+        'ALERT_STATE_ENABLED': 'false',
+        'EXPORTER_LABEL_LIMITS': f"esp_id={limit},location=64,topic={limit},alert_type=16"
+    })
+
+    import logging
+    logging.disable(logging.WARNING)
+    import config
+    from sensor_registry import SensorRegistry
+    from standin_broker import StandInBroker
+
+    config.ALERT_CONFIG['notification']['enable_email'] = False
+    # Cada transporte usa sua própria frota (mesma semente, prefixos diferentes)
+    SensorRegistry(os.environ['SENSOR_REGISTRY_PATH'],
+                   seed_sensors=fleet_ids(args.sensors, 'tcp') + fleet_ids(args.sensors, 'mem')).stop()
+    tcp_messages = _payloads(args.sensors, args.messages, args.seed, 'tcp')
+    mem_messages = _payloads(args.sensors, args.messages + args.alloc_messages, args.seed, 'mem')
+
+    print(f"=== Benchmark de transporte: {args.messages} mensagens de {args.sensors} sensores, "
+          f"alerting + exporter no mesmo processo ===")
+
+    broker = StandInBroker().start()
+    services, timers, elapsed = _run('paho', tcp_messages, port=broker.port)
+    before = _report("📉 Antes  (paho + TCP):", args.messages, timers, elapsed)
+    _stop_services(services)
+    broker.stop()
+
+    services, timers, elapsed = _run('memory', mem_messages[:args.messages])
+    after = _report("📈 Depois (memória):   ", args.messages, timers, elapsed)
+    print(f"🚀 Ganho: {after / before:.1f}x")
+
+    # Alocação por mensagem no transporte em memória (serviços já aquecidos)
+    from mqtt_transport import get_broker
+    extra = mem_messages[args.messages:]
+    if extra:
+        broker = get_broker()
+        gc.collect()
+        collections = gc.get_stats()[0]['collections']
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        for topic, payload in extra:
+            broker.publish(topic, payload)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        collections = gc.get_stats()[0]['collections'] - collections
+        print(f"🧮 Alocação (memória, {len(extra)} msgs): {(current - baseline) / len(extra):.0f} bytes retidos/msg, "
+              f"pico +{(peak - baseline) / 1024:.0f} KiB, {collections * 1000 / len(extra):.1f} coletas gen0/1000 msgs")
+    _stop_services(services)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# ============================================================================
+# SIMULADOR DETERMINÍSTICO DE UMA FROTA DE ESP32
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Gera a sequência de mensagens que N nós publicariam em legion32/<id>, no
+# formato JSON do firmware (src/main.cpp):
+#
+#   {"esp_id": ..., "temperature": ..., "humidity": ..., "timestamp": ...,
+#    "uptime": ..., "alert"?: "high_temperature" | "humidity_out_of_range"}
+#
+# Cada nó tem temperatura/umidade base próprias, deriva lenta (passeio
+# aleatório com retorno à média), picos de temperatura de alguns segundos,
+# quedas (fica sem publicar por um tempo) e, ao voltar, a rajada das leituras
+# que ficaram na fila mais um status "online" em legion32/status. Reinícios
+# zeram o uptime.
+#
+# Tudo vem de random.Random(seed) em tempo virtual (segundos desde o início):
+# a mesma semente gera as mesmas mensagens na mesma ordem, independente da
+# velocidade de publicação. Com shard/shards a frota é dividida entre vários
+# processos publicadores (nó i fica na fatia i % shards), cada um com seu
+# gerador: a sequência depende de (seed, shards).
+#
+# O 'timestamp' do payload é preenchido por quem publica (horário de parede
+# do envio), e serve para medir o atraso de ponta a ponta nos serviços
+# (ingest_lag_seconds).
+
+import heapq
+import random
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+SENSOR_TOPIC_PREFIX = 'legion32/'
+STATUS_TOPIC = 'legion32/status'
+
+# Mesmos limites do firmware (config.h)
+TEMP_ALERT_THRESHOLD = 27.0
+HUMIDITY_MIN_THRESHOLD = 30.0
+HUMIDITY_MAX_THRESHOLD = 80.0
+
+
+@dataclass
+class FleetProfile:
+    """Parâmetros do comportamento da frota"""
+    interval: float = 2.0               # Segundos entre leituras de um nó (SENSOR_READ_INTERVAL)
+    drift: float = 0.05                 # Desvio do passeio aleatório por leitura (°C)
+    reversion: float = 0.02             # Força de retorno à temperatura base
+    spike_probability: float = 0.001    # Chance de um pico começar em cada leitura
+    spike_celsius: Tuple[float, float] = (6.0, 15.0)
+    spike_readings: Tuple[int, int] = (3, 15)
+    dropout_probability: float = 0.0005  # Chance de o nó cair em cada leitura
+    dropout_seconds: Tuple[float, float] = (10.0, 120.0)
+    burst_max: int = 60                 # Leituras guardadas na fila durante a queda
+    reboot_probability: float = 0.2     # Chance de a queda ser um reinício (uptime zera)
+
+
+def fleet_ids(sensors: int, prefix: str = 'sim') -> List[str]:
+    """IDs da frota inteira (sim000, sim001, ...)"""
+    width = len(str(max(sensors - 1, 0)))
+    return [f"{prefix}{i:0{width}d}" for i in range(sensors)]
+
+
+class SensorNode:
+    """Estado de um nó simulado"""
+
+    __slots__ = ('esp_id', 'topic', 'base_temperature', 'base_humidity', 'temperature',
+                 'humidity', 'boot_time', 'spike', 'spike_left', 'offline_until', 'rebooting', 'queued')
+
+    def __init__(self, esp_id: str, rng: random.Random):
+        self.esp_id = esp_id
+        self.topic = SENSOR_TOPIC_PREFIX + esp_id
+        self.base_temperature = rng.gauss(23.5, 1.5)
+        self.base_humidity = rng.gauss(50.0, 6.0)
+        self.temperature = self.base_temperature
+        self.humidity = self.base_humidity
+        self.boot_time = -rng.uniform(0, 86400)  # Ligado há até um dia
+        self.spike = 0.0
+        self.spike_left = 0
+        self.offline_until = None
+        self.rebooting = False
+        self.queued = []
+
+
+class FleetSimulator:
+    """
+    Sequência determinística de mensagens da frota.
+
+    events() produz (tempo virtual, tópico, campos) em ordem de tempo; os
+    campos já são o payload do firmware sem o 'timestamp'.
+    """
+
+    def __init__(self, sensors: int, seed: int = 42, profile: FleetProfile = None,
+                 prefix: str = 'sim', shard: int = 0, shards: int = 1):
+        self.profile = profile or FleetProfile()
+        # Cada fatia (processo publicador) tem gerador próprio derivado da semente
+        self.rng = random.Random(seed if shards == 1 else f"{seed}/{shard}/{shards}")
+        self.nodes = [SensorNode(esp_id, self.rng) for esp_id in fleet_ids(sensors, prefix)[shard::shards]]
+        # Fases espalhadas dentro do intervalo: os nós não publicam juntos
+        self._schedule = [(self.rng.uniform(0, self.profile.interval), i) for i in range(len(self.nodes))]
+        heapq.heapify(self._schedule)
+        self.stats = {'readings': 0, 'spikes': 0, 'dropouts': 0, 'reboots': 0, 'burst_messages': 0}
+
+    @property
+    def esp_ids(self) -> List[str]:
+        return [node.esp_id for node in self.nodes]
+
+    def _reading(self, node: SensorNode, now: float) -> dict:
+        """Próxima leitura do nó (deriva + pico)"""
+        profile = self.profile
+        rng = self.rng
+        node.temperature += (rng.gauss(0, profile.drift) +
+                             profile.reversion * (node.base_temperature - node.temperature))
+        node.humidity += (rng.gauss(0, profile.drift * 4) +
+                          profile.reversion * (node.base_humidity - node.humidity))
+
+        if node.spike_left:
+            node.spike_left -= 1
+            if not node.spike_left:
+                node.spike = 0.0
+        elif rng.random() < profile.spike_probability:
+            node.spike = rng.uniform(*profile.spike_celsius)
+            node.spike_left = rng.randint(*profile.spike_readings)
+            self.stats['spikes'] += 1
+
+        temperature = round(node.temperature + node.spike, 2)
+        humidity = round(min(max(node.humidity, 0.0), 100.0), 2)
+        fields = {
+            'esp_id': node.esp_id,
+            'temperature': temperature,
+            'humidity': humidity,
+            'uptime': int((now - node.boot_time) * 1000) & 0xFFFFFFFF
+        }
+        if temperature > TEMP_ALERT_THRESHOLD:
+            fields['alert'] = 'high_temperature'
+        elif humidity < HUMIDITY_MIN_THRESHOLD or humidity > HUMIDITY_MAX_THRESHOLD:
+            fields['alert'] = 'humidity_out_of_range'
+        self.stats['readings'] += 1
+        return fields
+
+    def _step(self, node: SensorNode, now: float) -> List[Tuple[str, dict]]:
+        """Mensagens que o nó publica no instante now"""
+        profile = self.profile
+        rng = self.rng
+
+        if node.offline_until is not None:
+            if now < node.offline_until:
+                # Fora do ar: a leitura vai para a fila (limitada); reiniciando, não há leitura
+                if not node.rebooting and len(node.queued) < profile.burst_max:
+                    node.queued.append(self._reading(node, now))
+                return []
+            # Voltou: status online + rajada das leituras guardadas
+            node.offline_until = None
+            if node.rebooting:
+                node.rebooting = False
+                node.boot_time = now
+            messages = [(STATUS_TOPIC, {'esp_id': node.esp_id, 'status': 'online',
+                                        'uptime': int((now - node.boot_time) * 1000) & 0xFFFFFFFF})]
+            messages.extend((node.topic, fields) for fields in node.queued)
+            self.stats['burst_messages'] += len(node.queued)
+            node.queued = []
+            messages.append((node.topic, self._reading(node, now)))
+            return messages
+
+        if rng.random() < profile.dropout_probability:
+            node.offline_until = now + rng.uniform(*profile.dropout_seconds)
+            self.stats['dropouts'] += 1
+            if rng.random() < profile.reboot_probability:
+                # Reinício: nada vai para a fila e o uptime recomeça na volta
+                node.rebooting = True
+                self.stats['reboots'] += 1
+            return []
+
+        return [(node.topic, self._reading(node, now))]
+
+    def events(self, duration: Optional[float] = None) -> Iterator[Tuple[float, str, dict]]:
+        """(tempo virtual, tópico, campos) até duration segundos (ou sem fim)"""
+        schedule = self._schedule
+        interval = self.profile.interval
+        while schedule:
+            now, index = schedule[0]
+            if duration is not None and now >= duration:
+                return
+            heapq.heapreplace(schedule, (now + interval, index))
+            for topic, fields in self._step(self.nodes[index], now):
+                yield now, topic, fields
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# ============================================================================
+# GERADOR DE CARGA DO PIPELINE MQTT
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Publica a frota simulada (fleet.py) em um broker MQTT e mede o atraso de
+# ponta a ponta (envio -> fim do callback de mensagem) no sistema de alertas
+# (ClusterMonitoringSystem) e no exportador (MQTTExporter).
+#
+# Cada parte roda em um processo próprio, como nos contêineres de produção, e
+# nenhuma disputa o GIL da outra:
+#
+#   broker       StandInBroker (standin_broker.py) ou um Mosquitto via --broker
+#   serviços     um processo por alvo (--targets), com banco, registro e estado
+#                em um diretório temporário e e-mail desligado
+#   publicadores --workers processos, cada um com uma fatia da frota
+#
+# O 'timestamp' de cada payload é o horário do envio; o processo do serviço
+# envolve _on_mqtt_message e, quando o callback termina, guarda a diferença.
+# No fim, espera os serviços esvaziarem a fila e mostra vazão e percentis.
+#
+# Uso:
+#   python loadgen.py --sensors 2000 --duration 30
+#   python loadgen.py --sensors 20000 --interval 1 --workers 4 --duration 60
+#   python loadgen.py --sensors 5000 --rate 10000 --broker localhost:1883
+#   python loadgen.py --sensors 500 --targets none --broker mosquitto:1883
+#
+# Com --targets none só publica: serve para carregar uma instalação real, cujo
+# atraso aparece no histograma ingest_lag_seconds de /metrics.
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from array import array
+from datetime import datetime
+
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(LOADTEST_DIR, '..')
+sys.path.append(os.path.join(BACKEND_DIR, 'common'))
+
+from fleet import FleetProfile, FleetSimulator, fleet_ids
+
+TARGETS = ('alerting', 'exporter')
+TIMESTAMP_MARKER = b'"timestamp":"'
+PERCENTILES = (50, 90, 99, 99.9)
+DONE_TOPIC = 'loadtest/done'
+
+# ============================================================================
+# PROCESSOS
+# ============================================================================
+
+def _recording(handler, latencies: array, received):
+    """Envolve o callback de mensagem: atraso envio -> fim do processamento"""
+    marker_length = len(TIMESTAMP_MARKER)
+
+    def on_message(client, userdata, msg):
+        handler(client, userdata, msg)
+        done = time.time()
+        payload = msg.payload
+        start = payload.find(TIMESTAMP_MARKER)
+        if start < 0:
+            return  # Não veio do gerador (ex.: alertas republicados pelo serviço)
+        start += marker_length
+        try:
+            sent = datetime.fromisoformat(payload[start:payload.index(b'"', start)].decode()).timestamp()
+        except ValueError:
+            return
+        latencies.append(done - sent)
+        received.value += 1
+
+    return on_message
+
+
+def _service_worker(target: str, env: dict, verbose: bool, ready, stop, received, results):
+    """Roda um serviço até `stop` e devolve os atrasos medidos"""
+    import logging
+
+    os.environ.update(env)
+    if not verbose:
+        logging.disable(logging.WARNING)
+    if target == 'alerting':
+        sys.path.insert(0, os.path.join(BACKEND_DIR, 'alerting'))
+        import config
+        config.ALERT_CONFIG['notification']['enable_email'] = False
+        from main import ClusterMonitoringSystem
+        service = ClusterMonitoringSystem()
+    else:
+        sys.path.insert(0, os.path.join(BACKEND_DIR, 'exporter'))
+        from mqtt_exporter import MQTTExporter
+        service = MQTTExporter()
+
+    latencies = array('d')
+    service._on_mqtt_message = _recording(service._on_mqtt_message, latencies, received)
+    subscribe = service._on_mqtt_connect
+
+    def on_connect(client, userdata, flags, rc):
+        subscribe(client, userdata, flags, rc)
+        ready.set()
+
+    service._on_mqtt_connect = on_connect
+    service.setup_mqtt()
+    service.connect_mqtt()
+    if target == 'alerting':
+        service.start_health_check_loop()
+
+    stop.wait()
+    service.running = False
+    service.mqtt_client.loop_stop()
+    service.mqtt_client.disconnect()
+    extra = {}
+    if target == 'alerting':
+        extra['alerts_generated'] = service.stats['alerts_generated']
+        service.alert_manager.shutdown()
+    else:
+        service.sensor_registry.stop()
+    results.put((target, latencies.tobytes(), extra))
+
+
+def _broker_worker(host: str, port, ready, stop, results):
+    """StandInBroker em processo próprio"""
+    from standin_broker import StandInBroker
+
+    broker = StandInBroker(host, port.value).start()
+    port.value = broker.port
+    ready.set()
+    stop.wait()
+    results.put(('broker', dict(broker.stats)))
+    broker.stop()
+
+
+def _publisher_worker(shard: int, options: dict, host: str, port: int, start_at: float, results):
+    """Publica a fatia `shard` da frota no ritmo do tempo virtual"""
+    import paho.mqtt.client as mqtt
+
+    fleet = FleetSimulator(options['sensors'], seed=options['seed'], profile=FleetProfile(**options['profile']),
+                           shard=shard, shards=options['workers'])
+    client = mqtt.Client(client_id=f"loadgen-{shard}-{os.getpid()}")
+    client.connect(host, port, 60)
+    client.loop_start()
+
+    separators = (',', ':')
+    sent = 0
+    max_behind = 0.0
+    sleep_threshold = 0.002
+    time.sleep(max(0.0, start_at - time.time()))
+    for virtual_time, topic, fields in fleet.events(options['duration']):
+        now = time.time()
+        ahead = start_at + virtual_time - now
+        if ahead > sleep_threshold:
+            time.sleep(ahead)
+            now = time.time()
+        elif -ahead > max_behind:
+            max_behind = -ahead
+        fields['timestamp'] = datetime.fromtimestamp(now).isoformat(timespec='microseconds')
+        client.publish(topic, json.dumps(fields, separators=separators))
+        sent += 1
+
+    # QoS 1 no fim: o PUBACK garante que a fila de saída do paho foi escrita
+    client.publish(DONE_TOPIC, b'', qos=1).wait_for_publish()
+    elapsed = time.time() - start_at
+    client.loop_stop()
+    client.disconnect()
+    results.put(('publisher', shard, sent, elapsed, max_behind, fleet.stats))
+
+# ============================================================================
+# RELATÓRIO
+# ============================================================================
+
+def percentile(ordered: list, p: float) -> float:
+    """Percentil por posição (nearest-rank) de uma lista ordenada"""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _report_target(target: str, latencies: array, sent: int, duration: float, extra: dict):
+    ordered = sorted(latencies)
+    received = len(ordered)
+    lost = sent - received
+    print(f"🎯 {target}: {received} recebidas ({received / duration:.0f} msg/s), "
+          f"{lost} perdidas ou pendentes ({lost / sent * 100 if sent else 0:.2f}%)")
+    if ordered:
+        parts = ', '.join(f"p{p:g} {percentile(ordered, p) * 1000:.1f}" for p in PERCENTILES)
+        print(f"   ⏱️  atraso (ms): {parts}, máx {ordered[-1] * 1000:.1f}")
+    for key, value in extra.items():
+        print(f"   {key}: {value}")
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Gerador de carga do pipeline MQTT')
+    parser.add_argument('--sensors', type=int, default=1000, help='Nós ESP32 simulados (padrão: 1000)')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='Segundos entre leituras de um nó (padrão: 2.0, o do firmware)')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Vazão total em msg/s (substitui --interval: interval = sensors / rate)')
+    parser.add_argument('--duration', type=float, default=30.0, help='Segundos de carga (padrão: 30)')
+    parser.add_argument('--seed', type=int, default=42, help='Semente da frota (padrão: 42)')
+    parser.add_argument('--workers', type=int, default=1, help='Processos publicadores (padrão: 1)')
+    parser.add_argument('--broker', default=None,
+                        help='host:porta de um broker existente (padrão: StandInBroker local)')
+    parser.add_argument('--targets', default='alerting,exporter',
+                        help="Serviços medidos: alerting, exporter ou none (padrão: alerting,exporter)")
+    parser.add_argument('--spike-probability', type=float, default=FleetProfile.spike_probability,
+                        help='Chance de pico de temperatura por leitura')
+    parser.add_argument('--dropout-probability', type=float, default=FleetProfile.dropout_probability,
+                        help='Chance de queda do nó por leitura')
+    parser.add_argument('--drain-timeout', type=float, default=30.0,
+                        help='Espera máxima sem progresso para os serviços esvaziarem (padrão: 30)')
+    parser.add_argument('--verbose', action='store_true', help='Mantém os logs INFO e WARNING dos serviços')
+    args = parser.parse_args()
+
+    targets = [t for t in args.targets.split(',') if t and t != 'none']
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"alvos desconhecidos: {', '.join(unknown)}")
+    args.targets = targets
+    if args.rate:
+        args.interval = args.sensors / args.rate
+    args.workers = max(1, min(args.workers, args.sensors))
+    return args
+
+
+def _service_env(args, workdir: str, host: str, port: int) -> dict:
+    """Variáveis de ambiente dos serviços: tudo em workdir, apontando para o broker"""
+    limit = args.sensors + 16
+    return {
+        'MQTT_BROKER': host,
+        'MQTT_PORT': str(port),
+        'ALERTS_DB_PATH': os.path.join(workdir, 'alerts.db'),
+        'ALERT_STATE_DIR': os.path.join(workdir, 'state'),
+        'SENSOR_REGISTRY_PATH': os.path.join(workdir, 'sensors.db'),
+        'EXPORTER_LABEL_LIMITS': f"esp_id={limit},location=64,topic={limit},alert_type=16"
+    }
+
+
+def main():
+    args = parse_args()
+    context = multiprocessing.get_context('spawn')
+    workdir = tempfile.TemporaryDirectory(prefix='loadgen-')
+    results = context.Queue()
+    stop = context.Event()
+    processes = []
+
+    print(f"=== Carga: {args.sensors} sensores a cada {args.interval:.3g}s "
+          f"(~{args.sensors / args.interval:.0f} msg/s) por {args.duration:.0f}s, "
+          f"{args.workers} publicador(es), semente {args.seed} ===")
+
+    # Broker
+    if args.broker:
+        host, _, port = args.broker.partition(':')
+        port = int(port or 1883)
+    else:
+        host = '127.0.0.1'
+        port_value = context.Value('i', 0)
+        ready = context.Event()
+        broker = context.Process(target=_broker_worker, args=(host, port_value, ready, stop, results),
+                                 name='loadgen-broker')
+        broker.start()
+        processes.append(broker)
+        if not ready.wait(timeout=10):
+            print("❌ StandInBroker não iniciou")
+            return 1
+        port = port_value.value
+    print(f"📡 Broker: {host}:{port}{'' if args.broker else ' (StandInBroker)'}")
+
+    # Frota cadastrada de uma vez no registro compartilhado pelos serviços
+    env = _service_env(args, workdir.name, host, port)
+    if args.targets:
+        from sensor_registry import SensorRegistry
+        SensorRegistry(env['SENSOR_REGISTRY_PATH'], seed_sensors=fleet_ids(args.sensors)).stop()
+
+    # Serviços
+    received = {}
+    for target in args.targets:
+        ready = context.Event()
+        received[target] = context.Value('q', 0, lock=False)
+        service = context.Process(target=_service_worker, name=f"loadgen-{target}",
+                                  args=(target, env, args.verbose, ready, stop, received[target], results))
+        service.start()
+        processes.append(service)
+        if not ready.wait(timeout=30):
+            print(f"❌ {target} não conectou ao broker")
+            stop.set()
+            return 1
+    time.sleep(0.2)  # SUBACK dos serviços antes da primeira publicação
+
+    # Publicadores
+    options = {
+        'sensors': args.sensors,
+        'seed': args.seed,
+        'duration': args.duration,
+        'workers': args.workers,
+        'profile': {
+            'interval': args.interval,
+            'spike_probability': args.spike_probability,
+            'dropout_probability': args.dropout_probability
+        }
+    }
+    start_at = time.time() + 1.0 + 0.2 * args.workers
+    publishers = [context.Process(target=_publisher_worker, name=f"loadgen-publisher-{shard}",
+                                  args=(shard, options, host, port, start_at, results))
+                  for shard in range(args.workers)]
+    for publisher in publishers:
+        publisher.start()
+
+    sent, elapsed, behind = 0, 0.0, 0.0
+    fleet_stats = {}
+    for _ in publishers:
+        _, _, shard_sent, shard_elapsed, shard_behind, shard_stats = results.get()
+        sent += shard_sent
+        elapsed = max(elapsed, shard_elapsed)
+        behind = max(behind, shard_behind)
+        for key, value in shard_stats.items():
+            fleet_stats[key] = fleet_stats.get(key, 0) + value
+    for publisher in publishers:
+        publisher.join()
+    print(f"📤 Publicadas: {sent} em {elapsed:.1f}s ({sent / elapsed:.0f} msg/s; "
+          f"pedido ~{args.sensors / args.interval:.0f} msg/s), atraso máximo do cronograma "
+          f"{behind * 1000:.0f} ms")
+    print(f"🌡️  Frota: {fleet_stats.get('spikes', 0)} picos, {fleet_stats.get('dropouts', 0)} quedas "
+          f"({fleet_stats.get('reboots', 0)} reinícios), {fleet_stats.get('burst_messages', 0)} "
+          f"leituras em rajada")
+
+    # Espera os serviços processarem o que já está no broker/socket
+    last_progress, last_counts = time.time(), None
+    while received:
+        counts = [value.value for value in received.values()]
+        if min(counts) >= sent:
+            break
+        if counts != last_counts:
+            last_progress, last_counts = time.time(), counts
+        elif time.time() - last_progress > args.drain_timeout:
+            break
+        time.sleep(0.1)
+    drained = time.time() - start_at
+
+    stop.set()
+    collected = {}
+    for _ in processes:
+        item = results.get(timeout=60)
+        collected[item[0]] = item[1:]
+    for process in processes:
+        process.join(timeout=30)
+
+    if 'broker' in collected:
+        stats = collected['broker'][0]
+        print(f"📡 StandInBroker: {stats['published']} recebidas, {stats['delivered']} entregues")
+    for target in args.targets:
+        raw, extra = collected[target]
+        latencies = array('d')
+        latencies.frombytes(raw)
+        _report_target(target, latencies, sent, drained, extra)
+    workdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
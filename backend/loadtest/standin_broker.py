@@ -0,0 +1,228 @@
+# ============================================================================
+# BROKER MQTT EM PROCESSO (SUBSTITUTO DO MOSQUITTO PARA TESTES DE CARGA)
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Subconjunto do MQTT 3.1.1 suficiente para o paho dos serviços e do gerador:
+# CONNECT, SUBSCRIBE/UNSUBSCRIBE (curingas + e #), PUBLISH QoS 0 e 1 (PUBACK
+# para quem publica; entrega aos assinantes sempre em QoS 0), PINGREQ e
+# DISCONNECT. Sem sessão persistente, retain, will ou autenticação.
+#
+# Roda em um event loop próprio numa thread daemon, em TCP local:
+#
+#   broker = StandInBroker(port=0).start()      # porta livre
+#   client.connect('127.0.0.1', broker.port)
+#   ...
+#   broker.stop()
+#
+# Se algum assinante não der conta (buffer de escrita acima da marca alta),
+# a leitura de quem publica é pausada até o buffer esvaziar: a fila fica no
+# socket do publicador, como num broker real, em vez de crescer na memória.
+
+import asyncio
+import os
+import struct
+import sys
+import threading
+from typing import Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from mqtt_transport import topic_matches
+
+CONNECT, CONNACK, PUBLISH, PUBACK = 1, 2, 3, 4
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK = 8, 9, 10, 11
+PINGREQ, PINGRESP, DISCONNECT = 12, 13, 14
+
+WRITE_HIGH_WATER = 4 * 1024 * 1024
+
+
+def _encode_length(length: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        encoded.append(byte | (0x80 if length else 0))
+        if not length:
+            return bytes(encoded)
+
+
+class _Session(asyncio.Protocol):
+    """Uma conexão de cliente"""
+
+    def __init__(self, broker: 'StandInBroker'):
+        self.broker = broker
+        self.transport = None
+        self.buffer = bytearray()
+        self.filters = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+
+    def connection_lost(self, exc):
+        self.broker._drop(self)
+
+    # Contrapressão: assinante lento pausa quem publica
+    def pause_writing(self):
+        self.broker._pause_publishers(self)
+
+    def resume_writing(self):
+        self.broker._resume_publishers(self)
+
+    def data_received(self, data: bytes):
+        buffer = self.buffer
+        buffer += data
+        offset = 0
+        size = len(buffer)
+        while size - offset >= 2:
+            # Cabeçalho fixo: tipo/flags + tamanho restante (1 a 4 bytes)
+            length, multiplier, cursor, complete = 0, 1, offset + 1, False
+            while cursor < size and cursor - offset <= 4:
+                byte = buffer[cursor]
+                cursor += 1
+                length += (byte & 0x7F) * multiplier
+                multiplier *= 128
+                if not byte & 0x80:
+                    complete = True
+                    break
+            end = cursor + length
+            if not complete or end > size:
+                break
+            self._handle(buffer[offset], buffer[cursor:end])
+            offset = end
+        if offset:
+            del buffer[:offset]
+
+    def _handle(self, header: int, body: bytearray):
+        kind = header >> 4
+        if kind == PUBLISH:
+            (topic_length,) = struct.unpack_from('!H', body)
+            topic = bytes(body[2:2 + topic_length]).decode('utf-8')
+            qos = (header >> 1) & 0x03
+            payload_start = 2 + topic_length + (2 if qos else 0)
+            self.broker._route(topic, bytes(body[:2 + topic_length]), bytes(body[payload_start:]))
+            if qos == 1:
+                self.transport.write(bytes((PUBACK << 4, 2)) + bytes(body[2 + topic_length:payload_start]))
+        elif kind == CONNECT:
+            self.transport.write(bytes((CONNACK << 4, 2, 0, 0)))
+        elif kind == SUBSCRIBE:
+            packet_id = bytes(body[:2])
+            granted, offset = [], 2
+            while offset < len(body):
+                (length,) = struct.unpack_from('!H', body, offset)
+                self.filters.append(bytes(body[offset + 2:offset + 2 + length]).decode('utf-8'))
+                granted.append(0)
+                offset += 3 + length
+            self.broker._subscriptions_changed()
+            self.transport.write(bytes((SUBACK << 4,)) + _encode_length(2 + len(granted)) +
+                                 packet_id + bytes(granted))
+        elif kind == UNSUBSCRIBE:
+            packet_id = bytes(body[:2])
+            offset = 2
+            while offset < len(body):
+                (length,) = struct.unpack_from('!H', body, offset)
+                topic_filter = bytes(body[offset + 2:offset + 2 + length]).decode('utf-8')
+                if topic_filter in self.filters:
+                    self.filters.remove(topic_filter)
+                offset += 2 + length
+            self.broker._subscriptions_changed()
+            self.transport.write(bytes((UNSUBACK << 4, 2)) + packet_id)
+        elif kind == PINGREQ:
+            self.transport.write(bytes((PINGRESP << 4, 0)))
+        elif kind == DISCONNECT:
+            self.transport.close()
+
+
+class StandInBroker:
+    """Broker MQTT mínimo em uma thread própria"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self.loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._sessions = set()
+        self._routes: Dict[str, List[_Session]] = {}
+        self._slow = set()
+        self._paused = set()
+        self.stats = {'published': 0, 'delivered': 0}
+
+    def start(self) -> 'StandInBroker':
+        self._thread = threading.Thread(target=self._run, name='standin-broker', daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        return self
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._server = self.loop.run_until_complete(
+            self.loop.create_server(lambda: self._session(), self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self.loop.run_forever()
+        self._server.close()
+        self.loop.run_until_complete(self._server.wait_closed())
+        self.loop.close()
+
+    def _session(self) -> _Session:
+        session = _Session(self)
+        self._sessions.add(session)
+        return session
+
+    def stop(self):
+        if self.loop is not None and self.loop.is_running():
+            def close_all():
+                for session in list(self._sessions):
+                    session.transport.close()
+                self.loop.stop()
+            self.loop.call_soon_threadsafe(close_all)
+            self._thread.join(timeout=5)
+
+    # ------------------------------------------------------------------------
+    # ROTEAMENTO (só no loop do broker)
+    # ------------------------------------------------------------------------
+
+    def _subscriptions_changed(self):
+        self._routes.clear()
+
+    def _route(self, topic: str, topic_header: bytes, payload: bytes):
+        subscribers = self._routes.get(topic)
+        if subscribers is None:
+            subscribers = self._routes[topic] = [
+                session for session in self._sessions
+                if any(topic_matches(topic_filter, topic) for topic_filter in session.filters)
+            ]
+        self.stats['published'] += 1
+        if not subscribers:
+            return
+        body_length = len(topic_header) + len(payload)
+        packet = bytes((PUBLISH << 4,)) + _encode_length(body_length) + topic_header + payload
+        for session in subscribers:
+            session.transport.write(packet)
+        self.stats['delivered'] += len(subscribers)
+
+    def _drop(self, session: _Session):
+        self._sessions.discard(session)
+        self._paused.discard(session)
+        self._routes.clear()
+        self._resume_publishers(session)
+
+    def _pause_publishers(self, slow: _Session):
+        self._slow.add(slow)
+        for session in self._sessions:
+            if session not in self._paused and not session.filters:
+                session.transport.pause_reading()
+                self._paused.add(session)
+
+    def _resume_publishers(self, slow: _Session):
+        self._slow.discard(slow)
+        if self._slow:
+            return
+        for session in self._paused:
+            if not session.transport.is_closing():
+                session.transport.resume_reading()
+        self._paused.clear()
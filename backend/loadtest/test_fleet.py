@@ -0,0 +1,52 @@
+# ============================================================================
+# TESTES DO SIMULADOR DA FROTA DE ESP32
+# Monitoramento Inteligente de Clusters - IF-UFG
+# ============================================================================
+#
+# Uso: cd backend/loadtest && python -m pytest -q
+
+from fleet import STATUS_TOPIC, FleetProfile, FleetSimulator, fleet_ids
+
+
+def test_fleet_ids_are_zero_padded():
+    assert fleet_ids(3) == ['sim0', 'sim1', 'sim2']
+    assert fleet_ids(11, prefix='n')[-2:] == ['n09', 'n10']
+
+
+def test_same_seed_same_messages():
+    def run(seed):
+        return list(FleetSimulator(20, seed=seed).events(60))
+
+    assert run(7) == run(7)
+    assert run(7) != run(8)
+
+
+def test_events_time_ordered_and_bounded_by_duration():
+    profile = FleetProfile(dropout_probability=0.0)
+    events = list(FleetSimulator(10, profile=profile).events(20))
+    times = [t for t, _, _ in events]
+    assert times == sorted(times) and times[-1] < 20
+    # Sem quedas: uma leitura por nó a cada intervalo
+    assert len(events) == 10 * 10
+
+
+def test_shards_split_fleet_without_overlap():
+    shards = [FleetSimulator(10, shard=i, shards=3).esp_ids for i in range(3)]
+    assert sorted(sum(shards, [])) == fleet_ids(10)
+    assert shards[1] == ['sim1', 'sim4', 'sim7']
+
+
+def test_dropout_returns_with_status_and_queued_burst():
+    profile = FleetProfile(dropout_probability=1.0, dropout_seconds=(5.0, 5.0), reboot_probability=0.0,
+                           spike_probability=0.0)
+    simulator = FleetSimulator(1, profile=profile)
+    topics = [topic for _, topic, _ in simulator.events(8)]
+    # Cai na 1ª leitura, guarda as 2 seguintes e volta com status + rajada + leitura atual
+    assert topics == [STATUS_TOPIC] + ['legion32/sim0'] * 3
+    assert simulator.stats['dropouts'] == 1 and simulator.stats['burst_messages'] == 2
+
+
+def test_spike_above_firmware_threshold_flags_alert():
+    profile = FleetProfile(spike_probability=1.0, spike_celsius=(20.0, 20.0), dropout_probability=0.0)
+    _, _, fields = next(FleetSimulator(1, profile=profile).events())
+    assert fields['temperature'] > 27.0 and fields['alert'] == 'high_temperature'
@@ -24,6 +24,24 @@
 #define MQTT_RECONNECT_DELAY 5000
 #define MQTT_MAX_RECONNECT_ATTEMPTS 10
 
+// Payload binário compacto (12 bytes) no lugar do JSON em legion32/<id>:
+// compile com -DPAYLOAD_FORMAT_BINARY. Layout em backend/common/payload_codec.py
+#define PAYLOAD_MAGIC 0xB1
+#define PAYLOAD_VERSION 1
+#define PAYLOAD_FLAG_HIGH_TEMPERATURE 0x01
+#define PAYLOAD_FLAG_HUMIDITY_OUT_OF_RANGE 0x02
+#define PAYLOAD_BINARY_SIZE 12
+
+// Publicação em lote: compile com -DPUBLISH_BATCH_SIZE=K para enviar K
+// leituras por mensagem, cada uma com o millis() da amostra. Leituras feitas
+// sem conexão ficam no buffer (até PUBLISH_BUFFER_CAPACITY, descartando as
+// mais antigas) e saem em lotes quando o MQTT volta.
+#define PAYLOAD_BATCH_MAGIC 0xB2
+#define PAYLOAD_BATCH_HEADER_SIZE 8
+#ifndef PUBLISH_BUFFER_CAPACITY
+#define PUBLISH_BUFFER_CAPACITY 64
+#endif
+
 // ============================================================================
 // CONFIGURAÇÕES DE LOGGING
 // ============================================================================
@@ -23,6 +23,13 @@ unsigned long lastPublishTime = 0;
 unsigned long lastWifiCheck = 0;
 unsigned long lastMqttCheck = 0;
 
+#ifdef PUBLISH_BATCH_SIZE
+// Buffer circular de leituras ainda não publicadas
+SensorData sampleBuffer[PUBLISH_BUFFER_CAPACITY];
+int sampleHead = 0;
+int sampleCount = 0;
+#endif
+
 // ============================================================================
 // CONFIGURAÇÕES ESPECÍFICAS DA ESP32 (definidas via build flags)
 // ============================================================================
@@ -212,6 +219,38 @@ bool publishSensorData(const SensorData& data) {
         return false;
     }
     
+#ifdef PAYLOAD_FORMAT_BINARY
+    // Layout fixo little-endian (o ESP32 é little-endian): sem JSON nem timestamp em texto
+    uint8_t payload[PAYLOAD_BINARY_SIZE];
+    int16_t temperature = (int16_t) lroundf(data.temperature * 100);
+    uint16_t humidity = (uint16_t) lroundf(data.humidity * 100);
+    uint32_t uptime = millis();
+    uint8_t flags = 0;
+    if (data.temperature > TEMP_ALERT_THRESHOLD) {
+        flags |= PAYLOAD_FLAG_HIGH_TEMPERATURE;
+    } else if (data.humidity < HUMIDITY_MIN_THRESHOLD || 
+               data.humidity > HUMIDITY_MAX_THRESHOLD) {
+        flags |= PAYLOAD_FLAG_HUMIDITY_OUT_OF_RANGE;
+    }
+    
+    payload[0] = PAYLOAD_MAGIC;
+    payload[1] = PAYLOAD_VERSION;
+    payload[2] = flags;
+    payload[3] = 0;
+    memcpy(&payload[4], &temperature, sizeof(temperature));
+    memcpy(&payload[6], &humidity, sizeof(humidity));
+    memcpy(&payload[8], &uptime, sizeof(uptime));
+    
+    CLUSTER_DEBUG_PRINTF("Publicando (binário): %.2f C, %.2f %%\n", data.temperature, data.humidity);
+    
+    if (mqttClient.publish(PUB_TOPIC, payload, sizeof(payload))) {
+        lastPublishTime = millis();
+        return true;
+    } else {
+        CLUSTER_DEBUG_PRINTLN("Falha na publicação MQTT");
+        return false;
+    }
+#else
     StaticJsonDocument<JSON_BUFFER_SIZE> doc;
     doc["esp_id"] = ESP_ID;
     doc["temperature"] = round(data.temperature * 100) / 100.0;
@@ -239,8 +278,110 @@ bool publishSensorData(const SensorData& data) {
         CLUSTER_DEBUG_PRINTLN("Falha na publicação MQTT");
         return false;
     }
+#endif
 }
 
+#ifdef PUBLISH_BATCH_SIZE
+/**
+ * @brief Guarda a leitura no buffer (sobrescreve a mais antiga se cheio)
+ */
+void bufferSample(const SensorData& data) {
+    if (sampleCount == PUBLISH_BUFFER_CAPACITY) {
+        sampleHead = (sampleHead + 1) % PUBLISH_BUFFER_CAPACITY;
+        sampleCount--;
+        CLUSTER_DEBUG_PRINTLN("Buffer de leituras cheio, descartando a mais antiga");
+    }
+    sampleBuffer[(sampleHead + sampleCount) % PUBLISH_BUFFER_CAPACITY] = data;
+    sampleCount++;
+}
+
+/**
+ * @brief Publica as count leituras mais antigas do buffer em uma mensagem
+ */
+bool publishSensorBatch(int count) {
+    uint32_t sentUptime = millis();
+    
+#ifdef PAYLOAD_FORMAT_BINARY
+    // Cabeçalho (mágico, versão, quantidade, reservado, millis do envio) + registros de 12 bytes
+    uint8_t payload[PAYLOAD_BATCH_HEADER_SIZE + PUBLISH_BATCH_SIZE * PAYLOAD_BINARY_SIZE];
+    payload[0] = PAYLOAD_BATCH_MAGIC;
+    payload[1] = PAYLOAD_VERSION;
+    payload[2] = (uint8_t) count;
+    payload[3] = 0;
+    memcpy(&payload[4], &sentUptime, sizeof(sentUptime));
+    
+    for (int i = 0; i < count; i++) {
+        const SensorData& data = sampleBuffer[(sampleHead + i) % PUBLISH_BUFFER_CAPACITY];
+        uint8_t* record = &payload[PAYLOAD_BATCH_HEADER_SIZE + i * PAYLOAD_BINARY_SIZE];
+        int16_t temperature = (int16_t) lroundf(data.temperature * 100);
+        uint16_t humidity = (uint16_t) lroundf(data.humidity * 100);
+        uint32_t uptime = data.timestamp;
+        uint8_t flags = 0;
+        if (data.temperature > TEMP_ALERT_THRESHOLD) {
+            flags |= PAYLOAD_FLAG_HIGH_TEMPERATURE;
+        } else if (data.humidity < HUMIDITY_MIN_THRESHOLD || 
+                   data.humidity > HUMIDITY_MAX_THRESHOLD) {
+            flags |= PAYLOAD_FLAG_HUMIDITY_OUT_OF_RANGE;
+        }
+        record[0] = PAYLOAD_MAGIC;
+        record[1] = PAYLOAD_VERSION;
+        record[2] = flags;
+        record[3] = 0;
+        memcpy(&record[4], &temperature, sizeof(temperature));
+        memcpy(&record[6], &humidity, sizeof(humidity));
+        memcpy(&record[8], &uptime, sizeof(uptime));
+    }
+    
+    bool published = mqttClient.publish(PUB_TOPIC, payload,
+                                        PAYLOAD_BATCH_HEADER_SIZE + count * PAYLOAD_BINARY_SIZE);
+#else
+    DynamicJsonDocument doc(256 + PUBLISH_BATCH_SIZE * 96);
+    doc["esp_id"] = ESP_ID;
+    doc["uptime"] = sentUptime;
+    JsonArray readings = doc.createNestedArray("readings");
+    
+    for (int i = 0; i < count; i++) {
+        const SensorData& data = sampleBuffer[(sampleHead + i) % PUBLISH_BUFFER_CAPACITY];
+        JsonObject reading = readings.createNestedObject();
+        reading["temperature"] = round(data.temperature * 100) / 100.0;
+        reading["humidity"] = round(data.humidity * 100) / 100.0;
+        reading["uptime"] = data.timestamp;
+        if (data.temperature > TEMP_ALERT_THRESHOLD) {
+            reading["alert"] = "high_temperature";
+        } else if (data.humidity < HUMIDITY_MIN_THRESHOLD || 
+                   data.humidity > HUMIDITY_MAX_THRESHOLD) {
+            reading["alert"] = "humidity_out_of_range";
+        }
+    }
+    
+    String payload;
+    serializeJson(doc, payload);
+    bool published = mqttClient.publish(PUB_TOPIC, payload.c_str());
+#endif
+    
+    if (published) {
+        CLUSTER_DEBUG_PRINTF("Lote publicado: %d leituras\n", count);
+        sampleHead = (sampleHead + count) % PUBLISH_BUFFER_CAPACITY;
+        sampleCount -= count;
+    } else {
+        CLUSTER_DEBUG_PRINTLN("Falha na publicação do lote MQTT");
+    }
+    return published;
+}
+
+/**
+ * @brief Publica lotes completos enquanto houver conexão (drena o atraso offline)
+ */
+void flushSampleBuffer() {
+    while (sampleCount >= PUBLISH_BATCH_SIZE && mqttClient.connected()) {
+        if (!publishSensorBatch(PUBLISH_BATCH_SIZE)) {
+            break;
+        }
+        mqttClient.loop();
+    }
+}
+#endif
+
 // ============================================================================
 // FUNÇÕES DE MONITORAMENTO
 // ============================================================================
@@ -303,6 +444,10 @@ void setup() {
     mqttClient.setServer(MQTT_SERVER, MQTT_PORT);
     mqttClient.setCallback(mqttCallback);
     mqttClient.setKeepAlive(MQTT_KEEPALIVE_CUSTOM);
+#ifdef PUBLISH_BATCH_SIZE
+    // Lotes passam do buffer padrão de 256 bytes do PubSubClient
+    mqttClient.setBufferSize(512 + PUBLISH_BATCH_SIZE * 96);
+#endif
     
     // Conecta ao Wi-Fi
     if (connectWiFi()) {
@@ -329,12 +474,20 @@ void loop() {
         SensorData currentData = readSensor();
         
         if (currentData.is_valid) {
+#ifdef PUBLISH_BATCH_SIZE
+            // Acumula (mesmo sem conexão) e publica quando completar um lote
+            bufferSample(currentData);
+            lastSensorData = currentData;
+            systemStatus.last_sensor_read = now;
+            flushSampleBuffer();
+#else
             // Publica dados
             if (publishSensorData(currentData)) {
                 // Atualiza último dado válido
                 lastSensorData = currentData;
                 systemStatus.last_sensor_read = now;
             }
+#endif
         } else {
             // Publica erro de sensor
             CLUSTER_DEBUG_PRINTLN("Publicando erro de sensor");
@@ -98,13 +98,9 @@ class PerformanceAnalyzer:
         try:
             conn = sqlite3.connect(self.database_path)
             
-            # Query para dados dos sensores (tentando sensor_readings primeiro, senão sensor_states)
-            query_readings = """
-            SELECT esp_id as sensor_id, temperature, humidity, timestamp 
-            FROM sensor_readings 
-            WHERE timestamp >= datetime('now', '-{} days')
-            ORDER BY timestamp ASC
-            """.format(days)
+            # Histórico bruto: partições diárias sensor_readings_AAAAMMDD
+            partitions = self._reading_partitions(conn, days)
+            cutoff = (datetime.now() - timedelta(days=days)).isoformat()
             
             query_states = """
             SELECT esp_id as sensor_id, temperature, humidity, last_seen as timestamp 
@@ -113,17 +109,20 @@ class PerformanceAnalyzer:
             ORDER BY last_seen ASC
             """.format(days)
             
-            # Tentar primeira query, se falhar usar sensor_states
-            try:
-                df = pd.read_sql_query(query_readings, conn)
-                if df.empty:
-                    # Se não há dados em sensor_readings, usar sensor_states
-                    df = pd.read_sql_query(query_states, conn)
-                    print("📊 Usando dados de sensor_states")
-                else:
-                    print("📊 Usando dados de sensor_readings")
-            except:
-                # Se tabela sensor_readings não existe, usar sensor_states
+            if partitions:
+                # Consulta só as partições do período, cada uma pelo índice (esp_id, timestamp)
+                query_readings = " UNION ALL ".join(
+                    "SELECT esp_id as sensor_id, temperature, humidity, timestamp "
+                    "FROM {} WHERE timestamp >= ?".format(table)
+                    for table in partitions
+                ) + " ORDER BY timestamp ASC"
+                df = pd.read_sql_query(query_readings, conn, params=[cutoff] * len(partitions))
+                print(f"📊 Usando dados de sensor_readings ({len(partitions)} partições)")
+            else:
+                df = pd.DataFrame()
+            
+            if df.empty:
+                # Sem histórico bruto, usar sensor_states (uma linha por sensor)
                 df = pd.read_sql_query(query_states, conn)
                 print("📊 Usando dados de sensor_states (fallback)")
             
@@ -141,6 +140,14 @@ class PerformanceAnalyzer:
             print(f"❌ Erro ao carregar dados dos sensores: {e}")
             return pd.DataFrame()
     
+    def _reading_partitions(self, conn, days):
+        """Partições diárias de leituras que cobrem os últimos N dias"""
+        first_day = (datetime.now() - timedelta(days=days)).strftime('%Y%m%d')
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'sensor_readings_[0-9]*'"
+        ).fetchall()
+        return sorted(name for (name,) in rows if name[len('sensor_readings_'):] >= first_day)
+    
     def analyze_resource_trends(self, metrics_df):
         """Analisar tendências de recursos"""
         print("📈 Analisando tendências de recursos...")